@@ -0,0 +1,140 @@
+"""
+Microbenchmark for the list endpoints' serialization paths.
+
+Seeds N issues and projects into a temporary SQLite database, then requests
+GET /issues and GET /projects at limit=1000 through the ASGI app with
+FAST_LIST_RESPONSES off and on, reporting CPU time and peak allocations per
+request and checking that both paths return the same JSON. A second pass
+times the serialization step alone, from fetched rows to response bytes,
+since the shared query and driver cost dominates whole requests on SQLite.
+
+    python benchmarks/list_serialization_benchmark.py --rows 5000 --repeat 20
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+async def seed(rows: int) -> None:
+    from sqlalchemy import insert
+    from src.database import AsyncSessionLocal, Base, engine
+    from src.models.issue import Issue
+    from src.models.project import Project
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSessionLocal() as db:
+        await db.execute(insert(Project), [
+            {"name": f"Project {i}", "description": f"Description of project {i}", "github_id": f"PVT_{i}"}
+            for i in range(rows)
+        ])
+        await db.execute(insert(Issue), [
+            {
+                "title": f"Issue {i}", "body": f"Steps to reproduce issue {i}\n\nExpected ...",
+                "status": "open" if i % 3 else "closed", "project_id": i % 100 + 1, "github_id": str(i),
+            }
+            for i in range(rows)
+        ])
+        await db.commit()
+
+async def measure(client, path: str, repeat: int) -> tuple[float, int, bytes]:
+    response = await client.get(path)  # warm up
+    started = time.process_time()
+    for _ in range(repeat):
+        await client.get(path)
+    cpu = (time.process_time() - started) / repeat
+    # Allocations are traced in a separate pass; tracing skews CPU time
+    tracemalloc.start()
+    await client.get(path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return cpu, peak, response.content
+
+async def run(rows: int, repeat: int) -> None:
+    import httpx
+    from src.config import settings
+    from src.database import dispose_engines
+    from src.main import app
+    from src.utils import serialization
+
+    await seed(rows)
+    print(f"json encoder: {'orjson' if serialization.orjson else 'json (pip install orjson for the fastest path)'}")
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for path in ("/issues/?limit=1000", "/projects/?limit=1000"):
+            results = {}
+            for fast in (False, True):
+                settings.FAST_LIST_RESPONSES = fast
+                results[fast] = await measure(client, path, repeat)
+            (slow_cpu, slow_peak, slow_body), (fast_cpu, fast_peak, fast_body) = results[False], results[True]
+            assert json.loads(slow_body) == json.loads(fast_body), f"{path}: fast path output differs"
+            print(
+                f"{path:<22} default {slow_cpu * 1000:7.2f} ms cpu {slow_peak / 1024:8.0f} KiB peak | "
+                f"fast {fast_cpu * 1000:7.2f} ms cpu {fast_peak / 1024:8.0f} KiB peak | "
+                f"{slow_cpu / fast_cpu:4.1f}x cpu, {slow_peak / fast_peak:4.1f}x memory"
+            )
+        await serialization_only(repeat)
+    await dispose_engines()
+
+def timed(fn, repeat: int) -> tuple[float, int]:
+    fn()
+    started = time.process_time()
+    for _ in range(repeat):
+        fn()
+    cpu = (time.process_time() - started) / repeat
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return cpu, peak
+
+async def serialization_only(repeat: int) -> None:
+    from pydantic import TypeAdapter
+    from src.crud.issue import get_issue_rows, get_issues
+    from src.database import AsyncSessionLocal
+    from src.schemas.issue import Issue
+    from src.schemas.pagination import Page
+    from src.utils.pagination import paginate
+    from src.utils.serialization import page_response
+
+    async with AsyncSessionLocal() as db:
+        entities = await get_issues(db, limit=1001)
+        rows = await get_issue_rows(db, limit=1001)
+    adapter = TypeAdapter(Page[Issue])
+
+    def default():
+        # What FastAPI does with a response_model: validate, dump to JSON types, json.dumps
+        items, next_cursor = paginate(entities, 1000)
+        page = adapter.validate_python({"items": items, "next_cursor": next_cursor}, from_attributes=True)
+        return json.dumps(adapter.dump_python(page, mode="json"), ensure_ascii=False, separators=(",", ":")).encode()
+
+    def fast():
+        return page_response(rows, 1000).body
+
+    (slow_cpu, slow_peak), (fast_cpu, fast_peak) = timed(default, repeat), timed(fast, repeat)
+    print(
+        f"{'serialization only':<22} default {slow_cpu * 1000:7.2f} ms cpu {slow_peak / 1024:8.0f} KiB peak | "
+        f"fast {fast_cpu * 1000:7.2f} ms cpu {fast_peak / 1024:8.0f} KiB peak | "
+        f"{slow_cpu / fast_cpu:4.1f}x cpu, {slow_peak / fast_peak:4.1f}x memory"
+    )
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Settings are read at import time, so configure before importing src
+        os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{tmp}/bench.db"
+        os.environ["RESPONSE_CACHE_BACKEND"] = "none"
+        sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+        asyncio.run(run(args.rows, args.repeat))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Startup-time benchmark for the template sync stage.
+
+Generates N templates in a temporary directory and times sync_templates
+against a fresh SQLite database for a cold start, a restart with nothing
+changed, and a restart after editing a handful of files.
+
+    python benchmarks/template_sync_benchmark.py --templates 3000
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+TEMPLATE = '''title = "{{title_{i}}}"
+body = """
+## Description
+{{description}}
+
+## Notes
+{{notes}}
+"""
+
+[fields]
+title_{i} = {{ type = "string", required = true }}
+description = {{ type = "string", required = true }}
+notes = {{ type = "string", required = false }}
+'''
+
+def write_templates(directory: Path, count: int) -> None:
+    for i in range(count):
+        (directory / f"template_{i:05d}.toml").write_text(TEMPLATE.format(i=i))
+
+async def run(count: int, edits: int) -> None:
+    from src.database import AsyncSessionLocal, Base, engine
+    from src.utils.template_sync import sync_templates
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    templates_dir = Path(os.environ["BENCH_TEMPLATES_DIR"])
+    manifest = str(templates_dir.parent / "manifest.json")
+
+    async def timed(label: str) -> None:
+        started = time.perf_counter()
+        async with AsyncSessionLocal() as db:
+            result = await sync_templates(db, str(templates_dir), manifest)
+        elapsed = time.perf_counter() - started
+        print(f"{label:<22} {elapsed * 1000:8.1f} ms  parsed={result.parsed} upserted={result.upserted}")
+
+    await timed("cold start")
+    await timed("restart, no changes")
+    time.sleep(0.01)
+    for i in range(edits):
+        path = templates_dir / f"template_{i:05d}.toml"
+        path.write_text(path.read_text() + "\n# edited\n")
+    await timed(f"restart, {edits} edited")
+    await engine.dispose()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--templates", type=int, default=3000)
+    parser.add_argument("--edits", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        templates_dir = Path(tmp) / "templates"
+        templates_dir.mkdir()
+        write_templates(templates_dir, args.templates)
+        # Settings are read at import time, so configure before importing src
+        os.environ["BENCH_TEMPLATES_DIR"] = str(templates_dir)
+        os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{tmp}/bench.db"
+        sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+        asyncio.run(run(args.templates, args.edits))
+
+if __name__ == "__main__":
+    main()
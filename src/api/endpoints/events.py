@@ -0,0 +1,73 @@
+import asyncio
+from fastapi import APIRouter, Header, Query
+from fastapi.responses import StreamingResponse
+from typing import List, Literal, Optional
+
+from ...config import settings
+from ...utils.change_feed import change_feed
+
+router = APIRouter()
+
+def control_frame(event: str) -> bytes:
+    # Carries the current id so the client's next reconnect resumes from here
+    sequence = change_feed.stats()["last_event_id"] or change_feed.event_id(0)
+    return b"id: %s\nevent: %s\ndata: {}\n\n" % (sequence.encode(), event.encode())
+
+async def stream_changes(project_ids: Optional[List[int]], entities: Optional[List[str]], resume_from: Optional[str]):
+    # Subscribed here rather than in the handler, so a client that disconnects
+    # before the body starts never leaves a subscription behind; and before
+    # reading the backlog, so nothing published in between is lost
+    subscription = change_feed.subscribe(project_ids, entities)
+    try:
+        yield b"retry: 3000\n\n"
+        last = 0
+        if resume_from is None:
+            yield control_frame("ready")
+        else:
+            sequence = change_feed.parse_event_id(resume_from)
+            backlog = change_feed.since(sequence) if sequence is not None else None
+            if backlog is None:
+                # Changes were missed; the client has to reload what it shows
+                yield control_frame("reset")
+            else:
+                for change_event in backlog:
+                    if subscription.matches(change_event.record):
+                        yield change_event.frame
+                    last = change_event.id
+        while True:
+            if subscription.overflowed:
+                while not subscription.queue.empty():
+                    subscription.queue.get_nowait()
+                subscription.overflowed = False
+                yield control_frame("reset")
+            try:
+                change_event = await asyncio.wait_for(subscription.queue.get(), settings.CHANGE_FEED_HEARTBEAT)
+            except asyncio.TimeoutError:
+                yield b": keep-alive\n\n"
+                continue
+            # Already sent from the backlog
+            if change_event.id > last:
+                yield change_event.frame
+    finally:
+        change_feed.unsubscribe(subscription)
+
+@router.get("/events")
+async def stream_events(
+    project_id: Optional[List[int]] = Query(None, description="Only changes in these projects"),
+    entity: Optional[List[Literal["issue", "project", "dependency"]]] = Query(None),
+    last_event_id: Optional[str] = Query(None, description="Resume after this event id"),
+    last_event_id_header: Optional[str] = Header(None, alias="Last-Event-ID"),
+):
+    """
+    Server-sent events stream of issue, project and dependency changes, so
+    clients can update what they show instead of polling the list endpoints.
+    """
+    return StreamingResponse(
+        stream_changes(project_id, entity, last_event_id_header or last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.get("/events/stats")
+async def read_event_stats():
+    return change_feed.stats()
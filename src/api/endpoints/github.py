@@ -0,0 +1,10 @@
+from fastapi import APIRouter
+
+from ...utils.github_scheduler import github_scheduler
+
+router = APIRouter()
+
+@router.get("/scheduler")
+async def read_scheduler_stats():
+    """Current GitHub call pacing, rate-limit budget and per-lane queue/wait figures."""
+    return github_scheduler.stats()
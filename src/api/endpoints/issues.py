@@ -1,53 +1,234 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from datetime import datetime
+from typing import List, Literal, Optional
 
-from ...database import get_db
-from ...schemas.issue import IssueCreate, Issue, IssueUpdate
-from ...crud.issue import create_issue, get_issue, update_issue, delete_issue, get_issues
-from ...utils.github_cli import create_github_issue, update_github_issue, delete_github_issue
+from ...config import settings
+from ...database import get_cached_read_db, get_db
+from ...schemas.issue import IssueCreate, Issue, IssueUpdate, IssueStatusEvent
+from ...schemas.pagination import Page
+from ...schemas.bulk import BulkResult, BulkItemResult
+from ...schemas.issue_archive import ArchiveStats
+from ...schemas.issue_dependency import CriticalPath, Dependency, DependencyCreate, DependencyEdge
+from ...crud.issue import create_issue, create_issues, get_issue, update_issue, delete_issue, get_issues, get_issue_rows, select_issue_rows
+from ...crud.issue_events import get_issue_status_events
+from ...crud.issue_archive import decode_archived_rows, get_archive_stats, select_archived_issue_rows
+from ...crud.issue_dependency import DEPENDENCY_CYCLE_ERROR, add_dependencies, get_dependencies, get_dependency, get_issue_project_id, remove_dependency
+from ...crud.search import search_issues
+from ...utils.outbox_worker import outbox_worker
+from ...utils.pagination import cursor_after_id, cursor_after_rank, cursor_after_updated, encode_cursor, paginate
+from ...utils.export import stream_export, EXPORT_MEDIA_TYPES
+from ...utils.archive import issue_archiver
+from ...utils.dependency_graph import DependencyCycleError, DependencyGraph, dependency_graphs
+from ...utils.response_cache import cached_response
+from ...utils.serialization import page_response
 
 router = APIRouter()
 
 @router.post("/", response_model=Issue)
 async def create_issue_endpoint(issue: IssueCreate, db: AsyncSession = Depends(get_db)):
-    github_issue = create_github_issue(issue.project_id, issue.title, issue.body)
     db_issue = await create_issue(db, issue)
-    db_issue.github_id = github_issue["id"]
-    await db.commit()
+    outbox_worker.notify()
     return db_issue
 
+@router.post("/bulk", response_model=BulkResult)
+async def create_issues_bulk_endpoint(issues: List[IssueCreate], db: AsyncSession = Depends(get_db)):
+    """
+    Create many issues in one transaction. GitHub creation happens in the
+    background, batched into GraphQL mutations by the outbox worker.
+    """
+    outcomes = await create_issues(db, issues)
+    outbox_worker.notify()
+    results = [
+        BulkItemResult(index=i, success=True, id=outcome) if isinstance(outcome, int)
+        else BulkItemResult(index=i, success=False, error=outcome)
+        for i, outcome in enumerate(outcomes)
+    ]
+    created = sum(result.success for result in results)
+    return BulkResult(created=created, failed=len(results) - created, results=results)
+
+@router.post("/dependencies/bulk", response_model=BulkResult)
+async def add_dependencies_bulk_endpoint(edges: List[DependencyEdge], db: AsyncSession = Depends(get_db)):
+    """
+    Record many blocker -> blocked edges in one transaction. Edges that
+    already exist succeed without change; edges that would close a cycle fail.
+    """
+    outcomes = await add_dependencies(db, [(edge.blocker_id, edge.blocked_id) for edge in edges])
+    results = [
+        BulkItemResult(index=i, success=True, id=outcome) if isinstance(outcome, int)
+        else BulkItemResult(index=i, success=False, error=outcome)
+        for i, outcome in enumerate(outcomes)
+    ]
+    created = sum(result.success for result in results)
+    return BulkResult(created=created, failed=len(results) - created, results=results)
+
+@router.get("/export")
+async def export_issues(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    project_id: Optional[int] = None,
+    status: Optional[str] = None,
+    updated_since: Optional[datetime] = None,
+    include_archived: bool = True,
+):
+    """
+    Stream every matching issue as NDJSON or CSV with constant memory:
+    issues in the hot table first, then archived ones, each by id.
+    """
+    query = select_issue_rows(project_id=project_id, status=status, updated_since=updated_since)
+    archived = select_archived_issue_rows(project_id=project_id, status=status, updated_since=updated_since)
+    return StreamingResponse(
+        stream_export(query, format, then=archived if include_archived else None, decode=decode_archived_rows),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="issues.{format}"'},
+    )
+
+@router.get("/archive/stats", response_model=ArchiveStats)
+async def read_archive_stats(db: AsyncSession = Depends(get_db)):
+    """Sizes of the hot table and the issue archive, and the last archive run in this process."""
+    stats = await get_archive_stats(db)
+    return ArchiveStats(**stats, last_run=issue_archiver.last_run)
+
+@router.get("/search", response_model=Page[Issue])
+async def search_issues_endpoint(
+    q: str = Query(..., min_length=1, max_length=500),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    project_id: Optional[int] = None,
+    status: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Full-text search over issue titles and bodies, most relevant first.
+    """
+    try:
+        after = cursor_after_rank(cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    results = await search_issues(db, q, limit=limit + 1, after=after, project_id=project_id, status=status)
+    next_cursor = None
+    if len(results) > limit:
+        issue, rank = results[limit - 1]
+        next_cursor = encode_cursor({"rank": rank, "id": issue.id})
+    return {"items": [issue for issue, _ in results[:limit]], "next_cursor": next_cursor}
+
 @router.get("/{issue_id}", response_model=Issue)
-async def read_issue(issue_id: int, db: AsyncSession = Depends(get_db)):
-    db_issue = await get_issue(db, issue_id)
-    if db_issue is None:
+async def read_issue(issue_id: int, request: Request, db: AsyncSession = Depends(get_cached_read_db)):
+    async def load():
+        db_issue = await get_issue(db, issue_id)
+        return Issue.model_validate(db_issue) if db_issue is not None else None
+
+    response = await cached_response(request, f"issue:{issue_id}", load)
+    if response is None:
         raise HTTPException(status_code=404, detail="Issue not found")
-    return db_issue
+    return response
+
+@router.get("/{issue_id}/history", response_model=List[IssueStatusEvent])
+async def read_issue_history(issue_id: int, limit: int = Query(100, ge=1, le=1000), db: AsyncSession = Depends(get_db)):
+    return await get_issue_status_events(db, issue_id, limit=limit)
+
+async def issue_graph(db: AsyncSession, issue_id: int) -> DependencyGraph:
+    exists, project_id = await get_issue_project_id(db, issue_id)
+    if not exists:
+        raise HTTPException(status_code=404, detail="Issue not found")
+    # Dependencies only link issues of one project
+    return await dependency_graphs.get(db, project_id) if project_id is not None else DependencyGraph([])
+
+@router.get("/{issue_id}/dependencies", response_model=List[Dependency])
+async def read_issue_dependencies(issue_id: int, db: AsyncSession = Depends(get_db)):
+    """Direct edges in both directions: the issue's blockers and the issues it blocks."""
+    return await get_dependencies(db, issue_id)
+
+@router.post("/{issue_id}/dependencies", response_model=Dependency)
+async def add_dependency_endpoint(issue_id: int, dependency: DependencyCreate, db: AsyncSession = Depends(get_db)):
+    """
+    Record that dependency.blocker_id must be finished before issue_id.
+    Responds 409 if issue_id already (transitively) blocks the blocker.
+    """
+    outcome, = await add_dependencies(db, [(dependency.blocker_id, issue_id)])
+    if outcome == "Issue not found":
+        raise HTTPException(status_code=404, detail=outcome)
+    if outcome == DEPENDENCY_CYCLE_ERROR:
+        raise HTTPException(status_code=409, detail=outcome)
+    if isinstance(outcome, str):
+        raise HTTPException(status_code=400, detail=outcome)
+    return await get_dependency(db, dependency.blocker_id, issue_id)
+
+@router.delete("/{issue_id}/dependencies/{blocker_id}", response_model=dict)
+async def remove_dependency_endpoint(issue_id: int, blocker_id: int, db: AsyncSession = Depends(get_db)):
+    if not await remove_dependency(db, blocker_id, issue_id):
+        raise HTTPException(status_code=404, detail="Dependency not found")
+    return {"message": "Dependency removed successfully"}
+
+@router.get("/{issue_id}/blocked", response_model=List[int])
+async def read_blocked_issues(issue_id: int, db: AsyncSession = Depends(get_cached_read_db)):
+    """Every issue transitively blocked by this one, nearest first."""
+    return (await issue_graph(db, issue_id)).blocked_by(issue_id)
+
+@router.get("/{issue_id}/blockers", response_model=List[int])
+async def read_blocking_issues(issue_id: int, open_only: bool = False, db: AsyncSession = Depends(get_cached_read_db)):
+    """
+    Every issue this one transitively waits on, nearest first. open_only
+    stops at closed issues, which no longer block anything.
+    """
+    return (await issue_graph(db, issue_id)).blockers_of(issue_id, open_only=open_only)
+
+@router.get("/{issue_id}/critical-path", response_model=CriticalPath)
+async def read_critical_path(issue_id: int, db: AsyncSession = Depends(get_cached_read_db)):
+    """
+    The longest chain of open issues that must be finished one after another
+    before this one (e.g. a milestone or epic) can be.
+    """
+    graph = await issue_graph(db, issue_id)
+    try:
+        path = graph.critical_path(issue_id)
+    except DependencyCycleError as exc:
+        raise HTTPException(status_code=409, detail={"message": str(exc), "cycle": exc.cycle})
+    return CriticalPath(issue_id=issue_id, path=path, length=len(path))
 
 @router.put("/{issue_id}", response_model=Issue)
 async def update_issue_endpoint(issue_id: int, issue: IssueUpdate, db: AsyncSession = Depends(get_db)):
-    db_issue = await get_issue(db, issue_id)
-    if db_issue is None:
-        raise HTTPException(status_code=404, detail="Issue not found")
-    
-    update_github_issue(db_issue.github_id, issue.title, issue.body, issue.status)
     updated_issue = await update_issue(db, issue_id, issue)
+    if updated_issue is None:
+        raise HTTPException(status_code=404, detail="Issue not found")
+    outbox_worker.notify()
     return updated_issue
 
 @router.delete("/{issue_id}", response_model=dict)
 async def delete_issue_endpoint(issue_id: int, db: AsyncSession = Depends(get_db)):
-    db_issue = await get_issue(db, issue_id)
-    if db_issue is None:
+    if not await delete_issue(db, issue_id):
         raise HTTPException(status_code=404, detail="Issue not found")
-    
-    delete_github_issue(db_issue.github_id)
-    await delete_issue(db, issue_id)
+    outbox_worker.notify()
     return {"message": "Issue deleted successfully"}
 
-@router.get("/", response_model=List[Issue])
-async def list_issues(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_db)):
-    issues = await get_issues(db, skip=skip, limit=limit)
-    return issues
+@router.get("/", response_model=Page[Issue])
+async def list_issues(
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    project_id: Optional[int] = None,
+    status: Optional[str] = None,
+    updated_since: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    # With updated_since, pages run in (updated_at, id) order
+    keys = ("updated_at", "id") if updated_since is not None else ("id",)
+    try:
+        after_id = cursor_after_id(cursor) if updated_since is None else None
+        after_update = cursor_after_updated(cursor) if updated_since is not None else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if settings.FAST_LIST_RESPONSES:
+        rows = await get_issue_rows(
+            db, limit=limit + 1, after_id=after_id, after_update=after_update,
+            project_id=project_id, status=status, updated_since=updated_since
+        )
+        return page_response(rows, limit, keys)
+    issues = await get_issues(
+        db, limit=limit + 1, after_id=after_id, after_update=after_update,
+        project_id=project_id, status=status, updated_since=updated_since
+    )
+    items, next_cursor = paginate(issues, limit, keys)
+    return {"items": items, "next_cursor": next_cursor}
 
 @router.post("/{issue_id}/assign", response_model=Issue)
 async def assign_issue(issue_id: int, assignee: str, db: AsyncSession = Depends(get_db)):
@@ -0,0 +1,20 @@
+import asyncio
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from ...utils.metrics import metrics_store, registry
+
+router = APIRouter()
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def read_metrics():
+    """
+    Metrics in the Prometheus text exposition format: summed over every
+    worker when they share a METRICS_DIR, otherwise of this process.
+    """
+    if metrics_store.directory:
+        text = registry.render(await asyncio.to_thread(metrics_store.collect))
+    else:
+        text = registry.render()
+    return PlainTextResponse(text, media_type="text/plain; version=0.0.4")
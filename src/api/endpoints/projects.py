@@ -1,110 +1,181 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
-
-from ...database import get_db
-from ...schemas.project import ProjectCreate, Project, ProjectUpdate
-from ...crud.project import create_project, get_project, update_project, delete_project, get_projects
-from ...utils.github_cli import create_github_project, update_github_project, delete_github_project
+from datetime import datetime, timedelta, timezone
+from typing import List, Literal, Optional
+
+from ...config import settings
+from ...database import get_cached_read_db, get_db
+from ...schemas.project import ProjectCreate, Project, ProjectUpdate, ProjectReport, Burndown
+from ...schemas.pagination import Page
+from ...schemas.bulk import BulkResult, BulkItemResult
+from ...schemas.issue_dependency import DependencyCycle, TopologicalOrder
+from ...crud.project import create_project, create_projects, get_project, update_project, delete_project, get_projects, get_project_rows, select_project_rows
+from ...crud.project_stats import get_project_stats, is_closed
+from ...crud.issue_events import GRANULARITIES, as_utc, bucket_start, burndown_series, get_burndown_buckets
+from ...utils.outbox_worker import outbox_worker
+from ...utils.pagination import cursor_after_id, cursor_after_updated, paginate
+from ...utils.dependency_graph import DependencyCycleError, dependency_graphs
+from ...utils.response_cache import cached_response
+from ...utils.serialization import page_response
+from ...utils.export import stream_export, EXPORT_MEDIA_TYPES
 
 router = APIRouter()
 
+MAX_BURNDOWN_POINTS = 10000
+
 @router.post("/", response_model=Project)
 async def create_project_endpoint(project: ProjectCreate, db: AsyncSession = Depends(get_db)):
-    github_project = create_github_project(project.name, project.description)
     db_project = await create_project(db, project)
-    db_project.github_id = github_project["id"]
-    await db.commit()
+    outbox_worker.notify()
     return db_project
 
+@router.post("/bulk", response_model=BulkResult)
+async def create_projects_bulk_endpoint(projects: List[ProjectCreate], db: AsyncSession = Depends(get_db)):
+    """
+    Create many projects in one transaction. GitHub creation happens in the
+    background, batched into GraphQL mutations by the outbox worker.
+    """
+    ids = await create_projects(db, projects)
+    outbox_worker.notify()
+    results = [BulkItemResult(index=i, success=True, id=project_id) for i, project_id in enumerate(ids)]
+    return BulkResult(created=len(results), failed=0, results=results)
+
+@router.get("/export")
+async def export_projects(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    updated_since: Optional[datetime] = None,
+):
+    """
+    Stream every matching project as NDJSON or CSV with constant memory.
+    """
+    query = select_project_rows(updated_since=updated_since)
+    return StreamingResponse(
+        stream_export(query, format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="projects.{format}"'},
+    )
+
 @router.get("/{project_id}", response_model=Project)
-async def read_project(project_id: int, db: AsyncSession = Depends(get_db)):
-    db_project = await get_project(db, project_id)
-    if db_project is None:
+async def read_project(project_id: int, request: Request, db: AsyncSession = Depends(get_cached_read_db)):
+    async def load():
+        db_project = await get_project(db, project_id)
+        return Project.model_validate(db_project) if db_project is not None else None
+
+    response = await cached_response(request, f"project:{project_id}", load)
+    if response is None:
         raise HTTPException(status_code=404, detail="Project not found")
-    return db_project
+    return response
 
 @router.put("/{project_id}", response_model=Project)
 async def update_project_endpoint(project_id: int, project: ProjectUpdate, db: AsyncSession = Depends(get_db)):
-    db_project = await get_project(db, project_id)
-    if db_project is None:
-        raise HTTPException(status_code=404, detail="Project not found")
-    
-    update_github_project(db_project.github_id, project.name, project.description)
     updated_project = await update_project(db, project_id, project)
+    if updated_project is None:
+        raise HTTPException(status_code=404, detail="Project not found")
+    outbox_worker.notify()
     return updated_project
 
 @router.delete("/{project_id}", response_model=dict)
 async def delete_project_endpoint(project_id: int, db: AsyncSession = Depends(get_db)):
-    db_project = await get_project(db, project_id)
-    if db_project is None:
+    if not await delete_project(db, project_id):
         raise HTTPException(status_code=404, detail="Project not found")
-    
-    delete_github_project(db_project.github_id)
-    await delete_project(db, project_id)
+    outbox_worker.notify()
     return {"message": "Project deleted successfully"}
 
-@router.get("/", response_model=List[Project])
-async def list_projects(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_db)):
-    projects = await get_projects(db, skip=skip, limit=limit)
-    return projects
-
-@router.get("/{project_id}/report")
+@router.get("/", response_model=Page[Project])
+async def list_projects(
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    updated_since: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    # With updated_since, pages run in (updated_at, id) order
+    keys = ("updated_at", "id") if updated_since is not None else ("id",)
+    try:
+        after_id = cursor_after_id(cursor) if updated_since is None else None
+        after_update = cursor_after_updated(cursor) if updated_since is not None else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if settings.FAST_LIST_RESPONSES:
+        rows = await get_project_rows(
+            db, limit=limit + 1, after_id=after_id, after_update=after_update, updated_since=updated_since
+        )
+        return page_response(rows, limit, keys)
+    projects = await get_projects(
+        db, limit=limit + 1, after_id=after_id, after_update=after_update, updated_since=updated_since
+    )
+    items, next_cursor = paginate(projects, limit, keys)
+    return {"items": items, "next_cursor": next_cursor}
+
+@router.get("/{project_id}/report", response_model=ProjectReport)
 async def generate_project_report(project_id: int, db: AsyncSession = Depends(get_db)):
-    # Implement project report generation
-    pass
-
-@router.get("/{project_id}/burndown")
-async def generate_burndown_chart(project_id: int, db: AsyncSession = Depends(get_db)):
-    # Implement burndown chart data generation
-    pass
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
-
-from ...database import get_db
-from ...schemas.project import ProjectCreate, Project, ProjectUpdate
-from ...crud.project import create_project, get_project, update_project, delete_project, get_projects
-from ...utils.github_cli import create_github_project, update_github_project, delete_github_project
-
-router = APIRouter()
-
-@router.post("/", response_model=Project)
-async def create_project_endpoint(project: ProjectCreate, db: AsyncSession = Depends(get_db)):
-    github_project = create_github_project(project.name, project.description)
-    db_project = await create_project(db, project)
-    db_project.github_id = github_project["id"]
-    await db.commit()
-    return db_project
-
-@router.get("/{project_id}", response_model=Project)
-async def read_project(project_id: int, db: AsyncSession = Depends(get_db)):
-    db_project = await get_project(db, project_id)
-    if db_project is None:
+    """
+    Summarise a project's issues from its maintained counters; the issues
+    table itself is never scanned.
+    """
+    stats, by_status = await get_project_stats(db, project_id)
+    if stats is None and await get_project(db, project_id) is None:
         raise HTTPException(status_code=404, detail="Project not found")
-    return db_project
-
-@router.put("/{project_id}", response_model=Project)
-async def update_project_endpoint(project_id: int, project: ProjectUpdate, db: AsyncSession = Depends(get_db)):
-    db_project = await get_project(db, project_id)
-    if db_project is None:
+    closed_issues = sum(count for status, count in by_status.items() if is_closed(status))
+    total_issues = sum(by_status.values())
+    return ProjectReport(
+        project_id=project_id,
+        total_issues=total_issues,
+        open_issues=total_issues - closed_issues,
+        closed_issues=closed_issues,
+        issues_by_status=by_status,
+        issues_created=stats.issues_created if stats else 0,
+        issues_closed=stats.issues_closed if stats else 0,
+        last_activity_at=stats.last_activity_at if stats else None,
+    )
+
+@router.get("/{project_id}/dependencies/order", response_model=TopologicalOrder)
+async def read_dependency_order(project_id: int, db: AsyncSession = Depends(get_cached_read_db)):
+    """
+    The project's dependent issues with every blocker before the issues it
+    blocks. Responds 409 with one offending cycle if there is no such order.
+    """
+    graph = await dependency_graphs.get(db, project_id)
+    try:
+        order = graph.topological_order()
+    except DependencyCycleError as exc:
+        raise HTTPException(status_code=409, detail={"message": str(exc), "cycle": exc.cycle})
+    return TopologicalOrder(project_id=project_id, order=order)
+
+@router.get("/{project_id}/dependencies/cycle", response_model=DependencyCycle)
+async def read_dependency_cycle(project_id: int, db: AsyncSession = Depends(get_cached_read_db)):
+    """One dependency cycle in the project, or null if there is none."""
+    graph = await dependency_graphs.get(db, project_id)
+    try:
+        graph.topological_order()
+    except DependencyCycleError as exc:
+        return DependencyCycle(project_id=project_id, cycle=exc.cycle)
+    return DependencyCycle(project_id=project_id)
+
+@router.get("/{project_id}/burndown", response_model=Burndown)
+async def generate_burndown_chart(
+    project_id: int,
+    start: Optional[datetime] = Query(None, description="Defaults to 30 days before end"),
+    end: Optional[datetime] = Query(None, description="Defaults to now"),
+    granularity: Literal["hour", "day"] = "day",
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Remaining open issues over time, computed from pre-bucketed counts
+    rather than by replaying status events.
+    """
+    now = datetime.now(timezone.utc)
+    end = as_utc(end) if end else now
+    start = as_utc(start) if start else end - timedelta(days=30)
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    if (end - start) / GRANULARITIES[granularity] > MAX_BURNDOWN_POINTS:
+        raise HTTPException(status_code=400, detail=f"Window exceeds {MAX_BURNDOWN_POINTS} {granularity} buckets")
+
+    stats, by_status = await get_project_stats(db, project_id)
+    if stats is None and await get_project(db, project_id) is None:
         raise HTTPException(status_code=404, detail="Project not found")
-    
-    update_github_project(db_project.github_id, project.name, project.description)
-    updated_project = await update_project(db, project_id, project)
-    return updated_project
-
-@router.delete("/{project_id}", response_model=dict)
-async def delete_project_endpoint(project_id: int, db: AsyncSession = Depends(get_db)):
-    db_project = await get_project(db, project_id)
-    if db_project is None:
-        raise HTTPException(status_code=404, detail="Project not found")
-    
-    delete_github_project(db_project.github_id)
-    await delete_project(db, project_id)
-    return {"message": "Project deleted successfully"}
-
-@router.get("/", response_model=List[Project])
-async def list_projects(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_db)):
-    projects = await get_projects(db, skip=skip, limit=limit)
-    return projects
+    open_now = sum(count for status, count in by_status.items() if not is_closed(status))
+    buckets = await get_burndown_buckets(db, project_id, granularity, bucket_start(start, granularity))
+    points = burndown_series(buckets, open_now, start, min(end, now), granularity)
+    return Burndown(project_id=project_id, granularity=granularity, points=points)
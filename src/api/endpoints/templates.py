@@ -1,12 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List, Dict, Any
+from sqlalchemy.exc import IntegrityError
+from typing import List, Dict, Any, Optional
 from pydantic import BaseModel
 
-from ...database import get_db
-from ...schemas.template import Template, TemplateCreate, TemplateUpdate
-from ...crud.template import get_templates, create_template, get_template, update_template, delete_template
-from ...utils.template_loader import list_available_templates, apply_template_to_issue
+from ...database import get_cached_read_db, get_db
+from ...schemas.template import Template, TemplateCreate, TemplateUpdate, TemplateApplyItem
+from ...schemas.bulk import BulkResult, BulkItemResult
+from ...schemas.pagination import Page
+from ...crud.template import DUPLICATE_NAME_ERROR, get_template_summaries, list_template_names, create_template, get_template, update_template, delete_template
+from ...utils.template_loader import apply_template_to_issue, apply_template_to_issues
+from ...utils.template_engine import TemplateRenderError, TemplateSyntaxError
+from ...utils.pagination import cursor_after_id, paginate
+from ...utils.response_cache import cached_response, encode_body
 
 router = APIRouter()
 
@@ -17,67 +23,111 @@ class TemplateInfo(BaseModel):
     fields: Dict[str, Dict[str, Any]]
 
 @router.get("/available", response_model=List[str])
-async def list_available_templates_endpoint():
+async def list_available_templates_endpoint(request: Request, db: AsyncSession = Depends(get_cached_read_db)):
     """
-    List all available template names.
+    List all available template names, from the database rather than the
+    templates directory (which is synced into it at startup).
     """
-    return list_available_templates()
+    async def load():
+        return await list_template_names(db)
 
-@router.get("/", response_model=List[TemplateInfo])
+    return await cached_response(request, "templates:available", load)
+
+@router.get("/", response_model=Page[TemplateInfo])
 async def list_templates(
-    skip: int = 0, 
-    limit: int = 100, 
-    name: str = Query(None, description="Filter templates by name"),
-    db: AsyncSession = Depends(get_db)
+    request: Request,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    name: str = Query(None, description="Filter templates by name (case-insensitive substring)"),
+    prefix: str = Query(None, description="Filter templates whose name starts with this (case-insensitive)"),
+    db: AsyncSession = Depends(get_cached_read_db)
 ):
-    templates = await get_templates(db, skip=skip, limit=limit)
-    template_info_list = []
-    for template in templates:
-        if name and name.lower() not in template.name.lower():
-            continue
-        template_info = TemplateInfo(
-            id=template.id,
-            name=template.name,
-            title=template.content.get("title", ""),
-            fields=template.content.get("fields", {})
-        )
-        template_info_list.append(template_info)
-    return template_info_list
+    try:
+        after_id = cursor_after_id(cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    async def load():
+        rows = await get_template_summaries(db, limit=limit + 1, after_id=after_id, name=name, prefix=prefix)
+        rows, next_cursor = paginate(rows, limit)
+        items = [{"id": row.id, "name": row.name, "title": row.title, "fields": row.fields or {}} for row in rows]
+        return {"items": items, "next_cursor": next_cursor}
+
+    key = "templates:list:" + encode_body([limit, after_id, name, prefix]).decode()
+    return await cached_response(request, key, load)
 
 @router.post("/", response_model=Template)
 async def create_template_endpoint(template: TemplateCreate, db: AsyncSession = Depends(get_db)):
-    db_template = await create_template(db, template)
+    try:
+        db_template = await create_template(db, template)
+    except TemplateSyntaxError as exc:
+        raise HTTPException(status_code=400, detail=exc.errors)
+    if db_template is None:
+        raise HTTPException(status_code=409, detail=DUPLICATE_NAME_ERROR)
     return db_template
 
 @router.get("/{template_id}", response_model=Template)
-async def read_template(template_id: int, db: AsyncSession = Depends(get_db)):
-    db_template = await get_template(db, template_id)
-    if db_template is None:
+async def read_template(template_id: int, request: Request, db: AsyncSession = Depends(get_cached_read_db)):
+    async def load():
+        db_template = await get_template(db, template_id)
+        return Template.model_validate(db_template) if db_template is not None else None
+
+    response = await cached_response(request, f"template:{template_id}", load)
+    if response is None:
         raise HTTPException(status_code=404, detail="Template not found")
-    return db_template
+    return response
 
 @router.put("/{template_id}", response_model=Template)
 async def update_template_endpoint(template_id: int, template: TemplateUpdate, db: AsyncSession = Depends(get_db)):
-    db_template = await get_template(db, template_id)
-    if db_template is None:
+    try:
+        updated_template = await update_template(db, template_id, template)
+    except TemplateSyntaxError as exc:
+        raise HTTPException(status_code=400, detail=exc.errors)
+    except IntegrityError:
+        raise HTTPException(status_code=409, detail=DUPLICATE_NAME_ERROR)
+    if updated_template is None:
         raise HTTPException(status_code=404, detail="Template not found")
-    
-    updated_template = await update_template(db, template_id, template)
     return updated_template
 
 @router.delete("/{template_id}", response_model=dict)
 async def delete_template_endpoint(template_id: int, db: AsyncSession = Depends(get_db)):
-    db_template = await get_template(db, template_id)
-    if db_template is None:
+    if not await delete_template(db, template_id):
         raise HTTPException(status_code=404, detail="Template not found")
-    
-    await delete_template(db, template_id)
     return {"message": "Template deleted successfully"}
 
 @router.post("/issues/{issue_id}/apply-template", response_model=dict)
-async def apply_template_to_issue_endpoint(issue_id: int, template_id: int, db: AsyncSession = Depends(get_db)):
-    result = await apply_template_to_issue(db, issue_id, template_id)
+async def apply_template_to_issue_endpoint(
+    issue_id: int,
+    template_id: int,
+    values: Optional[Dict[str, Any]] = Body(None, description="Values for the template's fields"),
+    db: AsyncSession = Depends(get_db)
+):
+    try:
+        result = await apply_template_to_issue(db, issue_id, template_id, values)
+    except TemplateRenderError as exc:
+        raise HTTPException(status_code=400, detail=exc.errors)
     if result:
         return {"message": "Template applied successfully"}
     else:
         raise HTTPException(status_code=400, detail="Failed to apply template")
+
+@router.post("/{template_id}/apply", response_model=BulkResult)
+async def apply_template_to_issues_endpoint(
+    template_id: int, items: List[TemplateApplyItem], db: AsyncSession = Depends(get_db)
+):
+    """
+    Render one template against many issues and update them in a single transaction.
+    """
+    try:
+        outcomes = await apply_template_to_issues(db, template_id, [(item.issue_id, item.values) for item in items])
+    except TemplateSyntaxError as exc:
+        # A template stored before it was validated
+        raise HTTPException(status_code=400, detail=exc.errors)
+    if outcomes is None:
+        raise HTTPException(status_code=404, detail="Template not found")
+    results = [
+        BulkItemResult(index=i, success=error is None, id=item.issue_id, error=error)
+        for i, (item, error) in enumerate(zip(items, outcomes))
+    ]
+    created = sum(result.success for result in results)
+    return BulkResult(created=created, failed=len(results) - created, results=results)
@@ -0,0 +1,35 @@
+import json
+
+from fastapi import APIRouter, Header, HTTPException, Request
+from typing import Optional
+
+from ...config import settings
+from ...utils.webhooks import verify_signature, webhook_consumer
+
+router = APIRouter()
+
+@router.post("/github", status_code=202)
+async def github_webhook(
+    request: Request,
+    x_github_event: str = Header(...),
+    x_hub_signature_256: Optional[str] = Header(None),
+    x_github_delivery: Optional[str] = Header(None),
+):
+    """
+    Receive a GitHub webhook delivery. The event is verified and queued and
+    the request acknowledged straight away; it is applied in the background.
+    """
+    if not settings.GITHUB_WEBHOOK_SECRET:
+        raise HTTPException(status_code=503, detail="Webhook secret not configured")
+    body = await request.body()
+    if not verify_signature(settings.GITHUB_WEBHOOK_SECRET, body, x_hub_signature_256):
+        raise HTTPException(status_code=401, detail="Invalid signature")
+    if x_github_event == "ping":
+        return {"message": "pong"}
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid JSON payload")
+    if not webhook_consumer.submit(x_github_event, payload, x_github_delivery):
+        raise HTTPException(status_code=503, detail="Webhook queue is full")
+    return {"message": "Accepted"}
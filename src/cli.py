@@ -0,0 +1,100 @@
+import argparse
+import asyncio
+import logging
+
+from .config import settings
+from .database import AsyncSessionLocal, dispose_engines
+from . import main  # noqa: F401  importing the app registers every model's table
+from .utils.bootstrap import ensure_schema
+
+async def _rebuild_stats(args: argparse.Namespace) -> None:
+    from .crud.project_stats import rebuild_project_stats
+
+    async with AsyncSessionLocal() as db:
+        rebuilt = await rebuild_project_stats(db, args.project)
+    print(f"Rebuilt statistics for {rebuilt} project(s)")
+
+async def _rebuild_search_index(args: argparse.Namespace) -> None:
+    from .crud.search import rebuild_search_index
+
+    async with AsyncSessionLocal() as db:
+        indexed = await rebuild_search_index(db)
+    print(f"Indexed {indexed} issue(s)")
+
+async def _sync_github(args: argparse.Namespace) -> None:
+    from .utils.reconcile import reconcile
+
+    for name, result in (await reconcile(full=args.full, prune=args.prune)).items():
+        print(f"{name}: {result.fetched} fetched, {result.changed} changed, {result.pruned} pruned in {result.seconds:.1f}s")
+
+async def _track_commits(args: argparse.Namespace) -> None:
+    from .utils.commit_tracker import track_commits
+
+    async with AsyncSessionLocal() as db:
+        result = await track_commits(db, args.range, args.repo, dry_run=args.dry_run, update_github=not args.local_only)
+    for number, status in sorted(result.updated.items(), key=lambda item: int(item[0])):
+        print(f"#{number} -> {status}")
+    verb = "would update" if args.dry_run else "updated"
+    print(f"{result.commits} commits, {result.referenced} issues referenced, {verb} {len(result.updated)}, {len(result.failed)} failed")
+
+async def _archive_issues(args: argparse.Namespace) -> None:
+    from .utils.archive import archive_issues
+
+    run = await archive_issues(args.older_than, vacuum=args.vacuum)
+    print(
+        f"Archived {run.moved} issue(s) in {run.batches} batch(es): "
+        f"{run.body_bytes} body bytes stored as {run.compressed_bytes} in {run.seconds:.1f}s"
+    )
+
+async def _run(args: argparse.Namespace) -> None:
+    await ensure_schema()
+    try:
+        await args.handler(args)
+    finally:
+        await dispose_engines()
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m src.cli", description="Project management maintenance commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    rebuild = commands.add_parser("rebuild-stats", help="Recompute per-project issue counters from scratch")
+    rebuild.add_argument("--project", type=int, default=None, help="Only rebuild this project")
+    rebuild.set_defaults(handler=_rebuild_stats)
+
+    reindex = commands.add_parser("rebuild-search-index", help="Re-index every issue for full-text search (SQLite)")
+    reindex.set_defaults(handler=_rebuild_search_index)
+
+    sync = commands.add_parser("sync-github", help="Reconcile local projects and issues with GitHub")
+    sync.add_argument("--full", action="store_true", help="Ignore the stored watermarks and re-read everything")
+    sync.add_argument("--prune", action="store_true", help="With --full, delete local rows that no longer exist on GitHub")
+    sync.set_defaults(handler=_sync_github)
+
+    track = commands.add_parser("track-commits", help="Update issue statuses from the references in a range of commits")
+    track.add_argument("range", help="git revision range, e.g. BEFORE..AFTER of a push")
+    track.add_argument("--repo", default=".", help="Path of the git checkout")
+    track.add_argument("--dry-run", action="store_true", help="Print the status changes without applying them")
+    track.add_argument("--local-only", action="store_true", help="Update the local database only, not GitHub")
+    track.set_defaults(handler=_track_commits)
+
+    archive = commands.add_parser("archive-issues", help="Move long-closed issues into the compressed archive")
+    archive.add_argument("--older-than", type=float, default=None, help="Days closed and untouched (default: ARCHIVE_AFTER_DAYS)")
+    archive.add_argument("--vacuum", action="store_true", help="VACUUM a SQLite database afterwards to shrink the file")
+    archive.set_defaults(handler=_archive_issues)
+
+    serve = commands.add_parser("serve", help="Run the API with pre-forked workers")
+    serve.add_argument("--host", default=settings.SERVER_HOST)
+    serve.add_argument("--port", type=int, default=settings.SERVER_PORT)
+    serve.add_argument("--workers", type=int, default=settings.SERVER_WORKERS)
+    serve.set_defaults(handler=None)
+
+    args = parser.parse_args(argv)
+    if args.command == "serve":
+        from .server import serve as run_server
+
+        logging.basicConfig(level=logging.INFO)
+        run_server(args.host, args.port, args.workers)
+        return
+    asyncio.run(_run(args))
+
+if __name__ == "__main__":
+    main()
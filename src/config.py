@@ -12,8 +12,95 @@ class Settings:
     PROJECT_VERSION: str = "1.0.0"
     
     GITHUB_CLI_PATH: str = os.getenv("GITHUB_CLI_PATH", "gh")
+    # "cli" runs gh subprocesses; "http" calls the API over a keep-alive pool (needs httpx)
+    GITHUB_TRANSPORT: str = os.getenv("GITHUB_TRANSPORT", "cli")
+    GITHUB_API_URL: str = os.getenv("GITHUB_API_URL", "https://api.github.com")
+    GITHUB_REPOSITORY: str = os.getenv("GITHUB_REPOSITORY")  # owner/name, for REST calls
     GITHUB_TOKEN: str = os.getenv("GITHUB_TOKEN")
+    GITHUB_CLI_MAX_CONCURRENCY: int = int(os.getenv("GITHUB_CLI_MAX_CONCURRENCY", "4"))
+    GITHUB_CLI_TIMEOUT: float = float(os.getenv("GITHUB_CLI_TIMEOUT", "30"))
+    GITHUB_REPOSITORY_ID: str = os.getenv("GITHUB_REPOSITORY_ID")
+    GITHUB_OWNER_ID: str = os.getenv("GITHUB_OWNER_ID")
+    GITHUB_RATE_LIMIT_PER_SECOND: float = float(os.getenv("GITHUB_RATE_LIMIT_PER_SECOND", "10"))  # until GitHub reports its own figures
+    GITHUB_RATE_LIMIT_BURST: float = float(os.getenv("GITHUB_RATE_LIMIT_BURST", "20"))
+    GITHUB_RATE_LIMIT_RETRIES: int = int(os.getenv("GITHUB_RATE_LIMIT_RETRIES", "3"))
+    GITHUB_RATE_LIMIT_BACKOFF: float = float(os.getenv("GITHUB_RATE_LIMIT_BACKOFF", "60"))  # when no Retry-After is given
+    GITHUB_RATE_LIMIT_MAX_WAIT: float = float(os.getenv("GITHUB_RATE_LIMIT_MAX_WAIT", "120"))
+    GITHUB_GRAPHQL_BATCH_SIZE: int = int(os.getenv("GITHUB_GRAPHQL_BATCH_SIZE", "50"))
     
-    DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./project_manager.db")
+    GITHUB_WEBHOOK_SECRET: str = os.getenv("GITHUB_WEBHOOK_SECRET")
+    WEBHOOK_COALESCE_WINDOW: float = float(os.getenv("WEBHOOK_COALESCE_WINDOW", "0.5"))
+    WEBHOOK_BATCH_SIZE: int = int(os.getenv("WEBHOOK_BATCH_SIZE", "5000"))
+    WEBHOOK_QUEUE_SIZE: int = int(os.getenv("WEBHOOK_QUEUE_SIZE", "100000"))
+    GITHUB_SYNC_PAGE_SIZE: int = int(os.getenv("GITHUB_SYNC_PAGE_SIZE", "100"))
+    GITHUB_SYNC_INTERVAL: float = float(os.getenv("GITHUB_SYNC_INTERVAL", "0"))  # seconds; 0 disables
+
+    ARCHIVE_AFTER_DAYS: float = float(os.getenv("ARCHIVE_AFTER_DAYS", "180"))  # closed and untouched this long
+    ARCHIVE_INTERVAL: float = float(os.getenv("ARCHIVE_INTERVAL", "0"))  # seconds between archive runs; 0 disables
+    ARCHIVE_BATCH_SIZE: int = int(os.getenv("ARCHIVE_BATCH_SIZE", "1000"))
+    ARCHIVE_COMPRESSION: str = os.getenv("ARCHIVE_COMPRESSION", "auto").lower()  # auto, zstd or zlib
+    ARCHIVE_COMPRESSION_LEVEL: int = int(os.getenv("ARCHIVE_COMPRESSION_LEVEL", "6"))
+    
+    OUTBOX_POLL_INTERVAL: float = float(os.getenv("OUTBOX_POLL_INTERVAL", "1"))
+    OUTBOX_COALESCE_WINDOW: float = float(os.getenv("OUTBOX_COALESCE_WINDOW", "0.25"))
+    OUTBOX_BATCH_SIZE: int = int(os.getenv("OUTBOX_BATCH_SIZE", "100"))
+    OUTBOX_MAX_ATTEMPTS: int = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "8"))
+    OUTBOX_BACKOFF_BASE: float = float(os.getenv("OUTBOX_BACKOFF_BASE", "2"))
+    OUTBOX_BACKOFF_MAX: float = float(os.getenv("OUTBOX_BACKOFF_MAX", "600"))
+    OUTBOX_RETENTION_DAYS: float = float(os.getenv("OUTBOX_RETENTION_DAYS", "7"))  # applied entries kept this long
+    OUTBOX_PRUNE_INTERVAL: float = float(os.getenv("OUTBOX_PRUNE_INTERVAL", "3600"))  # seconds; 0 disables pruning
+    
+    CLOSED_ISSUE_STATUSES: frozenset = frozenset(
+        status.strip().lower() for status in os.getenv("CLOSED_ISSUE_STATUSES", "closed,done,resolved").split(",")
+    )
+    
+    CHANGE_FEED_BUFFER_SIZE: int = int(os.getenv("CHANGE_FEED_BUFFER_SIZE", "10000"))  # events kept for resuming
+    CHANGE_FEED_SUBSCRIBER_QUEUE: int = int(os.getenv("CHANGE_FEED_SUBSCRIBER_QUEUE", "1000"))
+    CHANGE_FEED_HEARTBEAT: float = float(os.getenv("CHANGE_FEED_HEARTBEAT", "15"))
+    DEPENDENCY_GRAPH_CACHE_SIZE: int = int(os.getenv("DEPENDENCY_GRAPH_CACHE_SIZE", "64"))  # projects
+    TEMPLATE_CACHE_SIZE: int = int(os.getenv("TEMPLATE_CACHE_SIZE", "1024"))
+    TEMPLATE_MANIFEST_PATH: str = os.getenv("TEMPLATE_MANIFEST_PATH", ".template_manifest.json")
+    TEMPLATE_SYNC_PARALLEL_THRESHOLD: int = int(os.getenv("TEMPLATE_SYNC_PARALLEL_THRESHOLD", "256"))
+    
+    # "memory" (per-process LRU) or "none"
+    RESPONSE_CACHE_BACKEND: str = os.getenv("RESPONSE_CACHE_BACKEND", "memory")
+    RESPONSE_CACHE_TTL: float = float(os.getenv("RESPONSE_CACHE_TTL", "60"))
+    RESPONSE_CACHE_MAX_ENTRIES: int = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "10000"))
+    
+    # Serve list endpoints from column rows encoded straight to JSON bytes
+    FAST_LIST_RESPONSES: bool = os.getenv("FAST_LIST_RESPONSES", "false").lower() in ("1", "true", "yes")
+    
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+    SLOW_REQUEST_THRESHOLD: float = float(os.getenv("SLOW_REQUEST_THRESHOLD", "0"))  # seconds; 0 disables the slow-request log
+    EVENT_LOOP_LAG_INTERVAL: float = float(os.getenv("EVENT_LOOP_LAG_INTERVAL", "0.5"))  # seconds between lag samples
+    # Directory where worker processes share metric snapshots; the serve command sets one up
+    METRICS_DIR: str = os.getenv("METRICS_DIR")
+    METRICS_SYNC_INTERVAL: float = float(os.getenv("METRICS_SYNC_INTERVAL", "1"))  # seconds between snapshots
+    
+    SERVER_HOST: str = os.getenv("SERVER_HOST", "127.0.0.1")
+    SERVER_PORT: int = int(os.getenv("SERVER_PORT", "8000"))
+    SERVER_WORKERS: int = int(os.getenv("SERVER_WORKERS", str(os.cpu_count() or 1)))
+    # Serializes schema/template bootstrap across processes starting together
+    BOOTSTRAP_LOCK_PATH: str = os.getenv("BOOTSTRAP_LOCK_PATH", ".bootstrap.lock")
+    # Held by the one worker that runs the outbox worker and reconciliation scheduler
+    LEADER_LOCK_PATH: str = os.getenv("LEADER_LOCK_PATH", ".leader.lock")
+    # Directory of per-worker sockets for cache invalidations; the serve command sets one up
+    CACHE_BUS_DIR: str = os.getenv("CACHE_BUS_DIR")
+    
+    # `or`, not a getenv default: CI sets the variable to "" when its secret is missing
+    DATABASE_URL: str = os.getenv("DATABASE_URL") or "sqlite+aiosqlite:///./project_manager.db"
+    # Optional replica that GET requests and exports read from
+    DATABASE_READ_URL: str = os.getenv("DATABASE_READ_URL")
+    DATABASE_ECHO: bool = os.getenv("DATABASE_ECHO", "false").lower() in ("1", "true", "yes")
+    DATABASE_POOL_SIZE: int = int(os.getenv("DATABASE_POOL_SIZE", "10"))
+    DATABASE_MAX_OVERFLOW: int = int(os.getenv("DATABASE_MAX_OVERFLOW", "20"))
+    DATABASE_POOL_TIMEOUT: float = float(os.getenv("DATABASE_POOL_TIMEOUT", "30"))
+    DATABASE_POOL_RECYCLE: int = int(os.getenv("DATABASE_POOL_RECYCLE", "1800"))
+    
+    SQLITE_JOURNAL_MODE: str = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+    SQLITE_SYNCHRONOUS: str = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+    SQLITE_BUSY_TIMEOUT: int = int(os.getenv("SQLITE_BUSY_TIMEOUT", "5000"))  # milliseconds
+    SQLITE_MMAP_SIZE: int = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+    SQLITE_CACHE_SIZE: int = int(os.getenv("SQLITE_CACHE_SIZE", "-64000"))  # negative means KiB
 
 settings = Settings()
@@ -0,0 +1,231 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy import delete, func, update
+from typing import Iterable, List, Optional
+
+from ..models.issue import Issue
+from ..models.issue_archive import ArchivedIssue
+from ..models.project import Project
+from ..models.github_sync import GitHubRecordHash, GitHubSyncState
+from ..utils.change_feed import change, stage_changes
+from ..utils.response_cache import response_cache
+from .issue import record_changes
+from .project_stats import delete_project_stats, is_closed, record_issue_changes
+from .search import index_issues, unindex_issues
+from .issue_dependency import delete_issue_dependencies
+from .issue_archive import restore_archived_issues
+from .upsert import dialect_insert
+
+# Rows per upsert statement, to stay under the bound-parameter limit
+UPSERT_CHUNK_SIZE = 500
+
+# Writes in this module mirror changes that came from GitHub, so unlike the
+# rest of crud they never enqueue outbox entries.
+
+def _resolve_status(state: Optional[str], previous) -> Optional[str]:
+    # GitHub only knows open/closed, so a local status is only overwritten
+    # when it disagrees with the remote state (e.g. "in_progress" survives an
+    # edit of an open issue, but closing the issue on GitHub sets "closed")
+    if state is None:
+        return None if previous is not None else "open"
+    state = state.lower()
+    if previous is not None and is_closed(previous.status) == (state == "closed"):
+        return None
+    return state
+
+async def upsert_issues_by_github_id(db: AsyncSession, rows: List[dict]) -> List[int]:
+    """
+    Insert or update issues keyed on github_id, keeping counters, status
+    events and the search index in step. Each row needs github_id, title and
+    body, and may carry the GitHub "state" and a "project_github_id"; the
+    project is only attached to issues that have none yet. Returns the
+    affected issue ids. Does not commit.
+    """
+    if not rows:
+        return []
+    github_ids = [row["github_id"] for row in rows]
+    # Archived issues that changed on GitHub come back into the hot table first
+    await restore_archived_issues(db, github_ids=github_ids)
+    # Locked, so the counters are moved from the status the upsert actually replaces
+    result = await db.execute(
+        select(Issue.github_id, Issue.project_id, Issue.status).where(Issue.github_id.in_(github_ids)).with_for_update()
+    )
+    existing = {row.github_id: row for row in result}
+    project_github_ids = {row["project_github_id"] for row in rows if row.get("project_github_id")}
+    projects = {}
+    if project_github_ids:
+        result = await db.execute(select(Project.github_id, Project.id).where(Project.github_id.in_(project_github_ids)))
+        projects = dict(result.all())
+
+    insert = dialect_insert(db)
+    changes, indexed, staged = [], [], []
+    for start in range(0, len(rows), UPSERT_CHUNK_SIZE):
+        chunk = [
+            {
+                "github_id": row["github_id"],
+                "title": row["title"],
+                "body": row.get("body") or "",
+                "status": _resolve_status(row.get("state"), existing.get(row["github_id"])),
+                "project_id": projects.get(row.get("project_github_id")),
+            }
+            for row in rows[start:start + UPSERT_CHUNK_SIZE]
+        ]
+        statement = insert(Issue).values(chunk)
+        statement = statement.on_conflict_do_update(
+            index_elements=[Issue.github_id],
+            set_={
+                "title": statement.excluded.title,
+                "body": statement.excluded.body,
+                "status": func.coalesce(statement.excluded.status, Issue.status),
+                "project_id": func.coalesce(Issue.project_id, statement.excluded.project_id),
+                "updated_at": func.now(),
+            },
+        ).returning(Issue.id, Issue.github_id, Issue.project_id, Issue.status, Issue.title, Issue.body)
+        for row in await db.execute(statement):
+            previous = existing.get(row.github_id)
+            # An issue that just got its project counts as created in that project
+            old_status = previous.status if previous is not None and previous.project_id is not None else None
+            changes.append((row.id, row.project_id, old_status, row.status))
+            indexed.append((row.id, row.title, row.body))
+            staged.append(change("issue", "upsert", row.id, row.project_id, {
+                "title": row.title, "body": row.body, "status": row.status, "project_id": row.project_id,
+            }))
+
+    await record_changes(db, changes)
+    await index_issues(db, indexed)
+    stage_changes(db, staged)
+    return [issue_id for issue_id, _, _ in indexed]
+
+async def delete_issues_by_github_id(db: AsyncSession, github_ids: Iterable[str]) -> List[int]:
+    """Delete issues by github_id with their derived state. Does not commit."""
+    github_ids = list(github_ids)
+    if not github_ids:
+        return []
+    await restore_archived_issues(db, github_ids=github_ids)
+    result = await db.execute(
+        delete(Issue)
+        .where(Issue.github_id.in_(github_ids))
+        .returning(Issue.id, Issue.project_id, Issue.status)
+    )
+    deleted = result.all()
+    await record_changes(db, [(row.id, row.project_id, row.status, None) for row in deleted])
+    await unindex_issues(db, [row.id for row in deleted])
+    stage_changes(db, [change("issue", "delete", row.id, row.project_id) for row in deleted])
+    await delete_issue_dependencies(db, [row.id for row in deleted])
+    return [row.id for row in deleted]
+
+async def upsert_projects_by_github_id(db: AsyncSession, rows: List[dict]) -> List[int]:
+    """
+    Insert or update projects keyed on github_id; each row needs github_id,
+    name and description. Returns the affected project ids. Does not commit.
+    """
+    insert = dialect_insert(db)
+    ids = []
+    for start in range(0, len(rows), UPSERT_CHUNK_SIZE):
+        statement = insert(Project).values(rows[start:start + UPSERT_CHUNK_SIZE])
+        statement = statement.on_conflict_do_update(
+            index_elements=[Project.github_id],
+            set_={
+                "name": statement.excluded.name,
+                "description": statement.excluded.description,
+                "updated_at": func.now(),
+            },
+        ).returning(Project.id, Project.name, Project.description)
+        for row in await db.execute(statement):
+            ids.append(row.id)
+            stage_changes(db, [change("project", "upsert", row.id, row.id, {"name": row.name, "description": row.description})])
+    return ids
+
+async def delete_projects_by_github_id(db: AsyncSession, github_ids: Iterable[str]) -> List[int]:
+    github_ids = list(github_ids)
+    if not github_ids:
+        return []
+    result = await db.execute(delete(Project).where(Project.github_id.in_(github_ids)).returning(Project.id))
+    ids = list(result.scalars().all())
+    for project_id in ids:
+        await delete_project_stats(db, project_id)
+    stage_changes(db, [change("project", "delete", project_id, project_id) for project_id in ids])
+    return ids
+
+async def claim_github_id(db: AsyncSession, entity_type: str, entity_id: int, github_id: str) -> List[int]:
+    """
+    Write the github_id a create returned back onto the local entity. A
+    webhook or sync that mirrored the new record before this write-back
+    inserted its own row under that github_id; that row is merged into the
+    local entity and deleted rather than left to break the unique constraint.
+    Returns the ids of the deleted rows. Does not commit.
+    """
+    model = Issue if entity_type == "issue" else Project
+    result = await db.execute(select(model.id).where(model.github_id == github_id, model.id != entity_id))
+    duplicates = list(result.scalars().all())
+    if duplicates:
+        if entity_type == "issue":
+            await delete_issues_by_github_id(db, [github_id])
+        else:
+            # Issues the sync already attached to the mirrored project move across
+            result = await db.execute(
+                update(Issue).where(Issue.project_id.in_(duplicates)).values(project_id=entity_id)
+                .returning(Issue.id, Issue.project_id, Issue.status)
+            )
+            moved = result.all()
+            await db.execute(update(ArchivedIssue).where(ArchivedIssue.project_id.in_(duplicates)).values(project_id=entity_id))
+            await record_issue_changes(db, [(row.id, entity_id, None, row.status) for row in moved])
+            stage_changes(db, [change("issue", "upsert", row.id, entity_id, {"project_id": entity_id}) for row in moved])
+            await delete_projects_by_github_id(db, [github_id])
+    await db.execute(update(model).where(model.id == entity_id).values(github_id=github_id))
+    return duplicates
+
+async def apply_github_changes(
+    db: AsyncSession,
+    issues: List[dict] = (),
+    deleted_issues: Iterable[str] = (),
+    projects: List[dict] = (),
+    deleted_projects: Iterable[str] = (),
+) -> None:
+    """
+    Apply a batch of GitHub-side changes and commit it, together with
+    anything else already pending in the session, as one transaction.
+    """
+    project_ids = await upsert_projects_by_github_id(db, list(projects))
+    issue_ids = await upsert_issues_by_github_id(db, list(issues))
+    issue_ids += await delete_issues_by_github_id(db, deleted_issues)
+    project_ids += await delete_projects_by_github_id(db, deleted_projects)
+    await db.commit()
+    if issue_ids:
+        await response_cache.invalidate("issue", *issue_ids)
+    if project_ids:
+        await response_cache.invalidate("project", *project_ids)
+
+async def get_sync_watermark(db: AsyncSession, scope: str) -> Optional[str]:
+    return await db.scalar(select(GitHubSyncState.watermark).where(GitHubSyncState.scope == scope))
+
+async def set_sync_watermark(db: AsyncSession, scope: str, watermark: Optional[str]) -> None:
+    """Record the watermark for a scope. Does not commit."""
+    statement = dialect_insert(db)(GitHubSyncState).values(scope=scope, watermark=watermark)
+    await db.execute(statement.on_conflict_do_update(
+        index_elements=[GitHubSyncState.scope],
+        set_={"watermark": statement.excluded.watermark, "last_run_at": func.now()},
+    ))
+
+async def get_record_hashes(db: AsyncSession, entity_type: str, github_ids: Iterable[str]) -> dict[str, str]:
+    result = await db.execute(
+        select(GitHubRecordHash.github_id, GitHubRecordHash.hash)
+        .where(GitHubRecordHash.entity_type == entity_type, GitHubRecordHash.github_id.in_(list(github_ids)))
+    )
+    return dict(result.all())
+
+async def save_record_hashes(db: AsyncSession, entity_type: str, hashes: dict[str, str]) -> None:
+    """Upsert the applied record hashes. Does not commit."""
+    rows = [{"entity_type": entity_type, "github_id": github_id, "hash": digest} for github_id, digest in hashes.items()]
+    insert = dialect_insert(db)
+    for start in range(0, len(rows), UPSERT_CHUNK_SIZE):
+        statement = insert(GitHubRecordHash).values(rows[start:start + UPSERT_CHUNK_SIZE])
+        await db.execute(statement.on_conflict_do_update(
+            index_elements=[GitHubRecordHash.entity_type, GitHubRecordHash.github_id],
+            set_={"hash": statement.excluded.hash},
+        ))
+
+async def get_local_github_ids(db: AsyncSession, entity_type: str) -> set[str]:
+    model = Issue if entity_type == "issue" else Project
+    result = await db.execute(select(model.github_id).where(model.github_id.isnot(None)))
+    return set(result.scalars().all())
@@ -1,35 +1,246 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import update, delete
-from typing import List
+from sqlalchemy import update, delete, insert
+import time
+from datetime import datetime
+from typing import List, Optional, Union
 
 from ..models.issue import Issue
-from ..schemas.issue import IssueCreate, IssueUpdate
+from ..models.project import Project
+from ..schemas.issue import Issue as IssueSchema, IssueCreate, IssueUpdate
+from .outbox import enqueue_outbox, enqueue_outbox_many
+from .project_stats import IssueChange, record_issue_changes
+from .issue_events import record_status_events
+from ..utils.change_feed import change, stage_changes
+from ..utils.response_cache import response_cache
+from ..utils.serialization import schema_columns
+from ..utils.pagination import keyset_by_updated
+from .search import index_issues, reindex_issues, unindex_issues
+from .issue_dependency import delete_issue_dependencies
+from .issue_archive import delete_archived_issue, get_archived_issue, restore_archived_issues
+from ..utils.metrics import issue_archive_reads
+
+SEARCHABLE_FIELDS = {"title", "body"}
+
+async def record_changes(db: AsyncSession, changes: List[IssueChange]) -> None:
+    # Derived state kept in the same transaction as the issue write itself
+    await record_issue_changes(db, changes)
+    await record_status_events(db, changes)
 
 async def create_issue(db: AsyncSession, issue: IssueCreate):
     db_issue = Issue(**issue.dict())
     db.add(db_issue)
+    await db.flush()
+    enqueue_outbox(db, "issue", db_issue.id, "create", issue.dict())
+    await record_changes(db, [(db_issue.id, issue.project_id, None, issue.status)])
+    await index_issues(db, [(db_issue.id, issue.title, issue.body)])
+    stage_changes(db, [change("issue", "upsert", db_issue.id, issue.project_id, issue.dict())])
     await db.commit()
     await db.refresh(db_issue)
     return db_issue
 
+async def create_issues(db: AsyncSession, issues: List[IssueCreate]) -> List[Union[int, str]]:
+    """
+    Insert many issues and their outbox entries in a single transaction.
+    Returns, per input item, the new issue id or an error message.
+    """
+    project_ids = {issue.project_id for issue in issues}
+    result = await db.execute(select(Project.id).where(Project.id.in_(project_ids)))
+    known_projects = set(result.scalars().all())
+
+    rows = [issue.dict() for issue in issues if issue.project_id in known_projects]
+    ids: List[int] = []
+    if rows:
+        result = await db.execute(insert(Issue).returning(Issue.id, sort_by_parameter_order=True), rows)
+        ids = result.scalars().all()
+        await enqueue_outbox_many(db, "issue", "create", list(zip(ids, rows)))
+        await record_changes(db, [(issue_id, row["project_id"], None, row["status"]) for issue_id, row in zip(ids, rows)])
+        await index_issues(db, [(issue_id, row["title"], row["body"]) for issue_id, row in zip(ids, rows)])
+        stage_changes(db, [change("issue", "upsert", issue_id, row["project_id"], row) for issue_id, row in zip(ids, rows)])
+    await db.commit()
+
+    new_ids = iter(ids)
+    return [
+        next(new_ids) if issue.project_id in known_projects else f"Project {issue.project_id} not found"
+        for issue in issues
+    ]
+
 async def get_issue(db: AsyncSession, issue_id: int):
+    """The issue, from the hot table or else the archive (an ArchivedIssue reads the same)."""
     result = await db.execute(select(Issue).filter(Issue.id == issue_id))
-    return result.scalars().first()
+    db_issue = result.scalars().first()
+    if db_issue is None:
+        started = time.perf_counter()
+        db_issue = await get_archived_issue(db, issue_id)
+        if db_issue is not None:
+            issue_archive_reads.observe(value=time.perf_counter() - started)
+    return db_issue
 
-async def update_issue(db: AsyncSession, issue_id: int, issue: IssueUpdate):
-    await db.execute(
-        update(Issue)
-        .where(Issue.id == issue_id)
-        .values(**issue.dict(exclude_unset=True))
+async def update_issue(db: AsyncSession, issue_id: int, issue: IssueUpdate) -> Optional[Issue]:
+    """
+    Apply the set fields with a single UPDATE ... RETURNING and return the
+    updated issue, or None if it does not exist.
+    """
+    values = issue.dict(exclude_unset=True)
+    if not values:
+        return await get_issue(db, issue_id)
+    old_status = None
+    if "status" in values:
+        # RETURNING only sees the new row; the transition needs the old status,
+        # locked so a concurrent writer can't change it in between
+        old_status = await db.scalar(select(Issue.status).where(Issue.id == issue_id).with_for_update())
+    statement = update(Issue).where(Issue.id == issue_id).values(**values).returning(Issue)
+    db_issue = (await db.execute(statement)).scalars().first()
+    if db_issue is None:
+        # Editing an archived issue brings it back into the hot table
+        restored = await restore_archived_issues(db, issue_ids=[issue_id])
+        if restored:
+            old_status = restored[0].status
+            db_issue = (await db.execute(statement)).scalars().first()
+    if db_issue is None:
+        await db.rollback()
+        return None
+    enqueue_outbox(db, "issue", issue_id, "update", values)
+    await record_changes(db, [
+        (issue_id, db_issue.project_id, old_status if "status" in values else db_issue.status, db_issue.status)
+    ])
+    if SEARCHABLE_FIELDS & values.keys():
+        await index_issues(db, [(issue_id, db_issue.title, db_issue.body)])
+    stage_changes(db, [change("issue", "upsert", issue_id, db_issue.project_id, values)])
+    await db.commit()
+    await response_cache.invalidate("issue", issue_id)
+    return db_issue
+
+async def update_issues(db: AsyncSession, updates: List[dict], enqueue: bool = True) -> None:
+    """
+    Apply many per-issue updates (each a dict with "id" plus the changed
+    columns) as one executemany UPDATE, with their outbox entries, in a
+    single transaction. enqueue=False skips the outbox for changes the caller
+    has already made on GitHub.
+    """
+    if not updates:
+        return
+    result = await db.execute(
+        select(Issue.id, Issue.project_id, Issue.status)
+        .where(Issue.id.in_([values["id"] for values in updates]))
+        .with_for_update()
     )
+    current = {row.id: row for row in result}
+    missing = [values["id"] for values in updates if values["id"] not in current]
+    if missing:
+        for row in await restore_archived_issues(db, issue_ids=missing):
+            current[row.id] = row
+    await db.execute(update(Issue), updates)
+    changes = []
+    for values in updates:
+        row = current.get(values["id"])
+        if row is not None:
+            changes.append((row.id, row.project_id, row.status, values.get("status", row.status)))
+    await record_changes(db, changes)
+    stage_changes(db, [
+        change("issue", "upsert", values["id"], current[values["id"]].project_id, {k: v for k, v in values.items() if k != "id"})
+        for values in updates if values["id"] in current
+    ])
+    await reindex_issues(db, [values["id"] for values in updates if SEARCHABLE_FIELDS & values.keys()])
+    if enqueue:
+        await enqueue_outbox_many(
+            db, "issue", "update",
+            [(values["id"], {k: v for k, v in values.items() if k != "id"}) for values in updates],
+        )
     await db.commit()
-    return await get_issue(db, issue_id)
+    await response_cache.invalidate("issue", *(values["id"] for values in updates))
 
-async def delete_issue(db: AsyncSession, issue_id: int):
-    await db.execute(delete(Issue).where(Issue.id == issue_id))
+async def delete_issue(db: AsyncSession, issue_id: int) -> bool:
+    """Delete an issue with a single DELETE ... RETURNING. Returns False if it did not exist."""
+    result = await db.execute(
+        delete(Issue)
+        .where(Issue.id == issue_id)
+        .returning(Issue.github_id, Issue.project_id, Issue.status)
+    )
+    deleted = result.first() or await delete_archived_issue(db, issue_id)
+    if deleted is None:
+        await db.rollback()
+        return False
+    enqueue_outbox(db, "issue", issue_id, "delete", {}, github_id=deleted.github_id)
+    await record_changes(db, [(issue_id, deleted.project_id, deleted.status, None)])
+    await unindex_issues(db, [issue_id])
+    await delete_issue_dependencies(db, [issue_id])
+    stage_changes(db, [change("issue", "delete", issue_id, deleted.project_id)])
     await db.commit()
+    await response_cache.invalidate("issue", issue_id)
+    return True
+
+def issue_filters(
+    project_id: Optional[int] = None,
+    status: Optional[str] = None,
+    updated_since: Optional[datetime] = None,
+) -> list:
+    filters = []
+    if project_id is not None:
+        filters.append(Issue.project_id == project_id)
+    if status is not None:
+        filters.append(Issue.status == status)
+    if updated_since is not None:
+        filters.append(Issue.updated_at >= updated_since)
+    return filters
 
-async def get_issues(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[Issue]:
-    result = await db.execute(select(Issue).offset(skip).limit(limit))
+def select_issue_rows(
+    project_id: Optional[int] = None,
+    status: Optional[str] = None,
+    updated_since: Optional[datetime] = None,
+):
+    # Plain column tuples for exports: no ORM identity map, no per-row objects
+    return (
+        select(
+            Issue.id, Issue.title, Issue.body, Issue.status, Issue.github_id,
+            Issue.project_id, Issue.created_at, Issue.updated_at,
+        )
+        .where(*issue_filters(project_id, status, updated_since))
+        .order_by(Issue.id)
+    )
+
+def _keyset(
+    query,
+    db: AsyncSession,
+    after_id: Optional[int],
+    after_update: Optional[tuple[datetime, int]],
+    updated_since: Optional[datetime],
+):
+    # With updated_since the (updated_at, id) index serves both the filter and
+    # the order, so pages continue from (updated_at, id) rather than id alone
+    if updated_since is not None:
+        return keyset_by_updated(query, db, Issue.updated_at, Issue.id, after_update)
+    if after_id is not None:
+        query = query.where(Issue.id > after_id)
+    return query.order_by(Issue.id)
+
+async def get_issues(
+    db: AsyncSession,
+    limit: int = 100,
+    after_id: Optional[int] = None,
+    after_update: Optional[tuple[datetime, int]] = None,
+    project_id: Optional[int] = None,
+    status: Optional[str] = None,
+    updated_since: Optional[datetime] = None,
+) -> List[Issue]:
+    query = select(Issue).where(*issue_filters(project_id, status, updated_since))
+    query = _keyset(query, db, after_id, after_update, updated_since)
+    result = await db.execute(query.limit(limit))
     return result.scalars().all()
+
+async def get_issue_rows(
+    db: AsyncSession,
+    limit: int = 100,
+    after_id: Optional[int] = None,
+    after_update: Optional[tuple[datetime, int]] = None,
+    project_id: Optional[int] = None,
+    status: Optional[str] = None,
+    updated_since: Optional[datetime] = None,
+) -> list:
+    """Like get_issues, but as column rows keyed by the Issue schema's fields."""
+    query = select(*schema_columns(Issue, IssueSchema)).where(*issue_filters(project_id, status, updated_since))
+    query = _keyset(query, db, after_id, after_update, updated_since)
+    # Core execution on the session's connection skips ORM result processing
+    connection = await db.connection()
+    result = await connection.execute(query.limit(limit))
+    return result.all()
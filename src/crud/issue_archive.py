@@ -0,0 +1,157 @@
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy import delete, func, insert
+from typing import Iterable, List, Optional
+
+from ..config import settings
+from ..models.issue import Issue
+from ..models.issue_archive import ArchivedIssue
+from ..utils.compression import compress_text, decompress_text, default_codec
+from .search import index_issues, unindex_issues
+
+ARCHIVED_COLUMNS = (
+    ArchivedIssue.id, ArchivedIssue.title, ArchivedIssue.status, ArchivedIssue.github_id,
+    ArchivedIssue.project_id, ArchivedIssue.created_at, ArchivedIssue.updated_at,
+)
+
+@dataclass
+class ArchiveBatch:
+    moved: int = 0
+    body_bytes: int = 0
+    compressed_bytes: int = 0
+
+def _compress_rows(rows: list, codec: str) -> list[dict]:
+    archived = []
+    for row in rows:
+        values = row._asdict()
+        body = values.pop("body")
+        values["body_data"] = compress_text(body, codec)
+        values["body_size"] = len(body.encode()) if body else 0
+        values["codec"] = codec
+        archived.append(values)
+    return archived
+
+async def archive_closed_issues(db: AsyncSession, cutoff: datetime, limit: int) -> ArchiveBatch:
+    """
+    Move up to limit issues that are closed and were last updated before
+    cutoff into the archive, in one transaction that it commits. Issue ids
+    are never reused, so an archived issue keeps its id to itself.
+    """
+    candidates = (
+        select(Issue.id)
+        .where(
+            func.lower(Issue.status).in_(settings.CLOSED_ISSUE_STATUSES),
+            Issue.updated_at < cutoff,
+        )
+        .limit(limit)
+    )
+    result = await db.execute(
+        delete(Issue)
+        .where(Issue.id.in_(candidates))
+        .returning(
+            Issue.id, Issue.title, Issue.body, Issue.status, Issue.github_id,
+            Issue.project_id, Issue.created_at, Issue.updated_at,
+        )
+    )
+    rows = result.all()
+    if not rows:
+        await db.rollback()
+        return ArchiveBatch()
+    # Compression is CPU-bound; keep it off the event loop
+    archived = await asyncio.to_thread(_compress_rows, rows, default_codec())
+    await db.execute(insert(ArchivedIssue), archived)
+    await unindex_issues(db, [row.id for row in rows])
+    await db.commit()
+    return ArchiveBatch(
+        moved=len(archived),
+        body_bytes=sum(values["body_size"] for values in archived),
+        compressed_bytes=sum(len(values["body_data"] or b"") for values in archived),
+    )
+
+async def restore_archived_issues(
+    db: AsyncSession, issue_ids: Optional[Iterable[int]] = None, github_ids: Optional[Iterable[str]] = None
+) -> list:
+    """
+    Move archived issues, by id or by github_id, back into the issues table
+    under their original ids. Returns the restored rows (with id, project_id
+    and status). Does not commit.
+    """
+    condition = (
+        ArchivedIssue.id.in_(list(issue_ids)) if issue_ids is not None
+        else ArchivedIssue.github_id.in_(list(github_ids or ()))
+    )
+    result = await db.execute(
+        delete(ArchivedIssue).where(condition).returning(*ARCHIVED_COLUMNS, ArchivedIssue.body_data, ArchivedIssue.codec)
+    )
+    rows = result.all()
+    if not rows:
+        return []
+    restored = []
+    for row in rows:
+        values = row._asdict()
+        values["body"] = decompress_text(values.pop("body_data"), values.pop("codec"))
+        restored.append(values)
+    await db.execute(insert(Issue), restored)
+    await index_issues(db, [(values["id"], values["title"], values["body"]) for values in restored])
+    return rows
+
+async def get_archived_issue(db: AsyncSession, issue_id: int) -> Optional[ArchivedIssue]:
+    result = await db.execute(select(ArchivedIssue).where(ArchivedIssue.id == issue_id))
+    return result.scalars().first()
+
+async def delete_archived_issue(db: AsyncSession, issue_id: int):
+    """Delete an archived issue; returns its (github_id, project_id, status) or None. Does not commit."""
+    result = await db.execute(
+        delete(ArchivedIssue)
+        .where(ArchivedIssue.id == issue_id)
+        .returning(ArchivedIssue.github_id, ArchivedIssue.project_id, ArchivedIssue.status)
+    )
+    return result.first()
+
+def select_archived_issue_rows(
+    project_id: Optional[int] = None,
+    status: Optional[str] = None,
+    updated_since: Optional[datetime] = None,
+):
+    # Same columns as crud.issue.select_issue_rows, with the body still
+    # compressed and its codec appended; decode_archived_rows undoes both
+    filters = []
+    if project_id is not None:
+        filters.append(ArchivedIssue.project_id == project_id)
+    if status is not None:
+        filters.append(ArchivedIssue.status == status)
+    if updated_since is not None:
+        filters.append(ArchivedIssue.updated_at >= updated_since)
+    return (
+        select(
+            ArchivedIssue.id, ArchivedIssue.title, ArchivedIssue.body_data, ArchivedIssue.status,
+            ArchivedIssue.github_id, ArchivedIssue.project_id, ArchivedIssue.created_at,
+            ArchivedIssue.updated_at, ArchivedIssue.codec,
+        )
+        .where(*filters)
+        .order_by(ArchivedIssue.id)
+    )
+
+def decode_archived_rows(rows: List) -> List[tuple]:
+    return [(row[0], row[1], decompress_text(row[2], row[8]), *row[3:8]) for row in rows]
+
+async def get_archive_stats(db: AsyncSession) -> dict:
+    result = await db.execute(select(
+        func.count(),
+        func.coalesce(func.sum(ArchivedIssue.body_size), 0),
+        func.coalesce(func.sum(func.length(ArchivedIssue.body_data)), 0),
+        func.max(ArchivedIssue.archived_at),
+    ))
+    archived, body_bytes, compressed_bytes, last_archived_at = result.one()
+    hot = await db.scalar(select(func.count()).select_from(Issue))
+    return {
+        "hot_issues": hot,
+        "archived_issues": archived,
+        "archived_body_bytes": body_bytes,
+        "archived_compressed_bytes": compressed_bytes,
+        "compression_ratio": body_bytes / compressed_bytes if compressed_bytes else None,
+        "last_archived_at": last_archived_at,
+    }
@@ -0,0 +1,122 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy import delete, func, or_
+from typing import Iterable, List, Optional, Union
+
+from ..config import settings
+from ..models.issue import Issue
+from ..models.issue_dependency import IssueDependency
+from ..models.issue_archive import ArchivedIssue
+from ..utils.change_feed import change, stage_changes
+from ..utils.response_cache import response_cache
+from .upsert import dialect_insert
+
+DEPENDENCY_CYCLE_ERROR = "Dependency would create a cycle"
+
+async def add_dependencies(db: AsyncSession, edges: List[tuple[int, int]]) -> List[Union[int, str]]:
+    """
+    Record (blocker_id, blocked_id) edges in one transaction. Both issues must
+    exist and share a project, and no edge may close a cycle with the
+    project's existing edges or those before it in the batch; existing edges
+    are kept as they are. Returns, per edge, the project id or an error message.
+    """
+    # The graph cache loads through this module
+    from ..utils.dependency_graph import dependency_graphs
+
+    issue_ids = {issue_id for edge in edges for issue_id in edge}
+    result = await db.execute(select(Issue.id, Issue.project_id).where(Issue.id.in_(issue_ids)))
+    projects = dict(result.all())
+
+    outcomes: List[Union[int, str]] = []
+    rows = []
+    added: dict[int, dict[int, list[int]]] = {}  # per project, blocker -> blocked edges of this batch
+    for blocker_id, blocked_id in edges:
+        if blocker_id == blocked_id:
+            outcomes.append("An issue cannot block itself")
+        elif blocker_id not in projects or blocked_id not in projects:
+            outcomes.append("Issue not found")
+        elif projects[blocker_id] is None or projects[blocker_id] != projects[blocked_id]:
+            outcomes.append("Dependent issues must belong to the same project")
+        else:
+            project_id = projects[blocked_id]
+            graph = await dependency_graphs.get(db, project_id)
+            extra = added.setdefault(project_id, {})
+            if graph.reaches(blocked_id, blocker_id, extra):
+                outcomes.append(DEPENDENCY_CYCLE_ERROR)
+                continue
+            extra.setdefault(blocker_id, []).append(blocked_id)
+            outcomes.append(project_id)
+            rows.append({"blocker_id": blocker_id, "blocked_id": blocked_id, "project_id": project_id})
+
+    if rows:
+        insert = dialect_insert(db)
+        for start in range(0, len(rows), 500):
+            await db.execute(insert(IssueDependency).values(rows[start:start + 500]).on_conflict_do_nothing())
+        stage_changes(db, [
+            change("dependency", "upsert", row["blocked_id"], row["project_id"], {"blocker_id": row["blocker_id"]}) for row in rows
+        ])
+        await db.commit()
+        await response_cache.invalidate("dependency", *{row["project_id"] for row in rows})
+    return outcomes
+
+async def remove_dependency(db: AsyncSession, blocker_id: int, blocked_id: int) -> bool:
+    result = await db.execute(
+        delete(IssueDependency)
+        .where(IssueDependency.blocker_id == blocker_id, IssueDependency.blocked_id == blocked_id)
+        .returning(IssueDependency.project_id)
+    )
+    project_id = result.scalar()
+    if project_id is None:
+        await db.rollback()
+        return False
+    stage_changes(db, [change("dependency", "delete", blocked_id, project_id, {"blocker_id": blocker_id})])
+    await db.commit()
+    await response_cache.invalidate("dependency", project_id)
+    return True
+
+async def delete_issue_dependencies(db: AsyncSession, issue_ids: Iterable[int]) -> None:
+    """Drop every edge touching the given issues. Does not commit."""
+    issue_ids = list(issue_ids)
+    if issue_ids:
+        await db.execute(delete(IssueDependency).where(
+            or_(IssueDependency.blocker_id.in_(issue_ids), IssueDependency.blocked_id.in_(issue_ids))
+        ))
+
+async def get_dependency(db: AsyncSession, blocker_id: int, blocked_id: int) -> Optional[IssueDependency]:
+    result = await db.execute(
+        select(IssueDependency)
+        .where(IssueDependency.blocker_id == blocker_id, IssueDependency.blocked_id == blocked_id)
+    )
+    return result.scalars().first()
+
+async def get_dependencies(db: AsyncSession, issue_id: int) -> List[IssueDependency]:
+    """Direct edges of an issue in either direction."""
+    result = await db.execute(
+        select(IssueDependency)
+        .where(or_(IssueDependency.blocked_id == issue_id, IssueDependency.blocker_id == issue_id))
+        .order_by(IssueDependency.blocker_id, IssueDependency.blocked_id)
+    )
+    return result.scalars().all()
+
+async def get_project_dependency_edges(db: AsyncSession, project_id: int) -> List[tuple[int, int]]:
+    result = await db.execute(
+        select(IssueDependency.blocker_id, IssueDependency.blocked_id).where(IssueDependency.project_id == project_id)
+    )
+    return result.tuples().all()
+
+async def get_issue_project_id(db: AsyncSession, issue_id: int) -> tuple[bool, Optional[int]]:
+    """(exists, project_id) for an issue."""
+    row = (await db.execute(select(Issue.project_id).where(Issue.id == issue_id))).first()
+    if row is None:
+        row = (await db.execute(select(ArchivedIssue.project_id).where(ArchivedIssue.id == issue_id))).first()
+    return (False, None) if row is None else (True, row.project_id)
+
+async def get_open_issue_ids(db: AsyncSession, project_id: int) -> set[int]:
+    # Open issues are always in the hot table; closed ones may have been archived
+    result = await db.execute(
+        select(Issue.id).where(
+            Issue.project_id == project_id,
+            or_(Issue.status.is_(None), func.lower(Issue.status).not_in(settings.CLOSED_ISSUE_STATUSES)),
+        )
+    )
+    return set(result.scalars().all())
@@ -0,0 +1,132 @@
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy import insert
+from typing import Iterable, List, Optional
+
+from ..models.issue_event import IssueStatusEvent, BurndownBucket
+from .project_stats import IssueChange, is_closed
+from .upsert import increment_rows
+
+GRANULARITIES = {
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1),
+}
+
+def bucket_start(moment: datetime, granularity: str) -> datetime:
+    moment = moment.replace(minute=0, second=0, microsecond=0)
+    if granularity == "day":
+        moment = moment.replace(hour=0)
+    return moment
+
+def as_utc(moment: datetime) -> datetime:
+    # SQLite returns naive datetimes; everything is stored as UTC
+    return moment.replace(tzinfo=timezone.utc) if moment.tzinfo is None else moment.astimezone(timezone.utc)
+
+async def record_status_events(db: AsyncSession, changes: Iterable[IssueChange], at: Optional[datetime] = None) -> None:
+    """
+    Append an event for every status transition in the batch and roll the
+    transitions into the hourly and daily burndown buckets. Does not commit.
+    """
+    at = at or datetime.now(timezone.utc)
+    events = []
+    deltas: dict[int, list[int]] = defaultdict(lambda: [0, 0, 0])  # opened, closed, deleted
+    for issue_id, project_id, old_status, new_status in changes:
+        if old_status == new_status:
+            continue
+        events.append({
+            "issue_id": issue_id,
+            "project_id": project_id,
+            "from_status": old_status,
+            "to_status": new_status,
+            "created_at": at,
+        })
+        if project_id is None:
+            continue
+        was_open = old_status is not None and not is_closed(old_status)
+        if new_status is None:
+            if was_open:
+                deltas[project_id][2] += 1
+        elif is_closed(new_status):
+            if was_open:
+                deltas[project_id][1] += 1
+        elif not was_open:
+            deltas[project_id][0] += 1
+
+    if not events:
+        return
+    await db.execute(insert(IssueStatusEvent), events)
+
+    rows = [
+        {
+            "project_id": project_id,
+            "granularity": granularity,
+            "bucket_start": bucket_start(at, granularity),
+            "opened": opened,
+            "closed": closed,
+            "deleted": deleted,
+        }
+        for project_id, (opened, closed, deleted) in sorted(deltas.items())
+        if opened or closed or deleted
+        for granularity in GRANULARITIES
+    ]
+    await increment_rows(db, BurndownBucket, ["project_id", "granularity", "bucket_start"], rows)
+
+async def get_burndown_buckets(
+    db: AsyncSession, project_id: int, granularity: str, since: datetime
+) -> List[BurndownBucket]:
+    result = await db.execute(
+        select(BurndownBucket)
+        .where(
+            BurndownBucket.project_id == project_id,
+            BurndownBucket.granularity == granularity,
+            BurndownBucket.bucket_start >= since,
+        )
+        .order_by(BurndownBucket.bucket_start)
+    )
+    return result.scalars().all()
+
+def burndown_series(
+    buckets: List[BurndownBucket], open_now: int, start: datetime, end: datetime, granularity: str
+) -> list[dict]:
+    """
+    Turn buckets into a remaining-open-issues series over [start, end].
+
+    The current open count is walked backwards through the buckets' net
+    changes, so the cost depends on the number of buckets since start, not on
+    the number of issues or events. buckets must cover everything from start
+    up to now.
+    """
+    step = GRANULARITIES[granularity]
+    first, last = bucket_start(as_utc(start), granularity), bucket_start(as_utc(end), granularity)
+    by_start = {as_utc(bucket.bucket_start): bucket for bucket in buckets}
+    remaining = open_now - sum(
+        bucket.opened - bucket.closed - bucket.deleted
+        for moment, bucket in by_start.items()
+        if moment > last
+    )
+    points = []
+    moment = last
+    while moment >= first:
+        bucket = by_start.get(moment)
+        points.append({
+            "timestamp": moment,
+            "remaining": remaining,
+            "opened": bucket.opened if bucket else 0,
+            "closed": bucket.closed if bucket else 0,
+        })
+        if bucket is not None:
+            remaining -= bucket.opened - bucket.closed - bucket.deleted
+        moment -= step
+    points.reverse()
+    return points
+
+async def get_issue_status_events(db: AsyncSession, issue_id: int, limit: int = 100) -> List[IssueStatusEvent]:
+    result = await db.execute(
+        select(IssueStatusEvent)
+        .where(IssueStatusEvent.issue_id == issue_id)
+        .order_by(IssueStatusEvent.id)
+        .limit(limit)
+    )
+    return result.scalars().all()
@@ -0,0 +1,98 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy import delete, exists, insert, or_
+from sqlalchemy.orm import aliased
+from datetime import datetime
+from typing import List, Optional
+
+from ..models.outbox import OutboxEntry
+
+def enqueue_outbox(
+    db: AsyncSession,
+    entity_type: str,
+    entity_id: int,
+    operation: str,
+    payload: dict,
+    github_id: Optional[str] = None,
+) -> OutboxEntry:
+    # Deliberately does not commit: the entry must land in the caller's transaction
+    entry = OutboxEntry(
+        entity_type=entity_type,
+        entity_id=entity_id,
+        operation=operation,
+        payload=payload,
+        github_id=github_id,
+    )
+    db.add(entry)
+    return entry
+
+async def enqueue_outbox_many(db: AsyncSession, entity_type: str, operation: str, items: list[tuple[int, dict]]) -> None:
+    # Single executemany insert, again inside the caller's transaction
+    if items:
+        await db.execute(
+            insert(OutboxEntry),
+            [
+                {"entity_type": entity_type, "entity_id": entity_id, "operation": operation, "payload": payload}
+                for entity_id, payload in items
+            ],
+        )
+
+async def get_pending_outbox(db: AsyncSession, now: datetime, limit: int = 100) -> List[OutboxEntry]:
+    """
+    Pending entries that are due, in id order. An entity whose failed entry
+    is still backing off is left out entirely, so its later entries can't
+    overtake it, and entries that aren't due don't take up the batch.
+    """
+    backing_off = aliased(OutboxEntry)
+    result = await db.execute(
+        select(OutboxEntry)
+        .where(
+            OutboxEntry.status == "pending",
+            or_(OutboxEntry.next_attempt_at.is_(None), OutboxEntry.next_attempt_at <= now),
+            ~exists().where(
+                backing_off.status == "pending",
+                backing_off.next_attempt_at > now,
+                backing_off.entity_type == OutboxEntry.entity_type,
+                backing_off.entity_id == OutboxEntry.entity_id,
+            ),
+        )
+        .order_by(OutboxEntry.id)
+        .limit(limit)
+    )
+    return result.scalars().all()
+
+async def prune_outbox(db: AsyncSession, before: datetime) -> int:
+    """
+    Delete entries that were applied before the cutoff, except where the
+    entity still has pending entries, which may need the github_id recorded
+    on its create. Dead entries are kept for inspection. Returns the number
+    deleted. Does not commit.
+    """
+    pending = aliased(OutboxEntry)
+    result = await db.execute(
+        delete(OutboxEntry)
+        .where(
+            OutboxEntry.status == "done",
+            OutboxEntry.processed_at < before,
+            ~exists().where(
+                pending.status == "pending",
+                pending.entity_type == OutboxEntry.entity_type,
+                pending.entity_id == OutboxEntry.entity_id,
+            ),
+        )
+    )
+    return result.rowcount
+
+async def get_created_github_id(db: AsyncSession, entity_type: str, entity_id: int) -> Optional[str]:
+    result = await db.execute(
+        select(OutboxEntry.github_id)
+        .where(
+            OutboxEntry.entity_type == entity_type,
+            OutboxEntry.entity_id == entity_id,
+            OutboxEntry.operation == "create",
+            OutboxEntry.status == "done",
+        )
+        .order_by(OutboxEntry.id.desc())
+        .limit(1)
+    )
+    return result.scalar()
@@ -1,35 +1,130 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import update, delete
-from typing import List
+from sqlalchemy import update, delete, insert
+from datetime import datetime
+from typing import List, Optional
 
 from ..models.project import Project
-from ..schemas.project import ProjectCreate, ProjectUpdate
+from ..schemas.project import Project as ProjectSchema, ProjectCreate, ProjectUpdate
+from .outbox import enqueue_outbox, enqueue_outbox_many
+from ..utils.change_feed import change, stage_changes
+from ..utils.response_cache import response_cache
+from ..utils.serialization import schema_columns
+from ..utils.pagination import keyset_by_updated
+from .project_stats import delete_project_stats
 
 async def create_project(db: AsyncSession, project: ProjectCreate):
     db_project = Project(**project.dict())
     db.add(db_project)
+    await db.flush()
+    enqueue_outbox(db, "project", db_project.id, "create", project.dict())
+    stage_changes(db, [change("project", "upsert", db_project.id, db_project.id, project.dict())])
     await db.commit()
     await db.refresh(db_project)
     return db_project
 
+async def create_projects(db: AsyncSession, projects: List[ProjectCreate]) -> List[int]:
+    """Insert many projects and their outbox entries in a single transaction."""
+    rows = [project.dict() for project in projects]
+    if not rows:
+        return []
+    result = await db.execute(insert(Project).returning(Project.id, sort_by_parameter_order=True), rows)
+    ids = result.scalars().all()
+    await enqueue_outbox_many(db, "project", "create", list(zip(ids, rows)))
+    stage_changes(db, [change("project", "upsert", project_id, project_id, row) for project_id, row in zip(ids, rows)])
+    await db.commit()
+    return ids
+
 async def get_project(db: AsyncSession, project_id: int):
     result = await db.execute(select(Project).filter(Project.id == project_id))
     return result.scalars().first()
 
-async def update_project(db: AsyncSession, project_id: int, project: ProjectUpdate):
-    await db.execute(
+async def update_project(db: AsyncSession, project_id: int, project: ProjectUpdate) -> Optional[Project]:
+    """Single UPDATE ... RETURNING; returns None if the project does not exist."""
+    values = project.dict(exclude_unset=True)
+    if not values:
+        return await get_project(db, project_id)
+    result = await db.execute(
         update(Project)
         .where(Project.id == project_id)
-        .values(**project.dict(exclude_unset=True))
+        .values(**values)
+        .returning(Project)
     )
+    db_project = result.scalars().first()
+    if db_project is None:
+        await db.rollback()
+        return None
+    enqueue_outbox(db, "project", project_id, "update", values)
+    stage_changes(db, [change("project", "upsert", project_id, project_id, values)])
     await db.commit()
-    return await get_project(db, project_id)
+    await response_cache.invalidate("project", project_id)
+    return db_project
 
-async def delete_project(db: AsyncSession, project_id: int):
-    await db.execute(delete(Project).where(Project.id == project_id))
+async def delete_project(db: AsyncSession, project_id: int) -> bool:
+    result = await db.execute(delete(Project).where(Project.id == project_id).returning(Project.github_id))
+    deleted = result.first()
+    if deleted is None:
+        await db.rollback()
+        return False
+    await delete_project_stats(db, project_id)
+    enqueue_outbox(db, "project", project_id, "delete", {}, github_id=deleted.github_id)
+    stage_changes(db, [change("project", "delete", project_id, project_id)])
     await db.commit()
+    await response_cache.invalidate("project", project_id)
+    return True
+
+def project_filters(updated_since: Optional[datetime] = None) -> list:
+    return [Project.updated_at >= updated_since] if updated_since is not None else []
 
-async def get_projects(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[Project]:
-    result = await db.execute(select(Project).offset(skip).limit(limit))
+def select_project_rows(updated_since: Optional[datetime] = None):
+    # Plain column tuples for exports: no ORM identity map, no per-row objects
+    return (
+        select(
+            Project.id, Project.name, Project.description, Project.github_id,
+            Project.created_at, Project.updated_at,
+        )
+        .where(*project_filters(updated_since))
+        .order_by(Project.id)
+    )
+
+def _keyset(
+    query,
+    db: AsyncSession,
+    after_id: Optional[int],
+    after_update: Optional[tuple[datetime, int]],
+    updated_since: Optional[datetime],
+):
+    # With updated_since the (updated_at, id) index serves both the filter and
+    # the order, so pages continue from (updated_at, id) rather than id alone
+    if updated_since is not None:
+        return keyset_by_updated(query, db, Project.updated_at, Project.id, after_update)
+    if after_id is not None:
+        query = query.where(Project.id > after_id)
+    return query.order_by(Project.id)
+
+async def get_projects(
+    db: AsyncSession,
+    limit: int = 100,
+    after_id: Optional[int] = None,
+    after_update: Optional[tuple[datetime, int]] = None,
+    updated_since: Optional[datetime] = None,
+) -> List[Project]:
+    query = select(Project).where(*project_filters(updated_since))
+    query = _keyset(query, db, after_id, after_update, updated_since)
+    result = await db.execute(query.limit(limit))
     return result.scalars().all()
+
+async def get_project_rows(
+    db: AsyncSession,
+    limit: int = 100,
+    after_id: Optional[int] = None,
+    after_update: Optional[tuple[datetime, int]] = None,
+    updated_since: Optional[datetime] = None,
+) -> list:
+    """Like get_projects, but as column rows keyed by the Project schema's fields."""
+    query = select(*schema_columns(Project, ProjectSchema)).where(*project_filters(updated_since))
+    query = _keyset(query, db, after_id, after_update, updated_since)
+    # Core execution on the session's connection skips ORM result processing
+    connection = await db.connection()
+    result = await connection.execute(query.limit(limit))
+    return result.all()
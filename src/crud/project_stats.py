@@ -0,0 +1,149 @@
+from collections import defaultdict
+from datetime import datetime, timezone
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy import case, delete, func, insert, or_
+from typing import Iterable, Optional
+
+from ..config import settings
+from ..models.issue import Issue
+from ..models.issue_archive import ArchivedIssue
+from ..models.issue_event import IssueStatusEvent
+from ..models.project import Project
+from ..models.project_stats import ProjectStats, ProjectStatusCount
+from .upsert import increment_rows
+
+# (issue_id, project_id, old_status, new_status); a None status marks a
+# created (old) or deleted (new) issue
+IssueChange = tuple[int, Optional[int], Optional[str], Optional[str]]
+
+def is_closed(status: Optional[str]) -> bool:
+    return status is not None and status.lower() in settings.CLOSED_ISSUE_STATUSES
+
+async def record_issue_changes(db: AsyncSession, changes: Iterable[IssueChange]) -> None:
+    """
+    Fold a batch of issue changes into the per-project counters.
+
+    Deltas are aggregated in Python first, so a bulk write costs one upsert
+    per table however many issues it touched. Does not commit.
+    """
+    status_deltas: dict[tuple[int, str], int] = defaultdict(int)
+    created: dict[int, int] = defaultdict(int)
+    closed: dict[int, int] = defaultdict(int)
+    touched: set[int] = set()
+    for _, project_id, old_status, new_status in changes:
+        if project_id is None:
+            continue
+        touched.add(project_id)
+        if old_status == new_status:
+            continue
+        if old_status is None:
+            created[project_id] += 1
+        else:
+            status_deltas[(project_id, old_status)] -= 1
+        if new_status is not None:
+            status_deltas[(project_id, new_status)] += 1
+            if is_closed(new_status) and not is_closed(old_status):
+                closed[project_id] += 1
+
+    if not touched:
+        return
+    now = datetime.now(timezone.utc)
+    await increment_rows(db, ProjectStats, ["project_id"], [
+        {
+            "project_id": project_id,
+            "issues_created": created.get(project_id, 0),
+            "issues_closed": closed.get(project_id, 0),
+            "last_activity_at": now,
+        }
+        for project_id in sorted(touched)
+    ], replace=["last_activity_at"])
+    await increment_rows(db, ProjectStatusCount, ["project_id", "status"], [
+        {"project_id": project_id, "status": status, "count": delta}
+        for (project_id, status), delta in sorted(status_deltas.items())
+        if delta
+    ])
+
+async def get_project_stats(db: AsyncSession, project_id: int) -> tuple[Optional[ProjectStats], dict[str, int]]:
+    stats = await db.get(ProjectStats, project_id)
+    result = await db.execute(
+        select(ProjectStatusCount.status, ProjectStatusCount.count)
+        .where(ProjectStatusCount.project_id == project_id, ProjectStatusCount.count != 0)
+    )
+    return stats, dict(result.all())
+
+async def delete_project_stats(db: AsyncSession, project_id: int) -> None:
+    await db.execute(delete(ProjectStatusCount).where(ProjectStatusCount.project_id == project_id))
+    await db.execute(delete(ProjectStats).where(ProjectStats.project_id == project_id))
+
+async def rebuild_project_stats(db: AsyncSession, project_id: Optional[int] = None) -> int:
+    """
+    Recompute the counters from the issues table, the issue archive and the
+    status event log. issues_created and issues_closed are cumulative, as
+    record_issue_changes keeps them: every creation and every close in the
+    log, including issues deleted since, but never fewer than the issues
+    that exist now (history from before the log). Returns the number of
+    projects rebuilt.
+    """
+    if project_id is not None:
+        await delete_project_stats(db, project_id)
+    else:
+        await db.execute(delete(ProjectStatusCount))
+        await db.execute(delete(ProjectStats))
+
+    grouped = []
+    for table in (Issue, ArchivedIssue):
+        scope = [table.project_id == project_id] if project_id is not None else [table.project_id.isnot(None)]
+        result = await db.execute(
+            select(table.project_id, table.status, func.count(), func.max(func.coalesce(table.updated_at, table.created_at)))
+            .where(*scope, table.status.isnot(None))
+            .group_by(table.project_id, table.status)
+        )
+        grouped.extend(result.all())
+    totals: dict[int, dict] = {}
+    counts: dict[tuple[int, str], dict] = {}
+    for issue_project_id, status, count, last_activity in grouped:
+        total = totals.setdefault(
+            issue_project_id,
+            {"project_id": issue_project_id, "issues_created": 0, "issues_closed": 0, "last_activity_at": None},
+        )
+        total["issues_created"] += count
+        if is_closed(status):
+            total["issues_closed"] += count
+        if last_activity is not None and (total["last_activity_at"] is None or last_activity > total["last_activity_at"]):
+            total["last_activity_at"] = last_activity
+        entry = counts.setdefault((issue_project_id, status), {"project_id": issue_project_id, "status": status, "count": 0})
+        entry["count"] += count
+
+    closed_statuses = list(settings.CLOSED_ISSUE_STATUSES)
+    closing = (
+        func.lower(IssueStatusEvent.to_status).in_(closed_statuses)
+        & or_(IssueStatusEvent.from_status.is_(None), func.lower(IssueStatusEvent.from_status).not_in(closed_statuses))
+    )
+    scope = [IssueStatusEvent.project_id == project_id] if project_id is not None else [IssueStatusEvent.project_id.isnot(None)]
+    result = await db.execute(
+        select(
+            IssueStatusEvent.project_id,
+            func.sum(case((IssueStatusEvent.from_status.is_(None) & IssueStatusEvent.to_status.isnot(None), 1), else_=0)),
+            func.sum(case((closing, 1), else_=0)),
+            func.max(IssueStatusEvent.created_at),
+        )
+        # Events outlive deleted projects, which must not get counters back
+        .join(Project, Project.id == IssueStatusEvent.project_id)
+        .where(*scope)
+        .group_by(IssueStatusEvent.project_id)
+    )
+    for event_project_id, created, closed, last_event in result.all():
+        # A project whose issues have all been deleted still has its history
+        total = totals.setdefault(
+            event_project_id,
+            {"project_id": event_project_id, "issues_created": 0, "issues_closed": 0, "last_activity_at": last_event},
+        )
+        total["issues_created"] = max(total["issues_created"], created or 0)
+        total["issues_closed"] = max(total["issues_closed"], closed or 0)
+
+    if totals:
+        await db.execute(insert(ProjectStats), list(totals.values()))
+        await db.execute(insert(ProjectStatusCount), list(counts.values()))
+    await db.commit()
+    return len(totals)
@@ -0,0 +1,118 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy import DDL, Float, and_, column, delete, event, func, insert, literal_column, or_, table, text
+from typing import Iterable, List, Optional
+
+from ..database import Base
+from ..models.issue import Issue
+
+# SQLite keeps its own FTS5 copy of title/body, keyed by rowid = issues.id and
+# maintained by crud.issue. PostgreSQL indexes an expression over the issues
+# table itself, so it needs no maintenance.
+issues_fts = table("issues_fts", column("rowid"), column("title"), column("body"))
+
+TS_CONFIG = literal_column("'english'::regconfig")
+TS_VECTOR = func.to_tsvector(
+    TS_CONFIG, func.coalesce(Issue.title, "").op("||")(" ").op("||")(func.coalesce(Issue.body, ""))
+)
+
+event.listen(
+    Base.metadata,
+    "after_create",
+    DDL("CREATE VIRTUAL TABLE IF NOT EXISTS issues_fts USING fts5(title, body, tokenize='unicode61')")
+    .execute_if(dialect="sqlite"),
+)
+event.listen(
+    Base.metadata,
+    "after_create",
+    DDL(
+        "CREATE INDEX IF NOT EXISTS ix_issues_fulltext ON issues USING GIN "
+        "(to_tsvector('english'::regconfig, coalesce(title, '') || ' ' || coalesce(body, '')))"
+    ).execute_if(dialect="postgresql"),
+)
+
+def _is_sqlite(db: AsyncSession) -> bool:
+    return db.bind.dialect.name == "sqlite"
+
+async def index_issues(db: AsyncSession, rows: Iterable[tuple[int, Optional[str], Optional[str]]]) -> None:
+    """(Re)index (id, title, body) rows. Does not commit."""
+    rows = list(rows)
+    if not rows or not _is_sqlite(db):
+        return
+    await db.execute(delete(issues_fts).where(issues_fts.c.rowid.in_([row[0] for row in rows])))
+    await db.execute(
+        insert(issues_fts),
+        [{"rowid": issue_id, "title": title or "", "body": body or ""} for issue_id, title, body in rows],
+    )
+
+async def reindex_issues(db: AsyncSession, issue_ids: Iterable[int]) -> None:
+    """Re-read title/body of already-written issues and index them. Does not commit."""
+    issue_ids = list(issue_ids)
+    if issue_ids and _is_sqlite(db):
+        result = await db.execute(select(Issue.id, Issue.title, Issue.body).where(Issue.id.in_(issue_ids)))
+        await index_issues(db, result.all())
+
+async def unindex_issues(db: AsyncSession, issue_ids: Iterable[int]) -> None:
+    issue_ids = list(issue_ids)
+    if issue_ids and _is_sqlite(db):
+        await db.execute(delete(issues_fts).where(issues_fts.c.rowid.in_(issue_ids)))
+
+async def rebuild_search_index(db: AsyncSession) -> int:
+    """Re-index every issue from scratch. Returns the number of issues indexed."""
+    if not _is_sqlite(db):
+        return 0
+    await db.execute(delete(issues_fts))
+    await db.execute(text(
+        "INSERT INTO issues_fts(rowid, title, body) "
+        "SELECT id, coalesce(title, ''), coalesce(body, '') FROM issues"
+    ))
+    count = await db.scalar(select(func.count()).select_from(issues_fts))
+    await db.commit()
+    return count
+
+def fts5_query(q: str) -> str:
+    # Quote every term so user input can't inject FTS5 syntax; terms are ANDed
+    return " ".join('"{}"'.format(term.replace('"', '""')) for term in q.split())
+
+async def search_issues(
+    db: AsyncSession,
+    q: str,
+    limit: int = 50,
+    after: Optional[tuple[float, int]] = None,
+    project_id: Optional[int] = None,
+    status: Optional[str] = None,
+) -> List[tuple[Issue, float]]:
+    """
+    Ranked full-text search over issue title and body.
+
+    Results are ordered by (rank, id) with lower rank meaning more relevant,
+    which lets callers page with a (rank, id) keyset cursor via `after`.
+    """
+    filters = []
+    if project_id is not None:
+        filters.append(Issue.project_id == project_id)
+    if status is not None:
+        filters.append(Issue.status == status)
+
+    if _is_sqlite(db):
+        terms = fts5_query(q)
+        if not terms:
+            return []
+        # Title matches weigh ten times as much as body matches
+        rank = func.bm25(literal_column("issues_fts"), 10.0, 1.0, type_=Float)
+        query = (
+            select(Issue, rank.label("rank"))
+            .join(issues_fts, issues_fts.c.rowid == Issue.id)
+            .where(literal_column("issues_fts").op("MATCH")(terms))
+        )
+    else:
+        ts_query = func.websearch_to_tsquery(TS_CONFIG, q)
+        # Negated so that, as with bm25, lower is better
+        rank = -func.ts_rank(TS_VECTOR, ts_query, type_=Float)
+        query = select(Issue, rank.label("rank")).where(TS_VECTOR.op("@@")(ts_query))
+
+    if after is not None:
+        after_rank, after_id = after
+        filters.append(or_(rank > after_rank, and_(rank == after_rank, Issue.id > after_id)))
+    result = await db.execute(query.where(*filters).order_by(rank, Issue.id).limit(limit))
+    return [(issue, issue_rank) for issue, issue_rank in result.all()]
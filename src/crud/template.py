@@ -1,23 +1,33 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import update, delete
-from typing import List
+from sqlalchemy import String, cast, update, delete, func
+from sqlalchemy.exc import IntegrityError
+from typing import List, Optional
 
 from ..models.template import Template
 from ..schemas.template import TemplateCreate, TemplateUpdate
+from ..utils.template_engine import compile_template, template_cache
+from ..utils.response_cache import response_cache
+from .upsert import dialect_insert, supports_upsert
 
-from sqlalchemy.exc import IntegrityError
+DUPLICATE_NAME_ERROR = "A template with this name already exists"
 
-async def create_template(db: AsyncSession, template: TemplateCreate):
+async def create_template(db: AsyncSession, template: TemplateCreate) -> Optional[Template]:
+    """
+    Insert and commit a template; returns None if the name is taken. Raises
+    TemplateSyntaxError before anything malformed is stored.
+    """
+    compile_template(0, 0, template.content)
     db_template = Template(**template.dict())
     db.add(db_template)
     try:
-        await db.flush()
+        await db.commit()
     except IntegrityError:
+        # A template with this name already exists
         await db.rollback()
-        # Template already exists, you can choose to update it here if needed
-        # or just skip it
         return None
+    await db.refresh(db_template)
+    await response_cache.invalidate("template")
     return db_template
 
 async def get_template(db: AsyncSession, template_id: int):
@@ -28,19 +38,139 @@ async def get_template_by_name(db: AsyncSession, name: str):
     result = await db.execute(select(Template).filter(Template.name == name))
     return result.scalars().first()
 
-async def update_template(db: AsyncSession, template_id: int, template: TemplateUpdate):
-    await db.execute(
-        update(Template)
-        .where(Template.id == template_id)
-        .values(**template.dict(exclude_unset=True))
-    )
-    await db.commit()
-    return await get_template(db, template_id)
+async def update_template(db: AsyncSession, template_id: int, template: TemplateUpdate) -> Optional[Template]:
+    """
+    Single UPDATE ... RETURNING; returns None if the template does not exist.
+    Raises TemplateSyntaxError if the new content is malformed and
+    IntegrityError, after rolling back, if the new name is taken.
+    """
+    if template.content is not None:
+        compile_template(template_id, 0, template.content)
+    try:
+        result = await db.execute(
+            update(Template)
+            .where(Template.id == template_id)
+            .values(**template.dict(exclude_unset=True), version=Template.version + 1)
+            .returning(Template)
+        )
+        db_template = result.scalars().first()
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise
+    if db_template is None:
+        return None
+    template_cache.invalidate(template_id)
+    await response_cache.invalidate("template", template_id)
+    return db_template
 
-async def delete_template(db: AsyncSession, template_id: int):
-    await db.execute(delete(Template).where(Template.id == template_id))
+async def delete_template(db: AsyncSession, template_id: int) -> bool:
+    result = await db.execute(delete(Template).where(Template.id == template_id).returning(Template.id))
+    deleted = result.first() is not None
     await db.commit()
+    if deleted:
+        template_cache.invalidate(template_id)
+        await response_cache.invalidate("template", template_id)
+    return deleted
 
-async def get_templates(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[Template]:
-    result = await db.execute(select(Template).offset(skip).limit(limit))
+async def get_templates(db: AsyncSession, limit: int = 100, after_id: Optional[int] = None) -> List[Template]:
+    query = select(Template)
+    if after_id is not None:
+        query = query.where(Template.id > after_id)
+    result = await db.execute(query.order_by(Template.id).limit(limit))
     return result.scalars().all()
+
+def template_filters(name: Optional[str] = None, prefix: Optional[str] = None) -> list:
+    """Case-insensitive substring (name) and prefix filters on the template name."""
+    filters = []
+    lowered = func.lower(Template.name)
+    if name:
+        filters.append(lowered.contains(name.lower(), autoescape=True))
+    if prefix:
+        # A range rather than LIKE so the lower(name) index serves it on every backend
+        prefix = prefix.lower()
+        filters.extend([lowered >= prefix, lowered < prefix + "\U0010ffff"])
+    return filters
+
+async def get_template_summaries(
+    db: AsyncSession,
+    limit: int = 100,
+    after_id: Optional[int] = None,
+    name: Optional[str] = None,
+    prefix: Optional[str] = None,
+) -> list:
+    """
+    (id, name, title, fields) rows for template listings. title and fields are
+    projected out of the JSON content in SQL, so template bodies are never read.
+    """
+    query = select(
+        Template.id,
+        Template.name,
+        func.coalesce(Template.content["title"].as_string(), "").label("title"),
+        Template.content["fields"].label("fields"),
+    ).where(*template_filters(name, prefix))
+    if after_id is not None:
+        query = query.where(Template.id > after_id)
+    # Core execution on the session's connection skips ORM result processing
+    connection = await db.connection()
+    result = await connection.execute(query.order_by(Template.id).limit(limit))
+    return result.all()
+
+async def get_template_names(db: AsyncSession) -> set[str]:
+    result = await db.execute(select(Template.name))
+    return set(result.scalars().all())
+
+async def list_template_names(db: AsyncSession) -> List[str]:
+    result = await db.execute(select(Template.name).order_by(Template.name))
+    return list(result.scalars().all())
+
+async def upsert_templates(db: AsyncSession, rows: List[dict]) -> List[int]:
+    """
+    Insert or update templates by name in one statement, bumping the version
+    of any row whose content changes. Returns the ids of the inserted and
+    changed rows.
+    """
+    ids = await (_upsert_template_rows if supports_upsert(db) else _merge_template_rows)(db, rows)
+    await db.commit()
+    for template_id in ids:
+        template_cache.invalidate(template_id)
+    await response_cache.invalidate("template", *ids)
+    return ids
+
+async def _upsert_template_rows(db: AsyncSession, rows: List[dict]) -> List[int]:
+    insert = dialect_insert(db)
+    ids = []
+    # Chunked only to stay under the bound-parameter limit; still one transaction
+    for start in range(0, len(rows), 500):
+        statement = insert(Template).values(rows[start:start + 500])
+        statement = statement.on_conflict_do_update(
+            index_elements=[Template.name],
+            set_={
+                "content": statement.excluded.content,
+                "version": Template.version + 1,
+                "updated_at": func.now(),
+            },
+            # Compared as text: JSON has no equality operator on every backend
+            where=cast(Template.content, String) != cast(statement.excluded.content, String),
+        ).returning(Template.id)
+        result = await db.execute(statement)
+        ids.extend(result.scalars().all())
+    return ids
+
+async def _merge_template_rows(db: AsyncSession, rows: List[dict]) -> List[int]:
+    # Databases without ON CONFLICT: lock and update each existing row, or insert it
+    ids = []
+    for row in rows:
+        result = await db.execute(select(Template).where(Template.name == row["name"]).with_for_update())
+        existing = result.scalars().first()
+        if existing is None:
+            existing = Template(**row)
+            db.add(existing)
+        elif existing.content != row["content"]:
+            existing.content = row["content"]
+            existing.version = existing.version + 1
+        else:
+            continue
+        await db.flush()
+        ids.append(existing.id)
+    return ids
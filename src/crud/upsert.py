@@ -0,0 +1,54 @@
+from sqlalchemy import insert, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from typing import List, Sequence
+
+UPSERT_DIALECTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+def supports_upsert(db: AsyncSession) -> bool:
+    return db.bind.dialect.name in UPSERT_DIALECTS
+
+def dialect_insert(db: AsyncSession):
+    """
+    Return the dialect-specific insert() for the session's database, which
+    supports ON CONFLICT upserts. SQLite and PostgreSQL are supported; raises
+    ValueError for any other database (check supports_upsert first).
+    """
+    dialect = db.bind.dialect.name
+    if dialect not in UPSERT_DIALECTS:
+        raise ValueError(
+            f"ON CONFLICT upserts are not supported on {dialect!r}; "
+            f"supported dialects: {', '.join(sorted(UPSERT_DIALECTS))}"
+        )
+    return UPSERT_DIALECTS[dialect]
+
+async def increment_rows(db: AsyncSession, model, keys: Sequence[str], rows: List[dict], replace: Sequence[str] = ()) -> None:
+    """
+    Add each row's other columns onto the row with the same keys, creating
+    it if missing; columns in replace are overwritten instead of added to.
+    One ON CONFLICT statement on SQLite and PostgreSQL; elsewhere each row is
+    locked with SELECT ... FOR UPDATE, then updated or inserted. Does not commit.
+    """
+    if not rows:
+        return
+    columns = [column for column in rows[0] if column not in keys]
+    if supports_upsert(db):
+        statement = dialect_insert(db)(model).values(rows)
+        await db.execute(statement.on_conflict_do_update(
+            index_elements=[getattr(model, key) for key in keys],
+            set_={
+                column: statement.excluded[column] if column in replace else getattr(model, column) + statement.excluded[column]
+                for column in columns
+            },
+        ))
+        return
+    for row in rows:
+        match = [getattr(model, key) == row[key] for key in keys]
+        existing = await db.execute(select(*(getattr(model, key) for key in keys)).where(*match).with_for_update())
+        if existing.first() is None:
+            await db.execute(insert(model).values(row))
+        else:
+            await db.execute(update(model).where(*match).values({
+                column: row[column] if column in replace else getattr(model, column) + row[column] for column in columns
+            }))
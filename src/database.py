@@ -1,14 +1,85 @@
 from typing import AsyncGenerator
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
 
 from .config import settings
+from .utils.metrics import instrument_engine
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    # WAL lets readers run alongside the single writer instead of blocking on it
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}")
+    cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT}")
+    cursor.execute(f"PRAGMA mmap_size={settings.SQLITE_MMAP_SIZE}")
+    cursor.execute(f"PRAGMA cache_size={settings.SQLITE_CACHE_SIZE}")
+    cursor.close()
+
+def create_engine_for(url: str) -> AsyncEngine:
+    """Build an engine with the pool and connection settings of the configured profile."""
+    parsed = make_url(url)
+    options = {"echo": settings.DATABASE_ECHO, "future": True}
+    in_memory = parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:")
+    if not in_memory:
+        # In-memory SQLite uses a single static connection with no pool to size
+        options.update(
+            pool_size=settings.DATABASE_POOL_SIZE,
+            max_overflow=settings.DATABASE_MAX_OVERFLOW,
+            pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+            pool_recycle=settings.DATABASE_POOL_RECYCLE,
+            pool_pre_ping=parsed.get_backend_name() != "sqlite",
+        )
+    new_engine = create_async_engine(url, **options)
+    if parsed.get_backend_name() == "sqlite":
+        event.listen(new_engine.sync_engine, "connect", _set_sqlite_pragmas)
+    return new_engine
+
+engine = create_engine_for(settings.DATABASE_URL)
+# Reads go to a replica when one is configured, otherwise to the primary
+read_engine = create_engine_for(settings.DATABASE_READ_URL) if settings.DATABASE_READ_URL else engine
+if settings.METRICS_ENABLED:
+    instrument_engine(engine, "primary")
+    if read_engine is not engine:
+        instrument_engine(read_engine, "read")
 
-engine = create_async_engine(settings.DATABASE_URL, echo=True, future=True)
 AsyncSessionLocal = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+ReadSessionLocal = sessionmaker(read_engine, class_=AsyncSession, expire_on_commit=False)
 
 Base = declarative_base()
 
-async def get_db() -> AsyncGenerator[AsyncSession, None]:
+async def get_write_db() -> AsyncGenerator[AsyncSession, None]:
     async with AsyncSessionLocal() as session:
         yield session
+
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    async with ReadSessionLocal() as session:
+        yield session
+
+async def get_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Session for the current request: read engine for GET/HEAD, primary for
+    everything else. Handlers that go through the response cache or the
+    dependency graph cache use get_cached_read_db instead.
+    """
+    session_factory = ReadSessionLocal if request.method in ("GET", "HEAD") else AsyncSessionLocal
+    async with session_factory() as session:
+        yield session
+
+async def get_cached_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Session for GET handlers that fill the response cache or the dependency
+    graph cache. These read from the primary: a lagging replica's result
+    would be cached and then trusted after the write that invalidated it;
+    responses until they expire, graphs (which have no TTL) until the next
+    invalidation. A cache hit never touches the session.
+    """
+    async with AsyncSessionLocal() as session:
+        yield session
+
+async def dispose_engines() -> None:
+    await engine.dispose()
+    if read_engine is not engine:
+        await read_engine.dispose()
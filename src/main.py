@@ -1,23 +1,60 @@
 from fastapi import FastAPI
-from .database import engine, Base
-from .config import Settings
-from .api.endpoints import projects, issues, templates
-from .utils.template_loader import load_templates_to_db
-from sqlalchemy.ext.asyncio import AsyncSession
+from .database import dispose_engines
+from .config import Settings, settings
+from .api.endpoints import projects, issues, templates, webhooks, github, metrics, events
+from .utils.bootstrap import bootstrap, is_bootstrapped
+from .utils.outbox_worker import outbox_worker
+from .utils.webhooks import webhook_consumer
+from .utils.reconcile import reconcile_scheduler
+from .utils.archive import issue_archiver
+from .utils.github_cli import close_transport
+from .utils.invalidation_bus import invalidation_bus
+from .utils.process_lock import FileLock
+from .utils.metrics import MetricsMiddleware, loop_lag_monitor, metrics_store
 
 app = FastAPI(title="AI Hacker League Project Management System")
 
+# Only one process syncs with GitHub in the background, however many serve requests
+leader_lock = FileLock(settings.LEADER_LOCK_PATH)
+
 @app.on_event("startup")
 async def startup():
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-    
-    async with AsyncSession(engine) as db:
-        await load_templates_to_db(db)
+    # Workers forked by the serve command start after the master bootstrapped
+    if not is_bootstrapped():
+        await bootstrap()
+
+    invalidation_bus.start()
+    if settings.METRICS_ENABLED:
+        loop_lag_monitor.start()
+        metrics_store.start()
+    webhook_consumer.start()
+    if leader_lock.acquire(blocking=False):
+        outbox_worker.start()
+        reconcile_scheduler.start()
+        issue_archiver.start()
+
+@app.on_event("shutdown")
+async def shutdown():
+    await reconcile_scheduler.stop()
+    await issue_archiver.stop()
+    await webhook_consumer.stop()
+    await outbox_worker.stop()
+    leader_lock.release()
+    invalidation_bus.stop()
+    await loop_lag_monitor.stop()
+    await metrics_store.stop()
+    await close_transport()
+    await dispose_engines()
 
 app.include_router(projects.router, prefix="/projects", tags=["projects"])
 app.include_router(issues.router, prefix="/issues", tags=["issues"])
 app.include_router(templates.router, prefix="/templates", tags=["templates"])
+app.include_router(webhooks.router, prefix="/webhooks", tags=["webhooks"])
+app.include_router(github.router, prefix="/github", tags=["github"])
+app.include_router(events.router, tags=["events"])
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(metrics.router, tags=["metrics"])
 
 @app.get("/")
 async def root():
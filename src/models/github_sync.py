@@ -0,0 +1,21 @@
+from sqlalchemy import Column, String, DateTime
+from sqlalchemy.sql import func
+
+from ..database import Base
+
+# High-water mark of GitHub's updatedAt per reconciliation scope, e.g.
+# "projects" or "issues:<repository node id>"
+class GitHubSyncState(Base):
+    __tablename__ = "github_sync_state"
+
+    scope = Column(String, primary_key=True)
+    watermark = Column(String, nullable=True)  # ISO 8601, as GitHub returns it
+    last_run_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+# Hash of the last GitHub record applied locally, so unchanged records are skipped
+class GitHubRecordHash(Base):
+    __tablename__ = "github_record_hashes"
+
+    entity_type = Column(String, primary_key=True)  # "issue" | "project"
+    github_id = Column(String, primary_key=True)
+    hash = Column(String, nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
 from sqlalchemy.sql import func
 
 from ..database import Base
@@ -13,4 +13,14 @@ class Issue(Base):
     github_id = Column(String, unique=True, index=True)
     project_id = Column(Integer, ForeignKey("projects.id"))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    # Keyset pagination orders by id (by updated_at, id with updated_since), so each
+    # filter combination gets an index ending in id.
+    # Ids are never reused (AUTOINCREMENT on SQLite): archived issues keep theirs.
+    __table_args__ = (
+        Index("ix_issues_project_status_id", "project_id", "status", "id"),
+        Index("ix_issues_project_id_id", "project_id", "id"),
+        Index("ix_issues_updated_at_id", "updated_at", "id"),
+        {"sqlite_autoincrement": True},
+    )
@@ -0,0 +1,32 @@
+from sqlalchemy import Column, Integer, String, DateTime, LargeBinary, Index
+from sqlalchemy.sql import func
+
+from ..database import Base
+from ..utils.compression import decompress_text
+
+# Closed issues moved out of the hot issues table. Rows keep their issue id
+# and github_id, so events, dependencies and GitHub sync still resolve them;
+# the body is stored compressed.
+class ArchivedIssue(Base):
+    __tablename__ = "issue_archive"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    title = Column(String)
+    status = Column(String)
+    github_id = Column(String, unique=True)
+    project_id = Column(Integer)
+    created_at = Column(DateTime(timezone=True))
+    updated_at = Column(DateTime(timezone=True))
+    archived_at = Column(DateTime(timezone=True), server_default=func.now())
+    codec = Column(String, nullable=False)
+    body_size = Column(Integer, nullable=False, default=0)  # uncompressed bytes
+    body_data = Column(LargeBinary)
+
+    __table_args__ = (
+        Index("ix_issue_archive_project_id_id", "project_id", "id"),
+        Index("ix_issue_archive_updated_at_id", "updated_at", "id"),
+    )
+
+    @property
+    def body(self):
+        return decompress_text(self.body_data, self.codec)
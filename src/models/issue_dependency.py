@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, DateTime, Index
+from sqlalchemy.sql import func
+
+from ..database import Base
+
+# blocker_id must be finished before blocked_id can be. Both issues belong to
+# project_id, so a project's whole graph loads with one indexed query.
+class IssueDependency(Base):
+    __tablename__ = "issue_dependencies"
+
+    blocker_id = Column(Integer, primary_key=True)
+    blocked_id = Column(Integer, primary_key=True)
+    project_id = Column(Integer, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # The primary key serves blocker -> blocked lookups; this one the reverse
+    __table_args__ = (
+        Index("ix_issue_dependencies_blocked_blocker", "blocked_id", "blocker_id"),
+        Index("ix_issue_dependencies_project_id", "project_id"),
+    )
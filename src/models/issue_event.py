@@ -0,0 +1,32 @@
+from sqlalchemy import Column, Integer, String, DateTime, Index
+from sqlalchemy.sql import func
+
+from ..database import Base
+
+# Append-only log of issue status transitions. from_status is NULL when the
+# issue was created and to_status is NULL when it was deleted.
+class IssueStatusEvent(Base):
+    __tablename__ = "issue_status_events"
+
+    id = Column(Integer, primary_key=True, index=True)
+    issue_id = Column(Integer, nullable=False)
+    project_id = Column(Integer, nullable=True)
+    from_status = Column(String, nullable=True)
+    to_status = Column(String, nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_issue_status_events_issue_id_id", "issue_id", "id"),
+        Index("ix_issue_status_events_project_created", "project_id", "created_at"),
+    )
+
+# Open/close counts per project per hour or day, rolled up as events are written
+class BurndownBucket(Base):
+    __tablename__ = "burndown_buckets"
+
+    project_id = Column(Integer, primary_key=True)
+    granularity = Column(String, primary_key=True)  # "hour" | "day"
+    bucket_start = Column(DateTime(timezone=True), primary_key=True)
+    opened = Column(Integer, nullable=False, default=0)
+    closed = Column(Integer, nullable=False, default=0)
+    deleted = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,28 @@
+from sqlalchemy import Column, Integer, String, JSON, DateTime, Index
+from sqlalchemy.sql import func
+
+from ..database import Base
+
+# A GitHub mutation written in the same transaction as the local change it
+# mirrors, drained in order per entity by utils.outbox_worker
+class OutboxEntry(Base):
+    __tablename__ = "github_outbox"
+
+    id = Column(Integer, primary_key=True, index=True)
+    entity_type = Column(String, nullable=False)  # "issue" | "project"
+    entity_id = Column(Integer, nullable=False)
+    operation = Column(String, nullable=False)  # "create" | "update" | "delete"
+    payload = Column(JSON, nullable=False, default=dict)
+    github_id = Column(String, nullable=True)
+    status = Column(String, nullable=False, default="pending")  # "pending" | "done" | "dead"
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime(timezone=True), nullable=True)
+    last_error = Column(String, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    processed_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("ix_github_outbox_status_id", "status", "id"),
+        Index("ix_github_outbox_status_next_attempt", "status", "next_attempt_at"),
+        Index("ix_github_outbox_entity", "entity_type", "entity_id", "id"),
+    )
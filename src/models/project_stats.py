@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+
+from ..database import Base
+
+# Counters maintained by crud.issue in the same transaction as each issue
+# write, so project reports never have to scan the issues table
+class ProjectStats(Base):
+    __tablename__ = "project_stats"
+
+    project_id = Column(Integer, ForeignKey("projects.id"), primary_key=True)
+    issues_created = Column(Integer, nullable=False, default=0)
+    issues_closed = Column(Integer, nullable=False, default=0)
+    last_activity_at = Column(DateTime(timezone=True), nullable=True)
+
+class ProjectStatusCount(Base):
+    __tablename__ = "project_status_counts"
+
+    project_id = Column(Integer, ForeignKey("projects.id"), primary_key=True)
+    status = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
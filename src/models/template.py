@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, JSON, DateTime
+from sqlalchemy import Column, Integer, String, JSON, DateTime, Index
 from sqlalchemy.sql import func
 
 from ..database import Base
@@ -9,5 +9,11 @@ class Template(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, unique=True, index=True)
     content = Column(JSON)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now(), nullable=True)
+
+    # Case-insensitive name lookups and prefix ranges compare on lower(name)
+    __table_args__ = (
+        Index("ix_templates_name_lower", func.lower(name)),
+    )
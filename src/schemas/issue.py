@@ -18,9 +18,22 @@ class IssueUpdate(BaseModel):
 
 class Issue(IssueBase):
     id: int
-    github_id: str
+    # Issues that arrive from GitHub webhooks are not attached to a project
+    project_id: Optional[int] = None
+    github_id: Optional[str] = None
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class IssueStatusEvent(BaseModel):
+    id: int
+    issue_id: int
+    project_id: Optional[int] = None
+    from_status: Optional[str] = None
+    to_status: Optional[str] = None
     created_at: datetime
-    updated_at: datetime
 
     class Config:
         from_attributes = True
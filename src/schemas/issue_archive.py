@@ -0,0 +1,23 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional
+
+class ArchiveRun(BaseModel):
+    moved: int
+    batches: int
+    body_bytes: int
+    compressed_bytes: int
+    seconds: float
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class ArchiveStats(BaseModel):
+    hot_issues: int
+    archived_issues: int
+    archived_body_bytes: int
+    archived_compressed_bytes: int
+    compression_ratio: Optional[float] = None
+    last_archived_at: Optional[datetime] = None
+    last_run: Optional[ArchiveRun] = None
@@ -0,0 +1,31 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import List, Optional
+
+class DependencyCreate(BaseModel):
+    blocker_id: int
+
+class DependencyEdge(BaseModel):
+    blocker_id: int
+    blocked_id: int
+
+class Dependency(DependencyEdge):
+    project_id: int
+    created_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class TopologicalOrder(BaseModel):
+    project_id: int
+    order: List[int]
+
+class DependencyCycle(BaseModel):
+    project_id: int
+    cycle: Optional[List[int]] = None
+
+class CriticalPath(BaseModel):
+    issue_id: int
+    # Open issues from the first one that must be done through issue_id itself
+    path: List[int]
+    length: int
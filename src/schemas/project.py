@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
-from typing import Optional
+from typing import Dict, List, Optional
 
 class ProjectBase(BaseModel):
     name: str
@@ -14,9 +14,30 @@ class ProjectUpdate(ProjectBase):
 
 class Project(ProjectBase):
     id: int
-    github_id: str
+    github_id: Optional[str] = None
     created_at: datetime
-    updated_at: datetime
+    updated_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
+
+class ProjectReport(BaseModel):
+    project_id: int
+    total_issues: int
+    open_issues: int
+    closed_issues: int
+    issues_by_status: Dict[str, int]
+    issues_created: int
+    issues_closed: int
+    last_activity_at: Optional[datetime] = None
+
+class BurndownPoint(BaseModel):
+    timestamp: datetime
+    remaining: int
+    opened: int
+    closed: int
+
+class Burndown(BaseModel):
+    project_id: int
+    granularity: str
+    points: List[BurndownPoint]
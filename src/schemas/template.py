@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
 from datetime import datetime
 from typing import Optional, Dict, Any
 
@@ -13,10 +13,23 @@ class TemplateUpdate(BaseModel):
     name: Optional[str] = None
     content: Optional[Dict[str, Any]] = None
 
+    @field_validator("name", "content")
+    @classmethod
+    def not_null(cls, value):
+        # Omit a field to leave it unchanged; neither column may be cleared
+        if value is None:
+            raise ValueError("may be omitted but not null")
+        return value
+
 class Template(TemplateBase):
     id: int
+    version: int = 1
     created_at: datetime
     updated_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
+
+class TemplateApplyItem(BaseModel):
+    issue_id: int
+    values: Dict[str, Any] = {}
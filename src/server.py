@@ -0,0 +1,122 @@
+import asyncio
+import logging
+import os
+import shutil
+import signal
+import socket
+import tempfile
+import time
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+# A worker that exits sooner than this after starting is not restarted in a tight loop
+MIN_WORKER_UPTIME = 1.0
+
+async def _prepare() -> None:
+    from .database import dispose_engines
+    from .utils.bootstrap import bootstrap, warm_caches
+
+    await bootstrap()
+    warmed = await warm_caches()
+    # Pooled connections must not be shared with forked children
+    await dispose_engines()
+    logger.info("Bootstrapped; %d templates compiled", warmed)
+
+def _bind(host: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+def _run_worker(sock: socket.socket) -> None:
+    import uvicorn
+    from .main import app
+    from .utils.metrics import registry
+
+    # What the master recorded while bootstrapping would be counted once per worker
+    registry.clear()
+    for signum in (signal.SIGINT, signal.SIGTERM, signal.SIGCHLD):
+        signal.signal(signum, signal.SIG_DFL)
+    uvicorn.Server(uvicorn.Config(app, lifespan="on", log_level="info")).run(sockets=[sock])
+
+def serve(host: str, port: int, workers: int) -> None:
+    """
+    Pre-fork server. The master binds the socket, creates the schema, syncs
+    templates and compiles them once, then forks workers that inherit the
+    warm process and skip bootstrap. Workers share cache invalidations over
+    an InvalidationBus and /metrics figures through a MetricsStore, each in
+    a private directory; one of them holds the leader
+    lock and runs the outbox worker and reconciliation scheduler. Workers
+    that die are replaced; SIGINT/SIGTERM stops them all gracefully.
+    """
+    import uvicorn  # noqa: F401  fail before forking if the server is missing
+    from . import main  # noqa: F401  import the app and every model ahead of the fork
+    from .utils.bootstrap import BOOTSTRAPPED_ENV
+
+    sock = _bind(host, port)
+    asyncio.run(_prepare())
+    os.environ[BOOTSTRAPPED_ENV] = "1"
+    bus_dir = None
+    if not settings.CACHE_BUS_DIR:
+        bus_dir = tempfile.mkdtemp(prefix="pms-bus-")
+        settings.CACHE_BUS_DIR = bus_dir
+        from .utils.invalidation_bus import invalidation_bus
+        invalidation_bus.directory = bus_dir
+    metrics_dir = None
+    if settings.METRICS_ENABLED and not settings.METRICS_DIR:
+        metrics_dir = tempfile.mkdtemp(prefix="pms-metrics-")
+        settings.METRICS_DIR = metrics_dir
+        from .utils.metrics import metrics_store
+        metrics_store.directory = metrics_dir
+
+    children: dict[int, float] = {}
+    stopping = False
+
+    def spawn() -> None:
+        pid = os.fork()
+        if pid == 0:
+            try:
+                _run_worker(sock)
+            finally:
+                os._exit(0)
+        children[pid] = time.monotonic()
+
+    def stop(signum, frame) -> None:
+        nonlocal stopping
+        stopping = True
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+    for _ in range(workers):
+        spawn()
+    logger.info("Serving on %s:%d with %d workers", host, port, workers)
+
+    try:
+        while children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            except InterruptedError:
+                continue
+            started = children.pop(pid, None)
+            if started is None or stopping:
+                continue
+            logger.warning("Worker %d exited with status %d; restarting", pid, status)
+            if time.monotonic() - started < MIN_WORKER_UPTIME:
+                time.sleep(MIN_WORKER_UPTIME)
+            spawn()
+    finally:
+        sock.close()
+        for directory in (bus_dir, metrics_dir):
+            if directory is not None:
+                shutil.rmtree(directory, ignore_errors=True)
@@ -0,0 +1,93 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import text
+
+from ..config import settings
+from ..database import AsyncSessionLocal
+from ..crud.issue_archive import archive_closed_issues
+from .metrics import issues_archived
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class ArchiveRun:
+    moved: int = 0
+    batches: int = 0
+    body_bytes: int = 0
+    compressed_bytes: int = 0
+    seconds: float = 0.0
+    finished_at: Optional[datetime] = field(default=None)
+
+async def archive_issues(
+    older_than_days: Optional[float] = None, vacuum: bool = False, session_factory=AsyncSessionLocal
+) -> ArchiveRun:
+    """
+    Move every issue closed and untouched for older_than_days (default
+    ARCHIVE_AFTER_DAYS) into the archive, ARCHIVE_BATCH_SIZE per transaction
+    so writers are never locked out for long. vacuum afterwards returns the
+    freed pages of a SQLite database to the filesystem.
+    """
+    started = time.perf_counter()
+    days = settings.ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+    cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+    run = ArchiveRun()
+    async with session_factory() as db:
+        while True:
+            batch = await archive_closed_issues(db, cutoff, settings.ARCHIVE_BATCH_SIZE)
+            if not batch.moved:
+                break
+            run.moved += batch.moved
+            run.batches += 1
+            run.body_bytes += batch.body_bytes
+            run.compressed_bytes += batch.compressed_bytes
+            issues_archived.inc(amount=batch.moved)
+            if batch.moved < settings.ARCHIVE_BATCH_SIZE:
+                break
+            await asyncio.sleep(0)
+        if vacuum and db.bind.dialect.name == "sqlite":
+            # VACUUM can't run inside a transaction
+            connection = await db.connection(execution_options={"isolation_level": "AUTOCOMMIT"})
+            await connection.execute(text("VACUUM"))
+    run.seconds = time.perf_counter() - started
+    run.finished_at = datetime.now(timezone.utc)
+    logger.info(
+        "Archived %d issues in %d batches (%d body bytes -> %d) in %.3fs",
+        run.moved, run.batches, run.body_bytes, run.compressed_bytes, run.seconds,
+    )
+    return run
+
+class IssueArchiver:
+    """Runs archive_issues every ARCHIVE_INTERVAL seconds and keeps the last run's figures."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.last_run: Optional[ArchiveRun] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self.run_forever())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def run_forever(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                self.last_run = await archive_issues()
+            except Exception:
+                logger.exception("Issue archiving failed")
+
+issue_archiver = IssueArchiver(settings.ARCHIVE_INTERVAL)
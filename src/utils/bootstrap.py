@@ -0,0 +1,155 @@
+import asyncio
+import logging
+import os
+
+from sqlalchemy import MetaData, Table, inspect, literal, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.schema import CreateIndex, CreateTable
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from ..config import settings
+from ..database import Base, engine
+from ..models.template import Template
+from .process_lock import FileLock
+from .template_engine import TemplateSyntaxError, compile_template, template_cache
+from .template_sync import sync_templates
+
+logger = logging.getLogger(__name__)
+
+# Set by the pre-fork server once it has bootstrapped, so its workers skip it
+BOOTSTRAPPED_ENV = "PMS_BOOTSTRAPPED"
+
+# Tables holding rows that moved out of an AUTOINCREMENT table under their
+# original ids; a rebuilt table's sequence starts past those too
+RESERVED_ID_TABLES = {"issues": ("issue_archive",)}
+
+async def bootstrap() -> None:
+    """
+    Create the schema and sync templates from disk. Processes starting
+    together take turns on BOOTSTRAP_LOCK_PATH instead of racing; whoever goes
+    second finds the tables there and the template manifest up to date.
+    """
+    lock = FileLock(settings.BOOTSTRAP_LOCK_PATH)
+    await asyncio.get_running_loop().run_in_executor(None, lock.acquire)
+    try:
+        await _create_schema()
+        async with AsyncSession(engine) as db:
+            await sync_templates(db)
+    finally:
+        lock.release()
+
+async def ensure_schema() -> None:
+    """
+    The schema half of bootstrap, for maintenance commands that may be the
+    first thing to run against a database from an older release.
+    """
+    lock = FileLock(settings.BOOTSTRAP_LOCK_PATH)
+    await asyncio.get_running_loop().run_in_executor(None, lock.acquire)
+    try:
+        await _create_schema()
+    finally:
+        lock.release()
+
+async def _create_schema() -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(migrate_schema)
+
+def migrate_schema(connection: Connection) -> list[str]:
+    """
+    Bring tables created by an older release up to the models. create_all
+    only creates missing tables, so columns added to a model since are added
+    with ALTER TABLE, backfilled from their server default (or a scalar
+    default), SQLite tables that have since become AUTOINCREMENT are rebuilt,
+    and missing indexes are created. Safe to run on every start. Returns the
+    columns added, as "table.column".
+    """
+    inspector = inspect(connection)
+    compiler = connection.dialect.ddl_compiler(connection.dialect, None)
+    added = []
+    for table in Base.metadata.sorted_tables:
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            specification = compiler.get_column_specification(column)
+            if column.server_default is None and column.default is not None and column.default.is_scalar:
+                default = literal(column.default.arg).compile(dialect=connection.dialect, compile_kwargs={"literal_binds": True})
+                specification += f" DEFAULT {default}"
+            elif not column.nullable and column.server_default is None:
+                raise RuntimeError(f"Cannot add NOT NULL column {table.name}.{column.name} without a default")
+            connection.execute(text(f"ALTER TABLE {compiler.preparer.format_table(table)} ADD COLUMN {specification}"))
+            added.append(f"{table.name}.{column.name}")
+        if _needs_autoincrement(connection, table):
+            _rebuild_with_autoincrement(connection, table)
+        # The inspector doesn't report expression indexes, so let the database check
+        for index in table.indexes:
+            connection.execute(CreateIndex(index, if_not_exists=True))
+    if added:
+        logger.info("Added columns: %s", ", ".join(added))
+    return added
+
+def _needs_autoincrement(connection: Connection, table: Table) -> bool:
+    if connection.dialect.name != "sqlite" or not table.dialect_options["sqlite"]["autoincrement"]:
+        return False
+    sql = connection.execute(
+        text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": table.name}
+    ).scalar()
+    return "AUTOINCREMENT" not in sql.upper()
+
+def _rebuild_with_autoincrement(connection: Connection, table: Table) -> None:
+    # SQLite can't ALTER a primary key into AUTOINCREMENT, so copy the rows
+    # into a new table and swap it in; migrate_schema recreates the indexes
+    target = MetaData()
+    for key in table.foreign_keys:
+        # The copy's foreign keys resolve against the metadata it is copied into
+        key.column.table.to_metadata(target)
+    rebuilt = table.to_metadata(target, name=f"{table.name}_rebuild")
+    preparer = connection.dialect.identifier_preparer
+    columns = ", ".join(preparer.quote(column.name) for column in table.columns)
+    connection.execute(CreateTable(rebuilt))
+    connection.execute(text(
+        f"INSERT INTO {preparer.format_table(rebuilt)} ({columns}) SELECT {columns} FROM {preparer.format_table(table)}"
+    ))
+    connection.execute(text(f"DROP TABLE {preparer.format_table(table)}"))
+    connection.execute(text(f"ALTER TABLE {preparer.format_table(rebuilt)} RENAME TO {preparer.format_table(table)}"))
+    # Ids already handed out but no longer in the table must not come back
+    reserved = [
+        connection.execute(text(f"SELECT max(id) FROM {preparer.quote(name)}")).scalar() or 0
+        for name in RESERVED_ID_TABLES.get(table.name, ())
+    ]
+    highest = max(reserved, default=0)
+    if highest:
+        updated = connection.execute(
+            text("UPDATE sqlite_sequence SET seq = max(seq, :seq) WHERE name = :name"),
+            {"seq": highest, "name": table.name},
+        )
+        if not updated.rowcount:
+            connection.execute(
+                text("INSERT INTO sqlite_sequence (name, seq) VALUES (:name, :seq)"),
+                {"seq": highest, "name": table.name},
+            )
+    logger.info("Rebuilt %s with AUTOINCREMENT ids", table.name)
+
+async def warm_caches() -> int:
+    """Compile the newest templates into the template cache. Returns how many were compiled."""
+    async with AsyncSession(engine) as db:
+        result = await db.execute(
+            select(Template.id, Template.version, Template.content)
+            .order_by(Template.id.desc())
+            .limit(settings.TEMPLATE_CACHE_SIZE)
+        )
+        rows = result.all()
+    compiled = 0
+    for row in rows:
+        try:
+            template_cache.put(compile_template(row.id, row.version, row.content or {}))
+        except TemplateSyntaxError as exc:
+            logger.warning("Skipping malformed template %d: %s", row.id, exc)
+            continue
+        compiled += 1
+    return compiled
+
+def is_bootstrapped() -> bool:
+    return os.environ.get(BOOTSTRAPPED_ENV) == "1"
@@ -0,0 +1,150 @@
+import asyncio
+import itertools
+import os
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from .serialization import dumps
+
+# Bodies are unbounded; change records only say a body changed
+OMITTED_FIELDS = {"body"}
+
+def change(entity: str, op: str, entity_id: int, project_id: Optional[int], fields: Optional[dict] = None) -> dict:
+    """A compact change record: op is "upsert" or "delete", fields the columns that were written."""
+    record = {"entity": entity, "op": op, "id": entity_id, "project_id": project_id}
+    if fields:
+        record["fields"] = {key: value for key, value in fields.items() if key not in OMITTED_FIELDS}
+        if OMITTED_FIELDS & fields.keys():
+            record["changed"] = sorted(OMITTED_FIELDS & fields.keys())
+    return record
+
+def stage_changes(db, records: Iterable[dict]) -> None:
+    """
+    Queue change records on a session. They are published when it commits
+    and discarded if it rolls back, so subscribers never see a write that
+    did not happen.
+    """
+    db.info.setdefault("changes", []).extend(records)
+
+@event.listens_for(Session, "after_commit")
+def _publish_staged(session: Session) -> None:
+    records = session.info.pop("changes", None)
+    if records:
+        change_feed.publish(records)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_staged(session: Session) -> None:
+    session.info.pop("changes", None)
+
+@dataclass
+class ChangeEvent:
+    id: int
+    record: dict
+    # SSE frame, encoded once however many subscribers receive it
+    frame: bytes
+
+@dataclass(eq=False)
+class Subscription:
+    project_ids: Optional[set[int]]
+    entities: Optional[set[str]]
+    queue: asyncio.Queue = field(default_factory=lambda: asyncio.Queue(settings.CHANGE_FEED_SUBSCRIBER_QUEUE))
+    overflowed: bool = False
+
+    def matches(self, record: dict) -> bool:
+        return (self.entities is None or record["entity"] in self.entities) and (
+            self.project_ids is None or record["project_id"] in self.project_ids
+        )
+
+class ChangeFeed:
+    """
+    In-process change bus behind GET /events.
+
+    Published records get increasing ids and are kept in a ring buffer of the
+    last CHANGE_FEED_BUFFER_SIZE, from which a reconnecting client resumes
+    after its Last-Event-ID. Ids are only meaningful to the process that
+    issued them, so they carry a per-process prefix; any other id, or one
+    that has fallen out of the buffer, cannot be resumed from. Records are
+    fanned out to subscribers' bounded queues; a subscriber that falls
+    behind is flagged rather than allowed to hold up publishers.
+    """
+
+    def __init__(self, size: int):
+        self._events: deque[ChangeEvent] = deque(maxlen=size)
+        self._subscriptions: set[Subscription] = set()
+        self.listeners: list[Callable[[list[dict]], None]] = []
+        self.published = 0
+        self.reset_instance()
+
+    def reset_instance(self) -> None:
+        """
+        Start a fresh id space. A forked worker must not keep its parent's
+        prefix, or ids issued by its siblings would parse as its own.
+        """
+        self.instance = os.urandom(4).hex()
+        self._events.clear()
+        self._next_id = 1
+
+    def event_id(self, sequence: int) -> str:
+        return f"{self.instance}-{sequence}"
+
+    def parse_event_id(self, value: Optional[str]) -> Optional[int]:
+        """The sequence number of one of this process's event ids, or None."""
+        prefix, _, sequence = (value or "").partition("-")
+        if prefix != self.instance or not sequence.isdigit():
+            return None
+        return int(sequence)
+
+    def publish(self, records: list[dict], broadcast: bool = True) -> None:
+        for record in records:
+            sequence = self._next_id
+            self._next_id += 1
+            frame = b"id: %s\nevent: change\ndata: %s\n\n" % (self.event_id(sequence).encode(), dumps(record))
+            change_event = ChangeEvent(sequence, record, frame)
+            self._events.append(change_event)
+            for subscription in self._subscriptions:
+                if subscription.overflowed or not subscription.matches(record):
+                    continue
+                try:
+                    subscription.queue.put_nowait(change_event)
+                except asyncio.QueueFull:
+                    subscription.overflowed = True
+        self.published += len(records)
+        # Listeners (e.g. the invalidation bus) forward local writes to other workers
+        if broadcast:
+            for listener in self.listeners:
+                listener(records)
+
+    def since(self, sequence: int) -> Optional[list[ChangeEvent]]:
+        """Buffered events after sequence, or None if some of them are no longer buffered."""
+        first = self._events[0].id if self._events else self._next_id
+        if not first - 1 <= sequence < self._next_id:
+            return None
+        return list(itertools.islice(self._events, sequence - first + 1, None))
+
+    def subscribe(self, project_ids: Optional[Iterable[int]] = None, entities: Optional[Iterable[str]] = None) -> Subscription:
+        subscription = Subscription(
+            set(project_ids) if project_ids else None,
+            set(entities) if entities else None,
+        )
+        self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscriptions.discard(subscription)
+
+    def stats(self) -> dict:
+        return {
+            "subscribers": len(self._subscriptions),
+            "published": self.published,
+            "buffered": len(self._events),
+            "last_event_id": self.event_id(self._next_id - 1) if self._next_id > 1 else None,
+        }
+
+change_feed = ChangeFeed(settings.CHANGE_FEED_BUFFER_SIZE)
+# The pre-fork server imports this module in the master before forking its workers
+os.register_at_fork(after_in_child=change_feed.reset_instance)
@@ -0,0 +1,173 @@
+import asyncio
+import logging
+import re
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Iterable, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from ..config import settings
+from ..crud.issue import update_issues
+from ..crud.project_stats import is_closed
+from ..models.issue import Issue
+from . import github_cli
+
+logger = logging.getLogger(__name__)
+
+# git log --format separators: unit separator between hash and message, record separator after each commit
+FIELD_SEPARATOR = "\x1f"
+RECORD_SEPARATOR = "\x1e"
+READ_CHUNK_SIZE = 1 << 16
+
+# Same keywords GitHub honours; "owner/repo#N" references are matched so they can be filtered by repository.
+# A reference starts the message or follows whitespace or punctuation, so "abc#12" and URL fragments don't count.
+ISSUE_REFERENCE = re.compile(
+    r"(?:\b(?P<keyword>close[sd]?|fix(?:e[sd])?|resolve[sd]?|reopen(?:s|ed)?)\b:?\s+)?"
+    r"(?<![\w/.#-])(?:(?P<repository>[\w.-]+/[\w.-]+))?#(?P<number>\d+)\b",
+    re.IGNORECASE,
+)
+
+@dataclass
+class IssueTally:
+    """Net effect of a push range on one issue: the last close/reopen keyword wins."""
+    action: Optional[str] = None  # "close" or "reopen"
+    mentioned: bool = False
+
+@dataclass
+class TrackResult:
+    commits: int = 0
+    referenced: int = 0
+    updated: dict[str, str] = field(default_factory=dict)  # github id -> new status
+    failed: dict[str, str] = field(default_factory=dict)  # github id -> error
+
+async def iter_commits(rev_range: str, repo_path: str = ".") -> AsyncIterator[tuple[str, str]]:
+    """Stream (sha, message) pairs for a revision range, oldest first, without buffering the whole log."""
+    process = await asyncio.create_subprocess_exec(
+        "git", "-C", repo_path, "log", "--reverse", f"--format=%H{FIELD_SEPARATOR}%B{RECORD_SEPARATOR}", rev_range,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    buffer = ""
+    while True:
+        chunk = await process.stdout.read(READ_CHUNK_SIZE)
+        if not chunk:
+            break
+        buffer += chunk.decode("utf-8", errors="replace")
+        *records, buffer = buffer.split(RECORD_SEPARATOR)
+        for record in records:
+            sha, _, message = record.lstrip("\n").partition(FIELD_SEPARATOR)
+            yield sha, message
+    stderr = await process.stderr.read()
+    if await process.wait() != 0:
+        raise RuntimeError(f"git log {rev_range} failed: {stderr.decode().strip()}")
+
+def parse_references(message: str, repository: Optional[str] = None) -> Iterable[tuple[str, Optional[str]]]:
+    """(issue number, "close" | "reopen" | None) for every reference to this repository's issues."""
+    if "#" not in message:
+        return
+    for match in ISSUE_REFERENCE.finditer(message):
+        other = match.group("repository")
+        if other is not None and (repository is None or other.lower() != repository.lower()):
+            continue
+        keyword = (match.group("keyword") or "").lower()
+        yield match.group("number"), "reopen" if keyword.startswith("reopen") else "close" if keyword else None
+
+async def collapse_commits(commits: AsyncIterator[tuple[str, str]], repository: Optional[str] = None) -> tuple[int, dict[str, IssueTally]]:
+    """Fold a stream of commits into one tally per referenced issue. Returns (commit count, tallies)."""
+    tallies: dict[str, IssueTally] = {}
+    count = 0
+    async for sha, message in commits:
+        count += 1
+        for number, action in parse_references(message, repository):
+            tally = tallies.setdefault(number, IssueTally())
+            tally.mentioned = True
+            if action is not None:
+                tally.action = action
+    return count, tallies
+
+def resolve_status(tally: IssueTally, current: str) -> Optional[str]:
+    """The status an issue should end up in, or None to leave it alone."""
+    if tally.action == "close":
+        return None if is_closed(current) else "closed"
+    if tally.action == "reopen":
+        return "open" if is_closed(current) else None
+    # A plain reference means work has started, but never overrides a richer status
+    return "in_progress" if (current or "").lower() == "open" else None
+
+async def track_commits(
+    db: AsyncSession, rev_range: str, repo_path: str = ".", dry_run: bool = False, update_github: bool = True
+) -> TrackResult:
+    """
+    Apply the issue references in a push range: closing keywords close the
+    issue, "reopens #N" reopens it and a bare "#N" moves an open issue to
+    in_progress. Issues are matched on github_id (the GitHub issue number);
+    with update_github, ones missing from the local database are looked up
+    on GitHub, so the command also works against an empty database.
+    Open/closed changes are pushed to GitHub in batched GraphQL calls, then
+    everything that succeeded is written locally in one executemany UPDATE.
+    """
+    result = TrackResult()
+    result.commits, tallies = await collapse_commits(iter_commits(rev_range, repo_path), settings.GITHUB_REPOSITORY)
+    result.referenced = len(tallies)
+    if not tallies:
+        return result
+
+    current: dict[str, tuple[int, str]] = {}
+    numbers = list(tallies)
+    for start in range(0, len(numbers), 500):
+        rows = await db.execute(
+            select(Issue.github_id, Issue.id, Issue.status).where(Issue.github_id.in_(numbers[start:start + 500]))
+        )
+        current.update({row.github_id: (row.id, row.status) for row in rows})
+
+    planned = {}
+    for number, (issue_id, status) in current.items():
+        new_status = resolve_status(tallies[number], status)
+        if new_status is not None:
+            planned[number] = new_status
+
+    size = settings.GITHUB_GRAPHQL_BATCH_SIZE
+    if update_github:
+        # Issues missing locally (e.g. on a CI runner with an empty database)
+        # are looked up on GitHub; only their open/closed state can change
+        missing = [number for number in numbers if number not in current]
+        for start in range(0, len(missing), size):
+            chunk = missing[start:start + size]
+            try:
+                states = await github_cli.get_github_issue_states(chunk)
+            except Exception as exc:
+                result.failed.update((number, str(exc)) for number in chunk)
+                continue
+            for number, state in states.items():
+                new_status = resolve_status(tallies[number], state)
+                if new_status in ("open", "closed"):
+                    planned[number] = new_status
+    if dry_run or not planned:
+        result.updated = planned
+        return result
+
+    if update_github:
+        # in_progress has no GitHub equivalent; only open/closed transitions go out
+        remote = [(number, status) for number, status in planned.items() if status in ("open", "closed")]
+        for start in range(0, len(remote), size):
+            chunk = remote[start:start + size]
+            try:
+                outcomes = await github_cli.set_github_issue_states_batch(chunk)
+            except Exception as exc:
+                outcomes = [exc] * len(chunk)
+            for (number, _), outcome in zip(chunk, outcomes):
+                if isinstance(outcome, Exception):
+                    result.failed[number] = str(outcome)
+                    planned.pop(number)
+
+    # Already applied on GitHub (or local-only), so nothing goes through the outbox
+    await update_issues(
+        db,
+        [{"id": current[number][0], "status": status} for number, status in planned.items() if number in current],
+        enqueue=False,
+    )
+    result.updated = planned
+    for number, error in result.failed.items():
+        logger.warning("Could not update issue #%s on GitHub: %s", number, error)
+    return result
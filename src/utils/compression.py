@@ -0,0 +1,37 @@
+import zlib
+from typing import Optional
+
+from ..config import settings
+
+try:
+    import zstandard
+except ImportError:  # optional: pip install zstandard; zlib is used otherwise
+    zstandard = None
+
+def default_codec() -> str:
+    if settings.ARCHIVE_COMPRESSION == "auto":
+        return "zstd" if zstandard is not None else "zlib"
+    if settings.ARCHIVE_COMPRESSION == "zstd" and zstandard is None:
+        raise RuntimeError("ARCHIVE_COMPRESSION=zstd requires the zstandard package")
+    return settings.ARCHIVE_COMPRESSION
+
+def compress_text(text: Optional[str], codec: str) -> Optional[bytes]:
+    if text is None:
+        return None
+    data = text.encode()
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=settings.ARCHIVE_COMPRESSION_LEVEL).compress(data)
+    if codec == "zlib":
+        return zlib.compress(data, settings.ARCHIVE_COMPRESSION_LEVEL)
+    raise ValueError(f"Unknown compression codec: {codec}")
+
+def decompress_text(data: Optional[bytes], codec: str) -> Optional[str]:
+    if data is None:
+        return None
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("Reading zstd-compressed archives requires the zstandard package")
+        return zstandard.ZstdDecompressor().decompress(data).decode()
+    if codec == "zlib":
+        return zlib.decompress(data).decode()
+    raise ValueError(f"Unknown compression codec: {codec}")
@@ -0,0 +1,259 @@
+import heapq
+from array import array
+from collections import OrderedDict, deque
+from typing import Iterable, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import settings
+from ..crud.issue_dependency import get_open_issue_ids, get_project_dependency_edges
+from .response_cache import response_cache
+
+class DependencyCycleError(Exception):
+    def __init__(self, cycle: list[int]):
+        super().__init__("Issue dependencies contain a cycle")
+        self.cycle = cycle
+
+def _csr(size: int, pairs: list[tuple[int, int]]) -> tuple[array, array]:
+    """Compressed sparse rows: the neighbours of node i are targets[offsets[i]:offsets[i + 1]]."""
+    offsets = array("l", [0]) * (size + 1)
+    for source, _ in pairs:
+        offsets[source + 1] += 1
+    for i in range(size):
+        offsets[i + 1] += offsets[i]
+    fill = array("l", offsets)
+    targets = array("l", [0]) * len(pairs)
+    for source, target in pairs:
+        targets[fill[source]] = target
+        fill[source] += 1
+    return offsets, targets
+
+class DependencyGraph:
+    """
+    Immutable adjacency index of one project's dependency edges.
+
+    Issues are renumbered 0..n-1 (nodes maps back to issue ids) and edges
+    are held as forward (blocker -> blocked) and reverse CSR integer arrays,
+    so traversals never touch the database or allocate per edge.
+    """
+
+    def __init__(self, edges: list[tuple[int, int]], open_ids: Optional[Iterable[int]] = None):
+        ids = sorted({issue_id for edge in edges for issue_id in edge})
+        self.nodes = array("q", ids)
+        self.index = {issue_id: i for i, issue_id in enumerate(ids)}
+        pairs = [(self.index[blocker], self.index[blocked]) for blocker, blocked in edges]
+        self.out_offsets, self.out_targets = _csr(len(ids), pairs)
+        self.in_offsets, self.in_targets = _csr(len(ids), [(blocked, blocker) for blocker, blocked in pairs])
+        self._order: Optional[list[int]] = None
+        # Issues not known to be open (closed ones, archived ones) no longer block
+        self.closed = bytearray(len(ids)) if open_ids is None else bytearray(b"\x01" * len(ids))
+        for issue_id in open_ids or ():
+            i = self.index.get(issue_id)
+            if i is not None:
+                self.closed[i] = 0
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.out_targets)
+
+    def _reachable(self, start: int, offsets: array, targets: array, skip_closed: bool = False) -> list[int]:
+        seen = bytearray(len(self.nodes))
+        seen[start] = 1
+        queue = deque([start])
+        found = []
+        while queue:
+            node = queue.popleft()
+            for neighbour in targets[offsets[node]:offsets[node + 1]]:
+                if not seen[neighbour] and not (skip_closed and self.closed[neighbour]):
+                    seen[neighbour] = 1
+                    found.append(neighbour)
+                    queue.append(neighbour)
+        return found
+
+    def blocked_by(self, issue_id: int) -> list[int]:
+        """Every issue transitively blocked by issue_id, nearest first."""
+        start = self.index.get(issue_id)
+        if start is None:
+            return []
+        return [self.nodes[i] for i in self._reachable(start, self.out_offsets, self.out_targets)]
+
+    def blockers_of(self, issue_id: int, open_only: bool = False) -> list[int]:
+        """Every issue issue_id transitively waits on, nearest first."""
+        start = self.index.get(issue_id)
+        if start is None:
+            return []
+        return [self.nodes[i] for i in self._reachable(start, self.in_offsets, self.in_targets, open_only)]
+
+    def reaches(self, source_id: int, target_id: int, extra: Optional[dict[int, list[int]]] = None) -> bool:
+        """
+        Whether target_id is transitively blocked by source_id, following this
+        graph's edges plus extra (blocker id -> blocked ids, e.g. edges not yet
+        written). Adding target -> source would then close a cycle.
+        """
+        extra = extra or {}
+        seen = {source_id}
+        stack = [source_id]
+        while stack:
+            issue_id = stack.pop()
+            node = self.index.get(issue_id)
+            neighbours = list(extra.get(issue_id, ()))
+            if node is not None:
+                neighbours.extend(self.nodes[i] for i in self.out_targets[self.out_offsets[node]:self.out_offsets[node + 1]])
+            for neighbour in neighbours:
+                if neighbour == target_id:
+                    return True
+                if neighbour not in seen:
+                    seen.add(neighbour)
+                    stack.append(neighbour)
+        return False
+
+    def find_cycle(self) -> Optional[list[int]]:
+        """One dependency cycle as issue ids (each blocks the next, the last blocks the first), or None."""
+        if self._order is not None:
+            return None
+        size = len(self.nodes)
+        state = bytearray(size)  # 0 unvisited, 1 on the current path, 2 done
+        offsets, targets = self.out_offsets, self.out_targets
+        for root in range(size):
+            if state[root]:
+                continue
+            path = [root]
+            cursors = [offsets[root]]
+            state[root] = 1
+            while path:
+                node = path[-1]
+                if cursors[-1] < offsets[node + 1]:
+                    neighbour = targets[cursors[-1]]
+                    cursors[-1] += 1
+                    if state[neighbour] == 1:
+                        return [self.nodes[i] for i in path[path.index(neighbour):]]
+                    if state[neighbour] == 0:
+                        state[neighbour] = 1
+                        path.append(neighbour)
+                        cursors.append(offsets[neighbour])
+                else:
+                    state[node] = 2
+                    path.pop()
+                    cursors.pop()
+        return None
+
+    def topological_order(self) -> list[int]:
+        """
+        Issue ids with every blocker before the issues it blocks; ties go to
+        the lower issue id. Raises DependencyCycleError if there is no such order.
+        """
+        if self._order is not None:
+            return self._order
+        size = len(self.nodes)
+        offsets, targets = self.out_offsets, self.out_targets
+        indegree = array("l", (self.in_offsets[i + 1] - self.in_offsets[i] for i in range(size)))
+        ready = [i for i in range(size) if indegree[i] == 0]
+        heapq.heapify(ready)
+        order = []
+        while ready:
+            node = heapq.heappop(ready)
+            order.append(self.nodes[node])
+            for neighbour in targets[offsets[node]:offsets[node + 1]]:
+                indegree[neighbour] -= 1
+                if indegree[neighbour] == 0:
+                    heapq.heappush(ready, neighbour)
+        if len(order) < size:
+            raise DependencyCycleError(self.find_cycle() or [])
+        # The graph never changes once built, so neither does its order
+        self._order = order
+        return order
+
+    def critical_path(self, issue_id: int) -> list[int]:
+        """
+        The longest chain of open issues that has to be finished, one after
+        another, before issue_id: the issue ids from the first to issue_id
+        itself. Closed issues no longer block anything and are left out.
+        """
+        target = self.index.get(issue_id)
+        if target is None:
+            return [issue_id]
+        # Only the target's open ancestors matter; order them with Kahn's algorithm
+        members = self._reachable(target, self.in_offsets, self.in_targets, skip_closed=True) + [target]
+        inside = bytearray(len(self.nodes))
+        for node in members:
+            inside[node] = 1
+        indegree = {node: 0 for node in members}
+        for node in members:
+            for neighbour in self.out_targets[self.out_offsets[node]:self.out_offsets[node + 1]]:
+                if inside[neighbour]:
+                    indegree[neighbour] += 1
+        ready = deque(node for node in members if indegree[node] == 0)
+        length = dict.fromkeys(members, 1)
+        previous: dict[int, int] = {}
+        visited = 0
+        while ready:
+            node = ready.popleft()
+            visited += 1
+            for neighbour in self.out_targets[self.out_offsets[node]:self.out_offsets[node + 1]]:
+                if not inside[neighbour]:
+                    continue
+                if length[node] + 1 > length[neighbour]:
+                    length[neighbour] = length[node] + 1
+                    previous[neighbour] = node
+                indegree[neighbour] -= 1
+                if indegree[neighbour] == 0:
+                    ready.append(neighbour)
+        if visited < len(members):
+            raise DependencyCycleError(self.find_cycle() or [])
+        path = [target]
+        while path[-1] in previous:
+            path.append(previous[path[-1]])
+        return [self.nodes[i] for i in reversed(path)]
+
+class DependencyGraphCache:
+    """
+    LRU of per-project DependencyGraphs. Dependency writes invalidate their
+    project; issue writes (status changes, deletes) invalidate every cached
+    graph containing the issue. Both arrive through response cache
+    invalidations, so they also reach other worker processes. A load that
+    overlapped an invalidation is served but not stored.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._graphs: OrderedDict[int, DependencyGraph] = OrderedDict()
+        self._generation = 0
+
+    def on_invalidate(self, kind: str, ids: Optional[tuple[int, ...]], broadcast: bool) -> None:
+        if kind == "dependency":
+            self._generation += 1
+            for project_id in ids if ids is not None else list(self._graphs):
+                self._graphs.pop(project_id, None)
+        elif kind == "issue":
+            self._generation += 1
+            if ids is None:
+                self._graphs.clear()
+                return
+            for project_id, graph in list(self._graphs.items()):
+                if any(issue_id in graph.index for issue_id in ids):
+                    del self._graphs[project_id]
+
+    async def get(self, db: AsyncSession, project_id: int) -> DependencyGraph:
+        graph = self._graphs.get(project_id)
+        if graph is not None:
+            self._graphs.move_to_end(project_id)
+            return graph
+        generation = self._generation
+        edges = await get_project_dependency_edges(db, project_id)
+        open_ids = await get_open_issue_ids(db, project_id) if edges else set()
+        graph = DependencyGraph(edges, open_ids)
+        if generation == self._generation:
+            self._graphs[project_id] = graph
+            while len(self._graphs) > self.maxsize:
+                self._graphs.popitem(last=False)
+        return graph
+
+    def clear(self) -> None:
+        self._generation += 1
+        self._graphs.clear()
+
+dependency_graphs = DependencyGraphCache(settings.DEPENDENCY_GRAPH_CACHE_SIZE)
+response_cache.listeners.append(dependency_graphs.on_invalidate)
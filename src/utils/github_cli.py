@@ -1,68 +1,349 @@
-import subprocess
+import asyncio
 import json
+import logging
+from typing import Any, Optional, Union
+
 from ..config import settings
+from .github_scheduler import GitHubRateLimitError, check_rate_limited, github_scheduler
+
+logger = logging.getLogger(__name__)
+
+class GitHubCLIError(Exception):
+    pass
+
+# gh reports both primary and secondary limits on stderr with this wording
+RATE_LIMIT_MESSAGES = ("rate limit", "abuse detection")
 
-def run_github_cli_command(command: list[str]) -> dict:
-    result = subprocess.run(
-        [settings.GITHUB_CLI_PATH] + command,
-        capture_output=True,
-        text=True,
-        env={"GITHUB_TOKEN": settings.GITHUB_TOKEN}
+async def run_github_cli_command(
+    command: list[str],
+    timeout: Optional[float] = None,
+    input: Optional[bytes] = None,
+    check: bool = True,
+) -> dict:
+    """
+    Run a `gh` command without blocking the event loop.
+
+    Calls are paced and prioritised by the GitHub scheduler, which also
+    retries rate-limited calls. If the call times out or the awaiting task is
+    cancelled, the child process is killed before the error propagates. With
+    check=False a non-zero exit still returns the JSON printed on stdout, if any.
+    """
+    timeout = settings.GITHUB_CLI_TIMEOUT if timeout is None else timeout
+    return await github_scheduler.run(lambda: _run_once(command, timeout, input, check))
+
+async def _run_once(command: list[str], timeout: float, input: Optional[bytes], check: bool) -> dict:
+    process = await asyncio.create_subprocess_exec(
+        settings.GITHUB_CLI_PATH,
+        *command,
+        stdin=asyncio.subprocess.PIPE if input is not None else None,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        env={"GITHUB_TOKEN": settings.GITHUB_TOKEN or ""},
     )
-    if result.returncode != 0:
-        raise Exception(f"GitHub CLI command failed: {result.stderr}")
-    return json.loads(result.stdout)
+    try:
+        stdout, stderr = await asyncio.wait_for(process.communicate(input), timeout=timeout)
+    except asyncio.TimeoutError:
+        _kill(process)
+        await process.wait()
+        raise GitHubCLIError(f"GitHub CLI command timed out after {timeout}s")
+    except asyncio.CancelledError:
+        _kill(process)
+        raise
+    if process.returncode != 0:
+        error = stderr.decode()
+        if any(message in error.lower() for message in RATE_LIMIT_MESSAGES):
+            # gh does not surface Retry-After, so fall back to a fixed pause
+            raise GitHubRateLimitError(f"GitHub CLI command rate limited: {error}", settings.GITHUB_RATE_LIMIT_BACKOFF)
+        if check or not stdout.strip():
+            raise GitHubCLIError(f"GitHub CLI command failed: {error}")
+    result = json.loads(stdout)
+    check_rate_limited(result)
+    return result
 
-def create_github_project(name: str, description: str) -> dict:
-    return run_github_cli_command(["project", "create", name, "--description", description, "--format", "json"])
+def _kill(process: asyncio.subprocess.Process) -> None:
+    if process.returncode is None:
+        try:
+            process.kill()
+        except ProcessLookupError:
+            pass
 
-def update_github_project(project_id: str, name: str, description: str) -> dict:
-    return run_github_cli_command(["project", "update", project_id, "--name", name, "--description", description, "--format", "json"])
+def _optional_flags(*flags: tuple[str, Optional[str]]) -> list[str]:
+    # Only send the fields that are being changed
+    return [part for flag, value in flags if value is not None for part in (flag, value)]
 
-def delete_github_project(project_id: str) -> dict:
-    return run_github_cli_command(["project", "delete", project_id, "--yes", "--format", "json"])
+def _issue_number(result: dict) -> str:
+    # Issues are keyed on their number everywhere else (batch creates, webhooks,
+    # the sync), but gh reports the node id as "id"
+    if result.get("number") is not None:
+        return str(result["number"])
+    tail = (result.get("url") or "").rstrip("/").rsplit("/", 1)[-1]
+    return tail if tail.isdigit() else str(result["id"])
 
-def create_github_issue(project_id: str, title: str, body: str) -> dict:
-    return run_github_cli_command(["issue", "create", "--project", project_id, "--title", title, "--body", body, "--format", "json"])
+class CLITransport:
+    """Runs every GitHub call as a `gh` subprocess."""
 
-def update_github_issue(issue_id: str, title: str, body: str, status: str) -> dict:
-    return run_github_cli_command(["issue", "edit", issue_id, "--title", title, "--body", body, "--status", status, "--format", "json"])
+    async def graphql(self, query: str, variables: dict) -> dict:
+        # gh exits non-zero when any part of the query errors, but still prints the
+        # partial response; callers inspect "errors" themselves
+        body = json.dumps({"query": query, "variables": variables}).encode()
+        return await run_github_cli_command(["api", "graphql", "--input", "-"], input=body, check=False)
 
-def delete_github_issue(issue_id: str) -> dict:
-    return run_github_cli_command(["issue", "delete", issue_id, "--yes", "--format", "json"])
+    async def create_project(self, name: str, description: Optional[str]) -> dict:
+        return await run_github_cli_command(["project", "create", name, "--description", description or "", "--format", "json"])
 
-# Implement other GitHub CLI wrapper functions as needed
-import subprocess
-import json
-from ..config import settings
+    async def update_project(self, project_id: str, name: Optional[str], description: Optional[str]) -> dict:
+        command = ["project", "update", project_id]
+        command += _optional_flags(("--name", name), ("--description", description))
+        return await run_github_cli_command(command + ["--format", "json"])
 
-def run_github_cli_command(command: list[str]) -> dict:
-    result = subprocess.run(
-        [settings.GITHUB_CLI_PATH] + command,
-        capture_output=True,
-        text=True,
-        env={"GITHUB_TOKEN": settings.GITHUB_TOKEN}
-    )
-    if result.returncode != 0:
-        raise Exception(f"GitHub CLI command failed: {result.stderr}")
-    return json.loads(result.stdout)
+    async def delete_project(self, project_id: str) -> dict:
+        return await run_github_cli_command(["project", "delete", project_id, "--yes", "--format", "json"])
+
+    async def create_issue(self, project_id: str, title: str, body: str) -> dict:
+        result = await run_github_cli_command(["issue", "create", "--project", project_id, "--title", title, "--body", body, "--format", "json"])
+        return {**result, "id": _issue_number(result)}
+
+    async def update_issue(self, issue_id: str, title: Optional[str], body: Optional[str], status: Optional[str]) -> dict:
+        command = ["issue", "edit", issue_id]
+        command += _optional_flags(("--title", title), ("--body", body), ("--status", status))
+        return await run_github_cli_command(command + ["--format", "json"])
+
+    async def delete_issue(self, issue_id: str) -> dict:
+        return await run_github_cli_command(["issue", "delete", issue_id, "--yes", "--format", "json"])
+
+    async def close(self) -> None:
+        pass
+
+_transport = None
+
+def get_transport():
+    """The transport selected by GITHUB_TRANSPORT: "cli" (gh subprocesses) or "http" (pooled HTTPS)."""
+    global _transport
+    if _transport is None:
+        if settings.GITHUB_TRANSPORT == "http":
+            from .github_http import HTTPTransport
+            _transport = HTTPTransport()
+        else:
+            _transport = CLITransport()
+    return _transport
+
+async def close_transport() -> None:
+    global _transport
+    if _transport is not None:
+        await _transport.close()
+        _transport = None
+
+async def run_github_graphql(query: str, variables: dict) -> dict:
+    return await get_transport().graphql(query, variables)
+
+async def create_github_project(name: str, description: Optional[str]) -> dict:
+    return await get_transport().create_project(name, description)
+
+async def update_github_project(project_id: str, name: Optional[str] = None, description: Optional[str] = None) -> dict:
+    return await get_transport().update_project(project_id, name, description)
+
+async def delete_github_project(project_id: str) -> dict:
+    return await get_transport().delete_project(project_id)
+
+async def create_github_issue(project_id: str, title: str, body: str) -> dict:
+    return await get_transport().create_issue(project_id, title, body)
+
+async def update_github_issue(issue_id: str, title: Optional[str] = None, body: Optional[str] = None, status: Optional[str] = None) -> dict:
+    return await get_transport().update_issue(issue_id, title, body, status)
+
+async def delete_github_issue(issue_id: str) -> dict:
+    return await get_transport().delete_issue(issue_id)
+
+async def create_github_issues_batch(issues: list[dict]) -> list[Union[dict, Exception]]:
+    """
+    Create many issues with one aliased GraphQL mutation.
+
+    Each item needs "project_id" (the project's GitHub node id), "title" and
+    "body". Returns one entry per item, in order: the created issue as
+    {"id": <issue number>} or the exception describing why that item failed.
+    """
+    definitions = ["$repositoryId: ID!"]
+    fields = []
+    variables: dict[str, Any] = {"repositoryId": settings.GITHUB_REPOSITORY_ID}
+    for i, issue in enumerate(issues):
+        definitions += [f"$title{i}: String!", f"$body{i}: String", f"$project{i}: ID!"]
+        fields.append(
+            f"i{i}: createIssue(input: {{repositoryId: $repositoryId, title: $title{i}, "
+            f"body: $body{i}, projectV2Ids: [$project{i}]}}) {{ issue {{ id number }} }}"
+        )
+        variables.update({f"title{i}": issue["title"], f"body{i}": issue["body"], f"project{i}": issue["project_id"]})
+    query = f"mutation({', '.join(definitions)}) {{ {' '.join(fields)} }}"
+    response = await run_github_graphql(query, variables)
+    return _batch_results(response, "i", len(issues), lambda node: {"id": str(node["issue"]["number"])})
+
+async def create_github_projects_batch(projects: list[dict]) -> list[Union[dict, Exception]]:
+    """
+    Create many projects with one aliased GraphQL mutation. Each item needs
+    "name" and may carry a "description"; results are {"id": <project node
+    id>} or an exception, in order.
+    """
+    definitions = ["$ownerId: ID!"]
+    fields = []
+    variables: dict[str, Any] = {"ownerId": settings.GITHUB_OWNER_ID}
+    for i, project in enumerate(projects):
+        definitions.append(f"$title{i}: String!")
+        fields.append(f"p{i}: createProjectV2(input: {{ownerId: $ownerId, title: $title{i}}}) {{ projectV2 {{ id }} }}")
+        variables[f"title{i}"] = project["name"]
+    query = f"mutation({', '.join(definitions)}) {{ {' '.join(fields)} }}"
+    response = await run_github_graphql(query, variables)
+    results = _batch_results(response, "p", len(projects), lambda node: {"id": node["projectV2"]["id"]})
+
+    # createProjectV2 takes no description, so set them in one follow-up mutation
+    definitions, fields, variables = [], [], {}
+    for i, (project, result) in enumerate(zip(projects, results)):
+        if isinstance(result, Exception) or not project.get("description"):
+            continue
+        definitions += [f"$project{i}: ID!", f"$description{i}: String!"]
+        fields.append(
+            f"d{i}: updateProjectV2(input: {{projectId: $project{i}, shortDescription: $description{i}}}) {{ projectV2 {{ id }} }}"
+        )
+        variables.update({f"project{i}": result["id"], f"description{i}": project["description"]})
+    if fields:
+        query = f"mutation({', '.join(definitions)}) {{ {' '.join(fields)} }}"
+        try:
+            response = await run_github_graphql(query, variables)
+            errors = [error.get("message") for error in response.get("errors") or []]
+        except GitHubCLIError as exc:
+            errors = [str(exc)]
+        # The projects exist either way; failing them here would only create them twice
+        if errors:
+            logger.warning("Setting descriptions of batch-created projects failed: %s", "; ".join(errors))
+    return results
+
+async def _lookup_issues(numbers: list[str], selection: str) -> dict:
+    """One aliased query for issues of GITHUB_REPOSITORY_ID by number; issue i is under "i{i}", or None."""
+    definitions = ["$repositoryId: ID!"]
+    fields = []
+    variables: dict[str, Any] = {"repositoryId": settings.GITHUB_REPOSITORY_ID}
+    for i, number in enumerate(numbers):
+        definitions.append(f"$number{i}: Int!")
+        fields.append(f"i{i}: issue(number: $number{i}) {{ {selection} }}")
+        variables[f"number{i}"] = int(number)
+    query = f"query({', '.join(definitions)}) {{ node(id: $repositoryId) {{ ... on Repository {{ {' '.join(fields)} }} }} }}"
+    response = await run_github_graphql(query, variables)
+    if response.get("errors") and not response.get("data"):
+        raise GitHubCLIError(f"GitHub GraphQL request failed: {response['errors'][0].get('message')}")
+    return (response.get("data") or {}).get("node") or {}
+
+async def get_github_issue_states(numbers: list[str]) -> dict[str, str]:
+    """
+    "open" or "closed" for each of the issue numbers that exists in
+    GITHUB_REPOSITORY_ID, read in one aliased GraphQL query.
+    """
+    repository = await _lookup_issues(numbers, "state")
+    return {
+        number: repository[f"i{i}"]["state"].lower()
+        for i, number in enumerate(numbers)
+        if repository.get(f"i{i}") is not None
+    }
+
+async def set_github_issue_states_batch(states: list[tuple[str, str]]) -> list[Union[dict, Exception]]:
+    """
+    Open or close many issues of GITHUB_REPOSITORY_ID in two GraphQL calls:
+    one aliased query resolving issue numbers to node ids, then one aliased
+    mutation. Items are (issue number, "open" or "closed"); results are
+    {"id": <issue number>} or an exception, in order.
+    """
+    repository = await _lookup_issues([number for number, _ in states], "id")
+
+    results: list[Union[dict, Exception]] = [GitHubCLIError("issue not found")] * len(states)
+    definitions, fields, variables, aliases = [], [], {}, []
+    for i, (number, state) in enumerate(states):
+        node = repository.get(f"i{i}")
+        if node is None:
+            continue
+        mutation = "closeIssue" if state == "closed" else "reopenIssue"
+        definitions.append(f"$issue{i}: ID!")
+        fields.append(f"i{i}: {mutation}(input: {{issueId: $issue{i}}}) {{ issue {{ number }} }}")
+        variables[f"issue{i}"] = node["id"]
+        aliases.append(i)
+    if not fields:
+        return results
+    query = f"mutation({', '.join(definitions)}) {{ {' '.join(fields)} }}"
+    response = await run_github_graphql(query, variables)
+    # Aliases keep the item's original index, so map results back by alias
+    data = response.get("data") or {}
+    errors = {(error.get("path") or [None])[0]: error.get("message", "unknown error") for error in response.get("errors") or []}
+    if None in errors:
+        raise GitHubCLIError(f"GitHub GraphQL request failed: {errors[None]}")
+    for i in aliases:
+        node = data.get(f"i{i}")
+        results[i] = {"id": str(node["issue"]["number"])} if node else GitHubCLIError(errors.get(f"i{i}", "no result returned"))
+    return results
 
-def create_github_project(name: str, description: str) -> dict:
-    return run_github_cli_command(["project", "create", name, "--description", description, "--format", "json"])
+def _batch_results(response: dict, prefix: str, count: int, extract) -> list[Union[dict, Exception]]:
+    data = response.get("data") or {}
+    errors: dict[str, str] = {}
+    for error in response.get("errors") or []:
+        path = error.get("path") or []
+        if not path:
+            # An error not tied to one alias (e.g. a bad variable) fails the whole batch
+            raise GitHubCLIError(f"GitHub GraphQL request failed: {error.get('message')}")
+        errors[path[0]] = error.get("message", "unknown error")
+    results: list[Union[dict, Exception]] = []
+    for alias in (f"{prefix}{i}" for i in range(count)):
+        node = data.get(alias)
+        if node is None:
+            results.append(GitHubCLIError(errors.get(alias, "no result returned")))
+        else:
+            results.append(extract(node))
+    return results
 
-def update_github_project(project_id: str, name: str, description: str) -> dict:
-    return run_github_cli_command(["project", "update", project_id, "--name", name, "--description", description, "--format", "json"])
+ISSUES_PAGE_QUERY = """
+query($repositoryId: ID!, $since: DateTime, $cursor: String, $pageSize: Int!) {
+  node(id: $repositoryId) {
+    ... on Repository {
+      issues(first: $pageSize, after: $cursor, filterBy: {since: $since}, orderBy: {field: UPDATED_AT, direction: ASC}) {
+        pageInfo { hasNextPage endCursor }
+        nodes { number title body state updatedAt projectsV2(first: 1) { nodes { id } } }
+      }
+    }
+  }
+}
+"""
 
-def delete_github_project(project_id: str) -> dict:
-    return run_github_cli_command(["project", "delete", project_id, "--yes", "--format", "json"])
+PROJECTS_PAGE_QUERY = """
+query($ownerId: ID!, $cursor: String, $pageSize: Int!) {
+  node(id: $ownerId) {
+    ... on ProjectV2Owner {
+      projectsV2(first: $pageSize, after: $cursor, orderBy: {field: UPDATED_AT, direction: DESC}) {
+        pageInfo { hasNextPage endCursor }
+        nodes { id title shortDescription updatedAt }
+      }
+    }
+  }
+}
+"""
 
-def create_github_issue(project_id: str, title: str, body: str) -> dict:
-    return run_github_cli_command(["issue", "create", "--project", project_id, "--title", title, "--body", body, "--format", "json"])
+async def _fetch_page(query: str, variables: dict, connection: str) -> tuple[list[dict], Optional[str]]:
+    response = await run_github_graphql(query, variables)
+    if response.get("errors"):
+        raise GitHubCLIError(f"GitHub GraphQL request failed: {response['errors'][0].get('message')}")
+    page = ((response.get("data") or {}).get("node") or {}).get(connection) or {}
+    page_info = page.get("pageInfo") or {}
+    return page.get("nodes") or [], page_info.get("endCursor") if page_info.get("hasNextPage") else None
 
-def update_github_issue(issue_id: str, title: str, body: str, status: str) -> dict:
-    return run_github_cli_command(["issue", "edit", issue_id, "--title", title, "--body", body, "--status", status, "--format", "json"])
+async def list_github_issues_page(
+    since: Optional[str] = None, cursor: Optional[str] = None, page_size: int = 100
+) -> tuple[list[dict], Optional[str]]:
+    """
+    One page of the repository's issues updated at or after since, oldest
+    update first. Returns the issue nodes and the cursor of the next page
+    (None on the last page).
+    """
+    variables = {"repositoryId": settings.GITHUB_REPOSITORY_ID, "since": since, "cursor": cursor, "pageSize": page_size}
+    return await _fetch_page(ISSUES_PAGE_QUERY, variables, "issues")
 
-def delete_github_issue(issue_id: str) -> dict:
-    return run_github_cli_command(["issue", "delete", issue_id, "--yes", "--format", "json"])
+async def list_github_projects_page(
+    cursor: Optional[str] = None, page_size: int = 100
+) -> tuple[list[dict], Optional[str]]:
+    """One page of the owner's projects, most recently updated first."""
+    variables = {"ownerId": settings.GITHUB_OWNER_ID, "cursor": cursor, "pageSize": page_size}
+    return await _fetch_page(PROJECTS_PAGE_QUERY, variables, "projectsV2")
 
 # Implement other GitHub CLI wrapper functions as needed
@@ -0,0 +1,161 @@
+import time
+from typing import Any, Optional
+
+from ..config import settings
+from .github_cli import GitHubCLIError
+from .github_scheduler import GitHubRateLimitError, check_rate_limited, github_scheduler
+
+try:
+    import httpx
+except ImportError:  # only needed when GITHUB_TRANSPORT=http
+    httpx = None
+
+CREATE_ISSUE_MUTATION = """
+mutation($repositoryId: ID!, $title: String!, $body: String, $projectId: ID!) {
+  createIssue(input: {repositoryId: $repositoryId, title: $title, body: $body, projectV2Ids: [$projectId]}) {
+    issue { number }
+  }
+}
+"""
+
+CREATE_PROJECT_MUTATION = """
+mutation($ownerId: ID!, $title: String!) {
+  createProjectV2(input: {ownerId: $ownerId, title: $title}) { projectV2 { id } }
+}
+"""
+
+UPDATE_PROJECT_MUTATION = """
+mutation($projectId: ID!, $title: String, $shortDescription: String) {
+  updateProjectV2(input: {projectId: $projectId, title: $title, shortDescription: $shortDescription}) {
+    projectV2 { id }
+  }
+}
+"""
+
+DELETE_PROJECT_MUTATION = """
+mutation($projectId: ID!) { deleteProjectV2(input: {projectId: $projectId}) { projectV2 { id } } }
+"""
+
+DELETE_ISSUE_MUTATION = """
+mutation($issueId: ID!) { deleteIssue(input: {issueId: $issueId}) { clientMutationId } }
+"""
+
+class HTTPTransport:
+    """
+    Talks to the GitHub API directly over one keep-alive connection pool,
+    instead of starting a `gh` process (and a TLS handshake) per call.
+
+    Returns the same shapes as CLITransport: issues are identified by number
+    and projects by node id. Issue edits go through the REST API, which needs
+    GITHUB_REPOSITORY ("owner/name"); everything else is GraphQL.
+    """
+
+    def __init__(self):
+        if httpx is None:
+            raise RuntimeError("GITHUB_TRANSPORT=http requires the httpx package")
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _get_client(self) -> "httpx.AsyncClient":
+        if self._client is None:
+            headers = {"Accept": "application/vnd.github+json", "X-GitHub-Api-Version": "2022-11-28"}
+            if settings.GITHUB_TOKEN:
+                headers["Authorization"] = f"Bearer {settings.GITHUB_TOKEN}"
+            self._client = httpx.AsyncClient(
+                base_url=settings.GITHUB_API_URL,
+                headers=headers,
+                timeout=settings.GITHUB_CLI_TIMEOUT,
+                limits=httpx.Limits(
+                    max_connections=settings.GITHUB_CLI_MAX_CONCURRENCY,
+                    max_keepalive_connections=settings.GITHUB_CLI_MAX_CONCURRENCY,
+                ),
+            )
+        return self._client
+
+    async def request(self, method: str, path: str, json: Any = None) -> dict:
+        return await github_scheduler.run(lambda: self._request_once(method, path, json))
+
+    async def _request_once(self, method: str, path: str, json: Any) -> dict:
+        try:
+            response = await self._get_client().request(method, path, json=json)
+        except httpx.TimeoutException:
+            raise GitHubCLIError(f"GitHub API request timed out after {settings.GITHUB_CLI_TIMEOUT}s")
+        except httpx.HTTPError as exc:
+            raise GitHubCLIError(f"GitHub API request failed: {exc}")
+        headers = response.headers
+        if "x-ratelimit-remaining" in headers and "x-ratelimit-reset" in headers:
+            github_scheduler.update_rate_limit(int(headers["x-ratelimit-remaining"]), float(headers["x-ratelimit-reset"]))
+        if response.status_code in (403, 429) and (
+            "retry-after" in headers or headers.get("x-ratelimit-remaining") == "0" or "rate limit" in response.text.lower()
+        ):
+            if "retry-after" in headers:
+                retry_after = float(headers["retry-after"])
+            elif "x-ratelimit-reset" in headers:
+                retry_after = max(float(headers["x-ratelimit-reset"]) - time.time(), 1.0)
+            else:
+                retry_after = settings.GITHUB_RATE_LIMIT_BACKOFF
+            raise GitHubRateLimitError(f"GitHub API rate limited: {response.status_code}", retry_after)
+        if response.status_code >= 400:
+            raise GitHubCLIError(f"GitHub API request failed: {response.status_code} {response.text}")
+        result = response.json() if response.content else {}
+        check_rate_limited(result)
+        return result
+
+    async def graphql(self, query: str, variables: dict) -> dict:
+        # Like gh, partial failures come back in "errors" for callers to inspect
+        return await self.request("POST", "/graphql", {"query": query, "variables": variables})
+
+    async def _mutate(self, query: str, variables: dict) -> dict:
+        response = await self.graphql(query, variables)
+        if response.get("errors"):
+            raise GitHubCLIError(f"GitHub GraphQL request failed: {response['errors'][0].get('message')}")
+        return response.get("data") or {}
+
+    def _issue_path(self, issue_id: str) -> str:
+        if not settings.GITHUB_REPOSITORY:
+            raise GitHubCLIError("GITHUB_REPOSITORY must be set to edit issues over HTTP")
+        return f"/repos/{settings.GITHUB_REPOSITORY}/issues/{issue_id}"
+
+    async def create_project(self, name: str, description: Optional[str]) -> dict:
+        if not settings.GITHUB_OWNER_ID:
+            raise GitHubCLIError("GITHUB_OWNER_ID must be set to create projects over HTTP")
+        data = await self._mutate(CREATE_PROJECT_MUTATION, {"ownerId": settings.GITHUB_OWNER_ID, "title": name})
+        project_id = data["createProjectV2"]["projectV2"]["id"]
+        if description:
+            await self.update_project(project_id, None, description)
+        return {"id": project_id}
+
+    async def update_project(self, project_id: str, name: Optional[str], description: Optional[str]) -> dict:
+        # Variables left out leave the field unchanged, whereas null would clear it
+        variables = {"projectId": project_id, "title": name, "shortDescription": description}
+        await self._mutate(UPDATE_PROJECT_MUTATION, {k: v for k, v in variables.items() if v is not None})
+        return {"id": project_id}
+
+    async def delete_project(self, project_id: str) -> dict:
+        await self._mutate(DELETE_PROJECT_MUTATION, {"projectId": project_id})
+        return {"id": project_id}
+
+    async def create_issue(self, project_id: str, title: str, body: str) -> dict:
+        if not settings.GITHUB_REPOSITORY_ID:
+            raise GitHubCLIError("GITHUB_REPOSITORY_ID must be set to create issues over HTTP")
+        data = await self._mutate(CREATE_ISSUE_MUTATION, {
+            "repositoryId": settings.GITHUB_REPOSITORY_ID, "title": title, "body": body, "projectId": project_id,
+        })
+        return {"id": str(data["createIssue"]["issue"]["number"])}
+
+    async def update_issue(self, issue_id: str, title: Optional[str], body: Optional[str], status: Optional[str]) -> dict:
+        # GitHub issues are only open or closed; richer local statuses map onto those
+        state = None if status is None else ("closed" if status.lower() in settings.CLOSED_ISSUE_STATUSES else "open")
+        fields = {key: value for key, value in (("title", title), ("body", body), ("state", state)) if value is not None}
+        await self.request("PATCH", self._issue_path(issue_id), fields)
+        return {"id": issue_id}
+
+    async def delete_issue(self, issue_id: str) -> dict:
+        # Deleting needs the issue's node id, which REST hands back by number
+        issue = await self.request("GET", self._issue_path(issue_id))
+        await self._mutate(DELETE_ISSUE_MUTATION, {"issueId": issue["node_id"]})
+        return {"id": issue_id}
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
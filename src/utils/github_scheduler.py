@@ -0,0 +1,181 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+from ..config import settings
+from .metrics import record_github_call
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Lower runs first: calls made on behalf of a user go ahead of sync and bulk jobs
+LANES = {"interactive": 0, "background": 1, "bulk": 2}
+
+github_lane: ContextVar[str] = ContextVar("github_lane", default="interactive")
+
+@contextmanager
+def github_priority(lane: str):
+    """Run the GitHub calls made inside the block (and tasks it spawns) in the given lane."""
+    token = github_lane.set(lane)
+    try:
+        yield
+    finally:
+        github_lane.reset(token)
+
+class GitHubRateLimitError(Exception):
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+def check_rate_limited(payload: Any) -> None:
+    """Raise GitHubRateLimitError for a GraphQL response that was rate limited."""
+    if isinstance(payload, dict):
+        for error in payload.get("errors") or []:
+            if isinstance(error, dict) and error.get("type") == "RATE_LIMITED":
+                raise GitHubRateLimitError(error.get("message", "GitHub rate limit exceeded"), settings.GITHUB_RATE_LIMIT_BACKOFF)
+
+class GitHubScheduler:
+    """
+    Gatekeeper for every GitHub call.
+
+    A token bucket paces calls: it starts at GITHUB_RATE_LIMIT_PER_SECOND and
+    is re-derived from GitHub's remaining/reset figures whenever a response
+    reports them, spreading the remaining budget over the rest of the window.
+    Retry-After (or an exhausted budget) pauses dispatch entirely. At most
+    GITHUB_CLI_MAX_CONCURRENCY calls run at once, and waiting calls are
+    granted in lane order, then arrival order.
+    """
+
+    def __init__(self, concurrency: int, rate: float, burst: float):
+        self.concurrency = concurrency
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._refilled_at = time.monotonic()
+        self._paused_until = 0.0
+        self._active = 0
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._dispatcher: Optional[asyncio.Task] = None
+        self.remaining: Optional[int] = None
+        self.reset_at: Optional[float] = None
+        self._stats = {lane: {"queued": 0, "granted": 0, "wait_seconds": 0.0, "max_wait_seconds": 0.0} for lane in LANES}
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+
+    def _delay(self) -> float:
+        now = time.monotonic()
+        if now < self._paused_until:
+            return self._paused_until - now
+        self._refill()
+        return 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+
+    def _wake(self) -> None:
+        if self._waiters and (self._dispatcher is None or self._dispatcher.done()):
+            self._dispatcher = asyncio.create_task(self._dispatch())
+
+    async def _dispatch(self) -> None:
+        while self._waiters and self._active < self.concurrency:
+            delay = self._delay()
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():
+                continue
+            self._tokens -= 1
+            self._active += 1
+            future.set_result(None)
+
+    def _release(self) -> None:
+        self._active -= 1
+        self._wake()
+
+    @asynccontextmanager
+    async def slot(self, lane: Optional[str] = None):
+        lane = lane or github_lane.get()
+        stats = self._stats[lane]
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (LANES[lane], next(self._sequence), future))
+        stats["queued"] += 1
+        started = time.monotonic()
+        self._wake()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self._release()
+            raise
+        finally:
+            stats["queued"] -= 1
+        waited = time.monotonic() - started
+        stats["granted"] += 1
+        stats["wait_seconds"] += waited
+        stats["max_wait_seconds"] = max(stats["max_wait_seconds"], waited)
+        try:
+            yield
+        finally:
+            self._release()
+
+    def pause(self, seconds: float) -> None:
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def update_rate_limit(self, remaining: int, reset_at: float) -> None:
+        """Re-derive the pace from GitHub's remaining calls and window reset (epoch seconds)."""
+        self.remaining, self.reset_at = remaining, reset_at
+        window = max(reset_at - time.time(), 1.0)
+        if remaining <= 0:
+            self.pause(window)
+            return
+        self._refill()
+        self.rate = max(remaining / window, 1.0 / window)
+        self._tokens = min(self._tokens, remaining)
+
+    async def run(self, call: Callable[[], Awaitable[T]], lane: Optional[str] = None) -> T:
+        """
+        Run call() in a slot, retrying after the advertised delay when GitHub
+        rate limits it. Waits longer than GITHUB_RATE_LIMIT_MAX_WAIT are not
+        sat out; the error is raised for the caller (e.g. the outbox) to retry later.
+        """
+        lane = lane or github_lane.get()
+        for attempt in range(settings.GITHUB_RATE_LIMIT_RETRIES + 1):
+            async with self.slot(lane):
+                started = time.perf_counter()
+                try:
+                    result = await call()
+                except GitHubRateLimitError as exc:
+                    record_github_call(lane, "rate_limited", time.perf_counter() - started)
+                    self.pause(exc.retry_after)
+                    logger.warning("GitHub rate limited; pausing calls for %.1fs", exc.retry_after)
+                    if attempt == settings.GITHUB_RATE_LIMIT_RETRIES or exc.retry_after > settings.GITHUB_RATE_LIMIT_MAX_WAIT:
+                        raise
+                except Exception:
+                    record_github_call(lane, "error", time.perf_counter() - started)
+                    raise
+                else:
+                    record_github_call(lane, "ok", time.perf_counter() - started)
+                    return result
+
+    def stats(self) -> dict:
+        return {
+            "active": self._active,
+            "rate_per_second": self.rate,
+            "tokens": self._tokens,
+            "paused_for_seconds": max(0.0, self._paused_until - time.monotonic()),
+            "rate_limit_remaining": self.remaining,
+            "rate_limit_reset_at": self.reset_at,
+            "lanes": {lane: dict(values) for lane, values in self._stats.items()},
+        }
+
+github_scheduler = GitHubScheduler(
+    settings.GITHUB_CLI_MAX_CONCURRENCY, settings.GITHUB_RATE_LIMIT_PER_SECOND, settings.GITHUB_RATE_LIMIT_BURST
+)
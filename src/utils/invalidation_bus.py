@@ -0,0 +1,136 @@
+import asyncio
+import glob
+import json
+import logging
+import os
+import socket
+from typing import Optional
+
+from ..config import settings
+from .change_feed import change_feed
+from .response_cache import response_cache
+from .template_engine import template_cache
+
+logger = logging.getLogger(__name__)
+
+# Larger invalidations are sent as "everything of this kind" to fit in one datagram
+MAX_IDS_PER_MESSAGE = 1000
+# Change records are split across datagrams of about this size
+MAX_CHANGES_MESSAGE_BYTES = 32768
+
+class InvalidationBus:
+    """
+    Forwards cache invalidations to the other worker processes on this host.
+
+    Each process binds a Unix datagram socket named after its pid in
+    CACHE_BUS_DIR and sends every response cache invalidation to all the
+    other sockets there; receivers drop the same response cache entries and
+    compiled templates. Change feed records travel the same way, so a
+    GET /events stream on any worker sees writes made on all of them.
+    Delivery is best effort: anything missed still expires after
+    RESPONSE_CACHE_TTL.
+    """
+
+    def __init__(self, directory: Optional[str]):
+        self.directory = directory
+        self.path: Optional[str] = None
+        self._sock: Optional[socket.socket] = None
+        self._tasks: set[asyncio.Task] = set()
+        self.sent = 0
+        self.received = 0
+
+    def start(self) -> None:
+        if not self.directory or self._sock is not None:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        self.path = os.path.join(self.directory, f"{os.getpid()}.sock")
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        sock.bind(self.path)
+        sock.setblocking(False)
+        self._sock = sock
+        asyncio.get_running_loop().add_reader(sock.fileno(), self._on_readable)
+        response_cache.listeners.append(self.publish)
+        change_feed.listeners.append(self.publish_changes)
+
+    def stop(self) -> None:
+        if self._sock is None:
+            return
+        response_cache.listeners.remove(self.publish)
+        change_feed.listeners.remove(self.publish_changes)
+        asyncio.get_running_loop().remove_reader(self._sock.fileno())
+        self._sock.close()
+        self._sock = None
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+    def publish(self, kind: str, ids: Optional[tuple[int, ...]], broadcast: bool = True) -> None:
+        if self._sock is None or not broadcast:
+            return
+        if ids is not None and len(ids) > MAX_IDS_PER_MESSAGE:
+            ids = None
+        self._send(json.dumps({"kind": kind, "ids": None if ids is None else list(ids)}).encode(), kind)
+
+    def publish_changes(self, records: list[dict]) -> None:
+        if self._sock is None:
+            return
+        chunk, size = [], 0
+        for record in records:
+            encoded = json.dumps(record, default=str)
+            if chunk and size + len(encoded) > MAX_CHANGES_MESSAGE_BYTES:
+                self._send(('{"changes":[%s]}' % ",".join(chunk)).encode(), "changes")
+                chunk, size = [], 0
+            chunk.append(encoded)
+            size += len(encoded) + 1
+        if chunk:
+            self._send(('{"changes":[%s]}' % ",".join(chunk)).encode(), "changes")
+
+    def _send(self, message: bytes, kind: str) -> None:
+        for path in glob.glob(os.path.join(self.directory, "*.sock")):
+            if path == self.path:
+                continue
+            try:
+                self._sock.sendto(message, path)
+                self.sent += 1
+            except (ConnectionRefusedError, FileNotFoundError):
+                # Left behind by a worker that died without cleaning up
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
+            except BlockingIOError:
+                logger.warning("Cache invalidation for %s dropped: %s is not keeping up", kind, path)
+            except OSError as exc:
+                logger.warning("Cache invalidation for %s dropped: %s", kind, exc)
+
+    def _on_readable(self) -> None:
+        while True:
+            try:
+                data = self._sock.recv(65536)
+            except BlockingIOError:
+                return
+            self.received += 1
+            message = json.loads(data)
+            if "changes" in message:
+                change_feed.publish(message["changes"], broadcast=False)
+                continue
+            task = asyncio.create_task(self._apply(message))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _apply(self, message: dict) -> None:
+        kind, ids = message["kind"], message["ids"]
+        if kind == "template":
+            if ids is None:
+                template_cache.clear()
+            for template_id in ids or ():
+                template_cache.invalidate(template_id)
+        if ids is None:
+            await response_cache.invalidate_kind(kind, broadcast=False)
+        else:
+            await response_cache.invalidate(kind, *ids, broadcast=False)
+
+invalidation_bus = InvalidationBus(settings.CACHE_BUS_DIR)
@@ -0,0 +1,392 @@
+import asyncio
+import glob
+import json
+import logging
+import os
+import time
+from abc import ABC, abstractmethod
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+from sqlalchemy import event
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SQL_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [
+        '{}="{}"'.format(name, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in zip(names, values)
+    ]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+class Metric(ABC):
+    type = ""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+
+    @abstractmethod
+    def samples(self) -> list[str]:
+        """Exposition lines for the current values."""
+
+    @abstractmethod
+    def copy(self) -> "Metric":
+        """An empty metric with the same name, help and labels."""
+
+    @abstractmethod
+    def snapshot(self) -> list:
+        """The current values as JSON-compatible data for merge()."""
+
+    @abstractmethod
+    def merge(self, snapshot: list) -> None:
+        """Add another process's snapshot() onto these values."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Drop every recorded value."""
+
+    def render(self) -> str:
+        return "\n".join([f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}", *self.samples()])
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        super().__init__(name, help, labels)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1.0) -> None:
+        self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def samples(self) -> list[str]:
+        return [
+            f"{self.name}{_format_labels(self.labels, values)} {_format_value(value)}"
+            for values, value in sorted(self._values.items())
+        ]
+
+    def copy(self) -> "Counter":
+        return Counter(self.name, self.help, self.labels)
+
+    def snapshot(self) -> list:
+        return [[list(values), value] for values, value in self._values.items()]
+
+    def merge(self, snapshot: list) -> None:
+        for values, value in snapshot:
+            self.inc(*values, amount=value)
+
+    def clear(self) -> None:
+        self._values.clear()
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(buckets)
+        # Per label set: [count per bucket (non-cumulative) + overflow, sum]
+        self._series: dict[tuple, tuple[list[int], list[float]]] = {}
+
+    def observe(self, *label_values: str, value: float) -> None:
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = ([0] * (len(self.buckets) + 1), [0.0])
+        counts, total = series
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[i] += 1
+                break
+        else:
+            counts[-1] += 1
+        total[0] += value
+
+    def samples(self) -> list[str]:
+        lines = []
+        for values, (counts, total) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="{}"'.format("+Inf" if bound == float("inf") else repr(bound))
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, values, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, values)} {_format_value(total[0])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, values)} {cumulative}")
+        return lines
+
+    def copy(self) -> "Histogram":
+        return Histogram(self.name, self.help, self.labels, self.buckets)
+
+    def snapshot(self) -> list:
+        return [[list(values), counts, total[0]] for values, (counts, total) in self._series.items()]
+
+    def merge(self, snapshot: list) -> None:
+        for values, counts, total in snapshot:
+            series = self._series.setdefault(tuple(values), ([0] * (len(self.buckets) + 1), [0.0]))
+            for i, count in enumerate(counts):
+                series[0][i] += count
+            series[1][0] += total
+
+    def clear(self) -> None:
+        self._series.clear()
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics: list[Metric] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def snapshot(self) -> dict[str, list]:
+        return {metric.name: metric.snapshot() for metric in self.metrics}
+
+    def clear(self) -> None:
+        for metric in self.metrics:
+            metric.clear()
+
+    def render(self, snapshots: Optional[Sequence[dict[str, list]]] = None) -> str:
+        """
+        The exposition text of this process's metrics, or, given snapshots
+        (from several processes), of their sums.
+        """
+        if snapshots is None:
+            return "\n".join(metric.render() for metric in self.metrics) + "\n"
+        rendered = []
+        for metric in self.metrics:
+            combined = metric.copy()
+            for snapshot in snapshots:
+                combined.merge(snapshot.get(metric.name, []))
+            rendered.append(combined.render())
+        return "\n".join(rendered) + "\n"
+
+registry = MetricsRegistry()
+
+http_requests = registry.register(Counter(
+    "http_requests_total", "HTTP requests handled.", ("method", "route", "status")))
+http_request_duration = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency.", ("method", "route")))
+http_request_sql_statements = registry.register(Counter(
+    "http_request_sql_statements_total", "SQL statements run while handling requests.", ("method", "route")))
+http_request_sql_seconds = registry.register(Counter(
+    "http_request_sql_seconds_total", "Time spent in SQL while handling requests.", ("method", "route")))
+http_request_github_calls = registry.register(Counter(
+    "http_request_github_calls_total", "GitHub calls made while handling requests.", ("method", "route")))
+http_request_github_seconds = registry.register(Counter(
+    "http_request_github_seconds_total", "Time spent in GitHub calls while handling requests.", ("method", "route")))
+sql_statement_duration = registry.register(Histogram(
+    "sql_statement_duration_seconds", "SQL statement latency, including background work.", ("engine",), SQL_BUCKETS))
+github_calls = registry.register(Counter(
+    "github_calls_total", "GitHub calls by priority lane and outcome.", ("lane", "outcome")))
+github_call_duration = registry.register(Histogram(
+    "github_call_duration_seconds", "GitHub call latency.", ("lane",)))
+event_loop_lag = registry.register(Histogram(
+    "event_loop_lag_seconds", "How late the event loop ran a timer.", (), LAG_BUCKETS))
+issue_archive_reads = registry.register(Histogram(
+    "issue_archive_read_seconds", "Latency of issue reads served from the archive.", (), SQL_BUCKETS))
+issues_archived = registry.register(Counter(
+    "issues_archived_total", "Issues moved to the archive.", ()))
+
+@dataclass
+class RequestStats:
+    sql_statements: int = 0
+    sql_seconds: float = 0.0
+    github_calls: int = 0
+    github_seconds: float = 0.0
+
+# Set per request by MetricsMiddleware; None outside requests (background tasks)
+current_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("current_request_stats", default=None)
+
+def record_github_call(lane: str, outcome: str, seconds: float) -> None:
+    github_calls.inc(lane, outcome)
+    github_call_duration.observe(lane, value=seconds)
+    stats = current_request_stats.get()
+    if stats is not None:
+        stats.github_calls += 1
+        stats.github_seconds += seconds
+
+def instrument_engine(engine, name: str) -> None:
+    """Time every statement on an (async) engine via cursor execute events."""
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    def before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    def after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        sql_statement_duration.observe(name, value=elapsed)
+        stats = current_request_stats.get()
+        if stats is not None:
+            stats.sql_statements += 1
+            stats.sql_seconds += elapsed
+
+    def failed(context):
+        started = context.connection.info.get("query_started")
+        if started:
+            started.pop()
+
+    event.listen(sync_engine, "before_cursor_execute", before)
+    event.listen(sync_engine, "after_cursor_execute", after)
+    event.listen(sync_engine, "handle_error", failed)
+
+def route_template(scope) -> str:
+    """
+    The request path with its path parameters put back as "{name}", e.g.
+    /projects/{project_id}/report. Paths no route matched share one label so
+    scanners can't blow up label cardinality.
+    """
+    if scope.get("route") is None:
+        return "<unmatched>"
+    segments = scope["path"].split("/")
+    for name, value in (scope.get("path_params") or {}).items():
+        raw = str(value)
+        for i, segment in enumerate(segments):
+            if segment == raw:
+                segments[i] = "{%s}" % name
+                break
+    return "/".join(segments)
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording latency and the SQL/GitHub breakdown of every
+    HTTP request, labelled by route template rather than raw path. Requests
+    slower than SLOW_REQUEST_THRESHOLD seconds are logged with the breakdown.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        stats = RequestStats()
+        token = current_request_stats.set(stats)
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            current_request_stats.reset(token)
+            path = route_template(scope)
+            method = scope["method"]
+            http_requests.inc(method, path, str(status))
+            http_request_duration.observe(method, path, value=elapsed)
+            http_request_sql_statements.inc(method, path, amount=stats.sql_statements)
+            http_request_sql_seconds.inc(method, path, amount=stats.sql_seconds)
+            http_request_github_calls.inc(method, path, amount=stats.github_calls)
+            http_request_github_seconds.inc(method, path, amount=stats.github_seconds)
+            if settings.SLOW_REQUEST_THRESHOLD and elapsed >= settings.SLOW_REQUEST_THRESHOLD:
+                logger.warning(
+                    "Slow request %s %s -> %d in %.1fms (sql: %d statements, %.1fms; github: %d calls, %.1fms)",
+                    method, scope["path"], status, elapsed * 1000,
+                    stats.sql_statements, stats.sql_seconds * 1000, stats.github_calls, stats.github_seconds * 1000,
+                )
+
+class LoopLagMonitor:
+    """Samples event-loop lag: how much later than scheduled a short sleep wakes up."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self.run_forever())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def run_forever(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            scheduled = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            event_loop_lag.observe(value=max(0.0, loop.time() - scheduled))
+
+loop_lag_monitor = LoopLagMonitor(settings.EVENT_LOOP_LAG_INTERVAL)
+
+class MetricsStore:
+    """
+    Lets any worker of a multi-process server answer /metrics for all of them.
+
+    Each process writes a snapshot of its registry to METRICS_DIR/<pid>.json
+    every METRICS_SYNC_INTERVAL seconds and on shutdown; collect() sums every
+    file there. Files of workers that exited are kept, so counters never go
+    backwards when a worker is replaced. Other workers' figures are up to one
+    interval old.
+    """
+
+    def __init__(self, directory: Optional[str], interval: float):
+        self.directory = directory
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self.directory and self._task is None and self.interval > 0:
+            os.makedirs(self.directory, exist_ok=True)
+            self._task = asyncio.create_task(self.run_forever())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self.write()
+
+    async def run_forever(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                self.write()
+            except OSError:
+                logger.exception("Writing metrics snapshot failed")
+
+    def write(self) -> None:
+        path = os.path.join(self.directory, f"{os.getpid()}.json")
+        with open(path + ".tmp", "w") as f:
+            json.dump(registry.snapshot(), f)
+        # Readers see the old snapshot or the new one, never half of one
+        os.replace(path + ".tmp", path)
+
+    def collect(self) -> list[dict[str, list]]:
+        """Snapshots of every process, this one's current as of now."""
+        self.write()
+        snapshots = []
+        for path in glob.glob(os.path.join(self.directory, "*.json")):
+            try:
+                with open(path) as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError):
+                # Removed, or from a process that died mid-write before the rename
+                continue
+        return snapshots
+
+metrics_store = MetricsStore(settings.METRICS_DIR, settings.METRICS_SYNC_INTERVAL)
@@ -0,0 +1,306 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from ..config import settings
+from ..database import AsyncSessionLocal
+from ..models.issue import Issue
+from ..models.outbox import OutboxEntry
+from ..models.project import Project
+from ..crud.github_sync import claim_github_id
+from ..crud.outbox import get_pending_outbox, get_created_github_id, prune_outbox
+from .github_scheduler import github_priority
+from .response_cache import response_cache
+from . import github_cli
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class _Step:
+    operation: str
+    entries: list[OutboxEntry]
+    payload: dict[str, Any] = field(default_factory=dict)
+    github_id: Optional[str] = None
+    skip: bool = False
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+def plan_steps(entries: list[OutboxEntry]) -> list[_Step]:
+    """
+    Collapse the pending entries of a single entity into the GitHub calls that
+    are actually needed: consecutive updates merge into one call, and an
+    entity created and deleted before either reached GitHub needs no call.
+    """
+    steps: list[_Step] = []
+    for entry in entries:
+        if entry.operation == "update" and steps and steps[-1].operation == "update":
+            steps[-1].entries.append(entry)
+            steps[-1].payload.update(entry.payload or {})
+        else:
+            steps.append(_Step(entry.operation, [entry], dict(entry.payload or {}), entry.github_id))
+    if steps and steps[0].operation == "create" and steps[-1].operation == "delete":
+        for step in steps:
+            step.skip = True
+    return steps
+
+class OutboxWorker:
+    """
+    Drains the GitHub outbox in the background.
+
+    Entries are applied in id order per entity, while different entities are
+    synced concurrently (bounded by the GitHub CLI concurrency limit). Failed
+    calls are retried with exponential backoff and dead-lettered after
+    OUTBOX_MAX_ATTEMPTS attempts. Applied entries are pruned after
+    OUTBOX_RETENTION_DAYS.
+    """
+
+    def __init__(self, session_factory=AsyncSessionLocal):
+        self.session_factory = session_factory
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+        self._next_prune = 0.0
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run_forever())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def notify(self) -> None:
+        self._wakeup.set()
+
+    async def run_forever(self) -> None:
+        while True:
+            try:
+                processed = await self.drain_once()
+            except Exception:
+                logger.exception("Outbox drain failed")
+                processed = 0
+            if settings.OUTBOX_PRUNE_INTERVAL > 0 and time.monotonic() >= self._next_prune:
+                self._next_prune = time.monotonic() + settings.OUTBOX_PRUNE_INTERVAL
+                try:
+                    await self.prune()
+                except Exception:
+                    logger.exception("Outbox pruning failed")
+            if processed < settings.OUTBOX_BATCH_SIZE:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=settings.OUTBOX_POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+                else:
+                    # Give a burst of writes a moment to land so it drains as one call
+                    await asyncio.sleep(settings.OUTBOX_COALESCE_WINDOW)
+                self._wakeup.clear()
+
+    async def prune(self) -> int:
+        before = _utcnow() - timedelta(days=settings.OUTBOX_RETENTION_DAYS)
+        async with self.session_factory() as db:
+            pruned = await prune_outbox(db, before)
+            await db.commit()
+        if pruned:
+            logger.info("Pruned %d applied outbox entries", pruned)
+        return pruned
+
+    async def drain_once(self) -> int:
+        async with self.session_factory() as db:
+            now = _utcnow()
+            entries = await get_pending_outbox(db, now, limit=settings.OUTBOX_BATCH_SIZE)
+            if not entries:
+                return 0
+
+            groups: dict[tuple[str, int], list[OutboxEntry]] = {}
+            for entry in entries:
+                groups.setdefault((entry.entity_type, entry.entity_id), []).append(entry)
+            ready = {key: plan_steps(group) for key, group in groups.items()}
+            context = await self._load_context(db, ready)
+            created = await self._batch_create(ready, context)
+
+            results = await asyncio.gather(
+                *(self._run_steps(key, steps, context, created.get(key)) for key, steps in ready.items())
+            )
+            merged = {"issue": [], "project": []}
+            for (key, steps), outcomes in zip(ready.items(), results):
+                merged[key[0]] += await self._record(db, key, steps, outcomes, now)
+            await db.commit()
+            # Creates write the new github_id back onto the entity
+            for entity_type in ("issue", "project"):
+                created_ids = [
+                    entity_id for (kind, entity_id), steps in ready.items()
+                    if kind == entity_type and any(step.operation == "create" for step in steps)
+                ]
+                if created_ids or merged[entity_type]:
+                    await response_cache.invalidate(entity_type, *created_ids, *merged[entity_type])
+            return sum(len(step.entries) for steps in ready.values() for step in steps)
+
+    async def _load_context(self, db: AsyncSession, ready: dict) -> dict:
+        """Fetch the GitHub ids the planned calls need before any call is made."""
+        issue_ids = [entity_id for (entity_type, entity_id) in ready if entity_type == "issue"]
+        project_ids = {entity_id for (entity_type, entity_id) in ready if entity_type == "project"}
+        context: dict[tuple[str, int], Optional[str]] = {}
+        if issue_ids:
+            rows = await db.execute(
+                select(Issue.id, Issue.github_id, Issue.project_id).where(Issue.id.in_(issue_ids))
+            )
+            for issue_id, github_id, project_id in rows:
+                context[("issue", issue_id)] = github_id
+                project_ids.add(project_id)
+        for steps in ready.values():
+            for step in steps:
+                if step.operation == "create" and step.payload.get("project_id") is not None:
+                    project_ids.add(step.payload["project_id"])
+        if project_ids:
+            rows = await db.execute(select(Project.id, Project.github_id).where(Project.id.in_(project_ids)))
+            for project_id, github_id in rows:
+                context[("project", project_id)] = github_id
+        for key, steps in ready.items():
+            # Rows that are already deleted locally keep their id on the create entry
+            if context.get(key) is None and steps[0].operation != "create":
+                context[key] = await get_created_github_id(db, *key)
+        return context
+
+    async def _batch_create(self, ready: dict, context: dict) -> dict:
+        """
+        Send the creates at the head of each entity's queue as batched GraphQL
+        mutations, GITHUB_GRAPHQL_BATCH_SIZE per call. Returns an outcome per
+        entity key; a lone create is left to the regular per-entity path.
+        """
+        outcomes: dict[tuple[str, int], tuple[bool, Optional[str]]] = {}
+        for entity_type, create_batch, target in (
+            ("issue", github_cli.create_github_issues_batch, settings.GITHUB_REPOSITORY_ID),
+            ("project", github_cli.create_github_projects_batch, settings.GITHUB_OWNER_ID),
+        ):
+            # The batch mutations need the repository/owner node id; without it
+            # creates go through the per-entity path instead
+            if not target:
+                continue
+            items = []
+            for key, steps in ready.items():
+                if key[0] != entity_type or steps[0].operation != "create" or steps[0].skip:
+                    continue
+                payload = dict(steps[0].payload)
+                if entity_type == "issue":
+                    payload["project_id"] = context.get(("project", payload["project_id"]))
+                    if payload["project_id"] is None:
+                        continue
+                items.append((key, payload))
+            if len(items) < 2:
+                continue
+
+            size = settings.GITHUB_GRAPHQL_BATCH_SIZE
+            chunks = [items[i:i + size] for i in range(0, len(items), size)]
+            # Batched creates yield to one-off edits made on behalf of users
+            with github_priority("bulk"):
+                responses = await asyncio.gather(
+                    *(create_batch([payload for _, payload in chunk]) for chunk in chunks),
+                    return_exceptions=True,
+                )
+            for chunk, response in zip(chunks, responses):
+                for i, (key, _) in enumerate(chunk):
+                    result = response if isinstance(response, Exception) else response[i]
+                    if isinstance(result, Exception):
+                        outcomes[key] = (False, str(result))
+                    else:
+                        outcomes[key] = (True, str(result["id"]))
+        return outcomes
+
+    async def _run_steps(self, key: tuple[str, int], steps: list[_Step], context: dict, created=None) -> list:
+        """Apply one entity's steps in order, stopping at the first failure."""
+        entity_type, _ = key
+        outcomes = []
+        github_id = context.get(key)
+        for i, step in enumerate(steps):
+            if step.skip:
+                outcomes.append((True, None))
+                continue
+            if i == 0 and created is not None:
+                ok, result = created
+                outcomes.append(created)
+                if not ok:
+                    break
+                github_id = result
+                continue
+            try:
+                github_id = await self._call(entity_type, step, github_id or step.github_id, context)
+            except Exception as exc:
+                outcomes.append((False, str(exc)))
+                break
+            outcomes.append((True, github_id))
+        return outcomes
+
+    async def _call(self, entity_type: str, step: _Step, github_id: Optional[str], context: dict) -> Optional[str]:
+        payload = step.payload
+        if step.operation == "create":
+            if entity_type == "issue":
+                project_github_id = context.get(("project", payload["project_id"]))
+                if project_github_id is None:
+                    raise RuntimeError(f"Project {payload['project_id']} has not been synced to GitHub yet")
+                result = await github_cli.create_github_issue(project_github_id, payload["title"], payload["body"])
+            else:
+                result = await github_cli.create_github_project(payload["name"], payload.get("description"))
+            return str(result["id"])
+
+        if github_id is None:
+            raise RuntimeError(f"No GitHub id known for {entity_type} {step.entries[0].entity_id}")
+        if step.operation == "update":
+            if entity_type == "issue":
+                await github_cli.update_github_issue(
+                    github_id, payload.get("title"), payload.get("body"), payload.get("status")
+                )
+            else:
+                await github_cli.update_github_project(github_id, payload.get("name"), payload.get("description"))
+        elif step.operation == "delete":
+            if entity_type == "issue":
+                await github_cli.delete_github_issue(github_id)
+            else:
+                await github_cli.delete_github_project(github_id)
+        return github_id
+
+    async def _record(self, db: AsyncSession, key: tuple[str, int], steps: list[_Step], outcomes: list, now: datetime) -> list[int]:
+        """Store the outcomes; returns the ids of mirrored duplicates merged away by a create."""
+        entity_type, entity_id = key
+        merged = []
+        for step, (ok, result) in zip(steps, outcomes):
+            ids = [entry.id for entry in step.entries]
+            if ok:
+                await db.execute(
+                    update(OutboxEntry)
+                    .where(OutboxEntry.id.in_(ids))
+                    .values(status="done", processed_at=now, github_id=result, last_error=None)
+                )
+                if step.operation == "create" and not step.skip:
+                    merged += await claim_github_id(db, entity_type, entity_id, result)
+                continue
+
+            attempts = max(entry.attempts for entry in step.entries) + 1
+            if attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+                logger.error("Dead-lettering %s %s %s after %d attempts: %s",
+                             step.operation, entity_type, entity_id, attempts, result)
+                values = {"status": "dead", "processed_at": now}
+            else:
+                delay = min(settings.OUTBOX_BACKOFF_BASE * 2 ** (attempts - 1), settings.OUTBOX_BACKOFF_MAX)
+                values = {"next_attempt_at": now + timedelta(seconds=delay)}
+            await db.execute(
+                update(OutboxEntry)
+                .where(OutboxEntry.id.in_(ids))
+                .values(attempts=attempts, last_error=result, **values)
+            )
+            # Later entries stay pending behind this one, which keeps per-entity order
+            break
+        return merged
+
+outbox_worker = OutboxWorker()
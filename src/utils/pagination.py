@@ -0,0 +1,90 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Optional, Sequence
+
+from sqlalchemy import String, literal, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import ColumnElement, Select
+
+def encode_cursor(values: dict[str, Any]) -> str:
+    raw = json.dumps(values, separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+def decode_cursor(cursor: str) -> dict[str, Any]:
+    """Decode a cursor produced by encode_cursor, raising ValueError if it is malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+    if not isinstance(values, dict):
+        raise ValueError("Invalid cursor")
+    return values
+
+def cursor_after_id(cursor: Optional[str]) -> Optional[int]:
+    if cursor is None:
+        return None
+    after_id = decode_cursor(cursor).get("id")
+    if not isinstance(after_id, int):
+        raise ValueError("Invalid cursor")
+    return after_id
+
+def cursor_after_updated(cursor: Optional[str]) -> Optional[tuple[datetime, int]]:
+    """Decode an (updated_at, id) keyset cursor for lists ordered by last update."""
+    if cursor is None:
+        return None
+    values = decode_cursor(cursor)
+    updated_at, after_id = values.get("updated_at"), values.get("id")
+    if not isinstance(updated_at, str) or not isinstance(after_id, int):
+        raise ValueError("Invalid cursor")
+    try:
+        return datetime.fromisoformat(updated_at), after_id
+    except ValueError as exc:
+        raise ValueError("Invalid cursor") from exc
+
+def paginate(rows: Sequence, limit: int, keys: Sequence[str] = ("id",)) -> tuple[list, Optional[str]]:
+    """
+    Split rows fetched with limit + 1 into the page itself and the cursor for
+    the next page (None on the last page), made of the last item's keys.
+    """
+    items = list(rows[:limit])
+    next_cursor = encode_cursor({key: getattr(items[-1], key) for key in keys}) if len(rows) > limit else None
+    return items, next_cursor
+
+def _stored_timestamp(db: AsyncSession, value: datetime) -> Any:
+    if db.bind.dialect.name != "sqlite":
+        return value
+    # SQLite compares the stored text. Rows stamped by func.now() hold
+    # CURRENT_TIMESTAMP's "YYYY-MM-DD HH:MM:SS", which a bound datetime (always
+    # with ".ffffff") would sort after even when it is the same instant.
+    text = value.strftime("%Y-%m-%d %H:%M:%S")
+    return literal(f"{text}.{value.microsecond:06d}" if value.microsecond else text, String)
+
+def keyset_by_updated(
+    query: Select,
+    db: AsyncSession,
+    updated_column: ColumnElement,
+    id_column: ColumnElement,
+    after: Optional[tuple[datetime, int]] = None,
+) -> Select:
+    """
+    Order by (updated_at, id) and start after the (updated_at, id) of the last
+    row seen, so an (updated_at, id) index seeks straight to the page.
+    """
+    if after is not None:
+        bound = _stored_timestamp(db, after[0])
+        # The plain range lets the index seek; the OR settles ties on updated_at
+        query = query.where(updated_column >= bound, or_(updated_column > bound, id_column > after[1]))
+    return query.order_by(updated_column, id_column)
+
+def cursor_after_rank(cursor: Optional[str]) -> Optional[tuple[float, int]]:
+    """Decode a (rank, id) keyset cursor for relevance-ordered results."""
+    if cursor is None:
+        return None
+    values = decode_cursor(cursor)
+    rank, after_id = values.get("rank"), values.get("id")
+    if not isinstance(rank, (int, float)) or not isinstance(after_id, int):
+        raise ValueError("Invalid cursor")
+    return float(rank), after_id
@@ -0,0 +1,175 @@
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import settings
+from ..database import AsyncSessionLocal
+from ..crud.github_sync import (
+    apply_github_changes, get_local_github_ids, get_record_hashes, get_sync_watermark,
+    save_record_hashes, set_sync_watermark,
+)
+from . import github_cli
+from .github_scheduler import github_priority
+
+logger = logging.getLogger(__name__)
+
+PROJECTS_SCOPE = "projects"
+
+def record_hash(row: dict) -> str:
+    raw = json.dumps(row, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode()
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+def issue_row(node: dict) -> dict:
+    projects = (node.get("projectsV2") or {}).get("nodes") or []
+    return {
+        "github_id": str(node["number"]),
+        "title": node.get("title") or "",
+        "body": node.get("body") or "",
+        "state": (node.get("state") or "open").lower(),
+        "project_github_id": projects[0]["id"] if projects else None,
+    }
+
+def project_row(node: dict) -> dict:
+    return {"github_id": node["id"], "name": node.get("title") or "", "description": node.get("shortDescription")}
+
+@dataclass
+class ReconcileResult:
+    fetched: int = 0
+    changed: int = 0
+    pruned: int = 0
+    seconds: float = 0.0
+
+async def _changed_rows(db: AsyncSession, entity_type: str, rows: list[dict]) -> list[dict]:
+    """
+    Keep only rows whose hash differs from the one stored when they were last
+    applied, and stage the new hashes in the session.
+    """
+    hashes = {row["github_id"]: record_hash(row) for row in rows}
+    stored = await get_record_hashes(db, entity_type, hashes)
+    changed = [row for row in rows if stored.get(row["github_id"]) != hashes[row["github_id"]]]
+    await save_record_hashes(db, entity_type, {row["github_id"]: hashes[row["github_id"]] for row in changed})
+    return changed
+
+async def reconcile_projects(db: AsyncSession, full: bool = False, prune: bool = False) -> ReconcileResult:
+    """
+    Pull projects updated since the last run. GitHub lists them newest first,
+    so paging stops at the first project older than the watermark, which is
+    only advanced once the whole run has been applied.
+    """
+    started = time.perf_counter()
+    result = ReconcileResult()
+    watermark = None if full else await get_sync_watermark(db, PROJECTS_SCOPE)
+    newest, seen, cursor = watermark, set(), None
+    while True:
+        nodes, cursor = await github_cli.list_github_projects_page(cursor, settings.GITHUB_SYNC_PAGE_SIZE)
+        fresh = [node for node in nodes if watermark is None or node["updatedAt"] >= watermark]
+        rows = [project_row(node) for node in fresh]
+        seen.update(row["github_id"] for row in rows)
+        changed = await _changed_rows(db, "project", rows)
+        if changed:
+            await apply_github_changes(db, projects=changed)
+        result.fetched += len(rows)
+        result.changed += len(changed)
+        newest = max([newest or ""] + [node["updatedAt"] for node in fresh]) or None
+        if cursor is None or len(fresh) < len(nodes):
+            break
+
+    if full and prune:
+        missing = await get_local_github_ids(db, "project") - seen
+        if missing:
+            await apply_github_changes(db, deleted_projects=missing)
+        result.pruned = len(missing)
+    await set_sync_watermark(db, PROJECTS_SCOPE, newest)
+    await db.commit()
+    result.seconds = time.perf_counter() - started
+    return result
+
+async def reconcile_issues(db: AsyncSession, full: bool = False, prune: bool = False) -> ReconcileResult:
+    """
+    Pull repository issues updated since the last run, oldest update first.
+    Each page is applied and the watermark advanced in one transaction, so an
+    interrupted run resumes where it stopped.
+    """
+    started = time.perf_counter()
+    result = ReconcileResult()
+    scope = f"issues:{settings.GITHUB_REPOSITORY_ID}"
+    since = None if full else await get_sync_watermark(db, scope)
+    watermark, seen, cursor = since, set(), None
+    while True:
+        nodes, cursor = await github_cli.list_github_issues_page(since, cursor, settings.GITHUB_SYNC_PAGE_SIZE)
+        rows = [issue_row(node) for node in nodes]
+        seen.update(row["github_id"] for row in rows)
+        changed = await _changed_rows(db, "issue", rows)
+        if nodes:
+            watermark = max([watermark or ""] + [node["updatedAt"] for node in nodes])
+            await set_sync_watermark(db, scope, watermark)
+        # Commits the staged hashes and watermark along with the changes
+        await apply_github_changes(db, issues=changed)
+        result.fetched += len(rows)
+        result.changed += len(changed)
+        if cursor is None:
+            break
+
+    if full and prune:
+        missing = await get_local_github_ids(db, "issue") - seen
+        if missing:
+            await apply_github_changes(db, deleted_issues=missing)
+        result.pruned = len(missing)
+    result.seconds = time.perf_counter() - started
+    return result
+
+async def reconcile(full: bool = False, prune: bool = False, session_factory=AsyncSessionLocal) -> dict[str, ReconcileResult]:
+    """
+    Bring local projects and issues in line with GitHub. full ignores the
+    watermarks and re-reads everything (only changed records are still
+    written); prune, with full, also deletes local rows GitHub no longer has.
+    """
+    results = {}
+    with github_priority("background"):
+        async with session_factory() as db:
+            if settings.GITHUB_OWNER_ID:
+                results["projects"] = await reconcile_projects(db, full, prune)
+            if settings.GITHUB_REPOSITORY_ID:
+                results["issues"] = await reconcile_issues(db, full, prune)
+    for name, result in results.items():
+        logger.info(
+            "Reconciled %s: %d fetched, %d changed, %d pruned in %.3fs",
+            name, result.fetched, result.changed, result.pruned, result.seconds,
+        )
+    return results
+
+class ReconcileScheduler:
+    """Runs an incremental reconcile every GITHUB_SYNC_INTERVAL seconds."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self.run_forever())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def run_forever(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await reconcile()
+            except Exception:
+                logger.exception("GitHub reconciliation failed")
+
+reconcile_scheduler = ReconcileScheduler(settings.GITHUB_SYNC_INTERVAL)
@@ -0,0 +1,181 @@
+import hashlib
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Optional
+
+from fastapi import Request, Response
+from ..config import settings
+from .serialization import dumps
+
+@dataclass
+class CacheEntry:
+    body: bytes
+    etag: str
+    expires_at: float
+
+class CacheBackend(ABC):
+    """
+    Storage interface for ResponseCache. Methods are async so a shared store
+    (e.g. Redis) can implement them without changing callers.
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[CacheEntry]:
+        """The live entry under key, or None if it is missing or expired."""
+
+    @abstractmethod
+    async def set(self, key: str, entry: CacheEntry) -> None:
+        """Store entry under key, replacing any existing one."""
+
+    @abstractmethod
+    async def delete(self, *keys: str) -> None:
+        """Drop the given keys; missing ones are ignored."""
+
+    @abstractmethod
+    async def delete_prefix(self, prefix: str) -> None:
+        """Drop every key that starts with prefix."""
+
+    @abstractmethod
+    async def clear(self) -> None:
+        """Drop every entry."""
+
+class MemoryCacheBackend(CacheBackend):
+    """In-process LRU bounded by entry count; expired entries are dropped on read."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+
+    async def get(self, key: str) -> Optional[CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    async def set(self, key: str, entry: CacheEntry) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._entries.pop(key, None)
+
+    async def delete_prefix(self, prefix: str) -> None:
+        for key in [key for key in self._entries if key.startswith(prefix)]:
+            del self._entries[key]
+
+    async def clear(self) -> None:
+        self._entries.clear()
+
+class NullCacheBackend(CacheBackend):
+    async def get(self, key: str) -> Optional[CacheEntry]:
+        return None
+
+    async def set(self, key: str, entry: CacheEntry) -> None:
+        pass
+
+    async def delete(self, *keys: str) -> None:
+        pass
+
+    async def delete_prefix(self, prefix: str) -> None:
+        pass
+
+    async def clear(self) -> None:
+        pass
+
+CACHE_BACKENDS: dict[str, Callable[[], CacheBackend]] = {
+    "memory": lambda: MemoryCacheBackend(settings.RESPONSE_CACHE_MAX_ENTRIES),
+    "none": NullCacheBackend,
+}
+
+def encode_body(value: Any) -> bytes:
+    return dumps(value)
+
+def make_etag(body: bytes) -> str:
+    return '"{}"'.format(hashlib.sha256(body).hexdigest()[:32])
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison, so a W/ prefix is ignored
+    return any(candidate.strip() in (etag, f"W/{etag}") for candidate in if_none_match.split(","))
+
+class ResponseCache:
+    """
+    Read-through cache of serialized JSON responses with strong ETags.
+
+    Keys are "<kind>:<id>" for single entities and "<kind>s:..." for lists,
+    so crud write paths can drop one entity and every list of its kind.
+    Invalidations bump a generation counter; a load that overlapped an
+    invalidation is served but not stored, so a racing write can't leave a
+    stale entry behind for a whole TTL. Listeners are told about every
+    invalidation, with broadcast=False for ones that arrived from another
+    worker process and must not be forwarded again.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: float):
+        self.backend = backend
+        self.ttl = ttl
+        self._generation = 0
+        self.listeners: list[Callable[[str, Optional[tuple[int, ...]], bool], None]] = []
+
+    async def get_or_load(self, key: str, load: Callable[[], Awaitable[Any]]) -> Optional[CacheEntry]:
+        entry = await self.backend.get(key)
+        if entry is not None:
+            return entry
+        generation = self._generation
+        value = await load()
+        if value is None:
+            return None
+        body = encode_body(value)
+        entry = CacheEntry(body, make_etag(body), time.monotonic() + self.ttl)
+        if generation == self._generation:
+            await self.backend.set(key, entry)
+        return entry
+
+    async def invalidate(self, kind: str, *ids: int, broadcast: bool = True) -> None:
+        """Drop the given entities of a kind along with every cached list of that kind."""
+        self._generation += 1
+        await self.backend.delete(*(f"{kind}:{entity_id}" for entity_id in ids))
+        await self.backend.delete_prefix(f"{kind}s:")
+        for listener in self.listeners:
+            listener(kind, ids, broadcast)
+
+    async def invalidate_kind(self, kind: str, broadcast: bool = True) -> None:
+        """Drop every cached entity and list of a kind."""
+        self._generation += 1
+        await self.backend.delete_prefix(f"{kind}:")
+        await self.backend.delete_prefix(f"{kind}s:")
+        for listener in self.listeners:
+            listener(kind, None, broadcast)
+
+    async def clear(self) -> None:
+        self._generation += 1
+        await self.backend.clear()
+
+response_cache = ResponseCache(CACHE_BACKENDS[settings.RESPONSE_CACHE_BACKEND](), settings.RESPONSE_CACHE_TTL)
+
+async def cached_response(
+    request: Request, key: str, load: Callable[[], Awaitable[Any]]
+) -> Optional[Response]:
+    """
+    Serve key from the response cache, calling load() on a miss. Answers
+    304 when If-None-Match matches and returns None if load() found nothing.
+    """
+    entry = await response_cache.get_or_load(key, load)
+    if entry is None:
+        return None
+    headers = {"ETag": entry.etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
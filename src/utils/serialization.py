@@ -0,0 +1,54 @@
+import json
+from datetime import date, datetime
+from typing import Any, Sequence
+
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+
+from .pagination import paginate
+
+try:
+    import orjson
+except ImportError:  # optional: pip install orjson
+    orjson = None
+
+def _isoformat(value: date) -> str:
+    # Match pydantic's JSON output, which writes UTC as "Z"
+    text = value.isoformat()
+    return text[:-6] + "Z" if text.endswith("+00:00") else text
+
+def _default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return _isoformat(value)
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    return jsonable_encoder(value)
+
+def dumps(value: Any) -> bytes:
+    """Encode to compact UTF-8 JSON, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(value, default=_default, option=orjson.OPT_UTC_Z)
+    return json.dumps(value, default=_default, separators=(",", ":"), ensure_ascii=False).encode()
+
+def schema_columns(model: type, schema: type[BaseModel]) -> list:
+    """The model columns behind a response schema's fields, in the schema's field order."""
+    return [getattr(model, name) for name in schema.model_fields]
+
+class FastJSONResponse(Response):
+    """
+    JSON response for content that is already plain dicts, lists and
+    scalars shaped like the endpoint's response_model. FastAPI skips
+    validation and jsonable_encoder for Response instances.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+def page_response(rows: Sequence, limit: int, keys: Sequence[str] = ("id",)) -> FastJSONResponse:
+    """Page of column rows fetched with limit + 1, selected via schema_columns."""
+    items, next_cursor = paginate(rows, limit, keys)
+    # Row._asdict() rebuilds the key mapping per row; zip against one key tuple instead
+    keys = items[0]._fields if items else ()
+    return FastJSONResponse({"items": [dict(zip(keys, row)) for row in items], "next_cursor": next_cursor})
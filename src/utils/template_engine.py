@@ -0,0 +1,159 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date
+from string import Formatter
+from typing import Any, Callable, Optional
+
+from ..config import settings
+
+class TemplateRenderError(Exception):
+    def __init__(self, errors: list[str]):
+        super().__init__("; ".join(errors))
+        self.errors = errors
+
+class TemplateSyntaxError(TemplateRenderError):
+    """The template itself is malformed, whatever values it is given."""
+
+def _is_date(value: Any) -> bool:
+    if isinstance(value, date):
+        return True
+    try:
+        date.fromisoformat(value)
+        return True
+    except (TypeError, ValueError):
+        return False
+
+FIELD_TYPE_CHECKS: dict[str, Callable[[Any], bool]] = {
+    "string": lambda value: isinstance(value, str),
+    "integer": lambda value: isinstance(value, int) and not isinstance(value, bool),
+    "float": lambda value: isinstance(value, (int, float)) and not isinstance(value, bool),
+    "boolean": lambda value: isinstance(value, bool),
+    "date": _is_date,
+}
+
+@dataclass(frozen=True)
+class FieldSpec:
+    name: str
+    type: str
+    required: bool
+    check: Callable[[Any], bool]
+
+# A format string split once into (literal, field name, format spec) segments
+Segments = tuple[tuple[str, Optional[str], str], ...]
+
+def compile_format(text: str, part: str = "template") -> Segments:
+    if not isinstance(text, str):
+        raise TemplateSyntaxError([f"Template {part} must be a string"])
+    try:
+        return tuple(
+            (literal, field_name, format_spec or "")
+            for literal, field_name, format_spec, _ in Formatter().parse(text)
+        )
+    except ValueError as exc:
+        raise TemplateSyntaxError([f"Invalid template {part}: {exc}"])
+
+def _render(segments: Segments, values: dict[str, Any]) -> str:
+    parts = []
+    for literal, field_name, format_spec in segments:
+        parts.append(literal)
+        if field_name is not None:
+            value = values.get(field_name, "")
+            try:
+                parts.append(format(value, format_spec) if format_spec else str(value))
+            except (TypeError, ValueError) as exc:
+                raise TemplateRenderError([f"Field '{field_name}' cannot be formatted as '{format_spec}': {exc}"])
+    return "".join(parts)
+
+@dataclass(frozen=True)
+class CompiledTemplate:
+    template_id: int
+    version: int
+    title: Segments
+    body: Segments
+    fields: tuple[FieldSpec, ...]
+
+    def validate(self, values: dict[str, Any]) -> list[str]:
+        errors = []
+        for spec in self.fields:
+            value = values.get(spec.name)
+            if value is None or value == "":
+                if spec.required:
+                    errors.append(f"Missing required field '{spec.name}'")
+            elif not spec.check(value):
+                errors.append(f"Field '{spec.name}' must be of type {spec.type}")
+        return errors
+
+    def render(self, values: dict[str, Any]) -> tuple[str, str]:
+        """Validate values against the field schema and render (title, body)."""
+        errors = self.validate(values)
+        if errors:
+            raise TemplateRenderError(errors)
+        return _render(self.title, values), _render(self.body, values)
+
+def compile_template(template_id: int, version: int, content: dict[str, Any]) -> CompiledTemplate:
+    """Compile template content; raises TemplateSyntaxError if it is malformed."""
+    fields = []
+    errors = []
+    field_specs = content.get("fields") or {}
+    if not isinstance(field_specs, dict):
+        raise TemplateSyntaxError(["Template fields must be a table of field specs"])
+    for name, spec in field_specs.items():
+        if not isinstance(spec, dict):
+            errors.append(f"Field '{name}' must be a table with a type")
+            continue
+        field_type = spec.get("type", "string")
+        check = FIELD_TYPE_CHECKS.get(field_type)
+        if check is None:
+            errors.append(f"Field '{name}' has unknown type '{field_type}'")
+            continue
+        fields.append(FieldSpec(name, field_type, bool(spec.get("required", False)), check))
+    if errors:
+        raise TemplateSyntaxError(errors)
+    return CompiledTemplate(
+        template_id=template_id,
+        version=version,
+        title=compile_format(content.get("title", ""), "title"),
+        body=compile_format(content.get("body", ""), "body"),
+        fields=tuple(fields),
+    )
+
+class TemplateCache:
+    """
+    Bounded LRU of compiled templates keyed by (template id, version).
+
+    Lookups are by id and return the newest compiled version; crud.template
+    calls invalidate() on update/delete so stale versions never get served.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[tuple[int, int], CompiledTemplate] = OrderedDict()
+        self._latest: dict[int, int] = {}
+
+    def get(self, template_id: int) -> Optional[CompiledTemplate]:
+        version = self._latest.get(template_id)
+        if version is None:
+            return None
+        key = (template_id, version)
+        self._entries.move_to_end(key)
+        return self._entries[key]
+
+    def put(self, compiled: CompiledTemplate) -> None:
+        self.invalidate(compiled.template_id)
+        key = (compiled.template_id, compiled.version)
+        self._entries[key] = compiled
+        self._latest[compiled.template_id] = compiled.version
+        while len(self._entries) > self.maxsize:
+            (evicted_id, _), _ = self._entries.popitem(last=False)
+            self._latest.pop(evicted_id, None)
+
+    def invalidate(self, template_id: int) -> None:
+        version = self._latest.pop(template_id, None)
+        if version is not None:
+            self._entries.pop((template_id, version), None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._latest.clear()
+
+template_cache = TemplateCache(settings.TEMPLATE_CACHE_SIZE)
@@ -1,6 +1,14 @@
 import toml
 from pathlib import Path
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from ..models.issue import Issue
+from ..models.template import Template
+from ..schemas.issue import IssueUpdate
+from ..crud.template import get_templates
+from ..crud.issue import get_issue, update_issue, update_issues
+from .template_engine import CompiledTemplate, TemplateRenderError, compile_template, template_cache
+from typing import Any, List, Optional
 
 def load_templates(templates_dir: str = "templates") -> dict[str, dict]:
     templates = {}
@@ -10,42 +18,85 @@ def load_templates(templates_dir: str = "templates") -> dict[str, dict]:
             templates[template_name] = toml.load(f)
     return templates
 
-async def apply_template_to_issue(db: AsyncSession, issue_id: int, template_id: int) -> bool:
-    # Implement the logic to apply a template to an issue
-    # This function should:
-    # 1. Load the template
-    # 2. Get the issue
-    # 3. Apply the template to the issue
-    # 4. Update the issue in the database
-    # 5. Return True if successful, False otherwise
-    pass
-import toml
-from pathlib import Path
-from sqlalchemy.ext.asyncio import AsyncSession
-from ..models.template import Template
-from ..schemas.template import TemplateCreate
-from ..crud.template import create_template, get_templates
-from typing import List
+async def get_all_templates(db: AsyncSession, limit: int = 100, after_id: Optional[int] = None) -> list[Template]:
+    return await get_templates(db, limit=limit, after_id=after_id)
 
-async def load_templates_to_db(db: AsyncSession, templates_dir: str = "templates") -> None:
-    # First, get all existing template names
-    existing_templates = {template.name for template in await get_templates(db)}
+def list_available_templates(templates_dir: str = "templates") -> List[str]:
+    """
+    List all available template names in the templates directory.
+    """
+    return [template_file.stem for template_file in Path(templates_dir).glob("*.toml")]
 
-    for template_file in Path(templates_dir).glob("*.toml"):
-        template_name = template_file.stem
-        if template_name not in existing_templates:
-            with open(template_file, "r") as f:
-                template_content = toml.load(f)
-                template_create = TemplateCreate(name=template_name, content=template_content)
-                await create_template(db, template_create)
+async def get_compiled_template(db: AsyncSession, template_id: int) -> Optional[CompiledTemplate]:
+    """
+    Return the compiled form of a template, loading and compiling it only on
+    a cache miss.
+    """
+    compiled = template_cache.get(template_id)
+    if compiled is not None:
+        return compiled
+    result = await db.execute(
+        select(Template.version, Template.content).where(Template.id == template_id)
+    )
+    row = result.first()
+    if row is None:
+        return None
+    compiled = compile_template(template_id, row.version, row.content or {})
+    template_cache.put(compiled)
+    return compiled
 
-    await db.commit()
+def _render_context(issue: Issue, values: Optional[dict[str, Any]]) -> dict[str, Any]:
+    # The issue's own fields are available to templates, overridden by explicit values
+    context = {"title": issue.title, "body": issue.body, "status": issue.status}
+    context.update(values or {})
+    return context
 
-async def get_all_templates(db: AsyncSession, skip: int = 0, limit: int = 100) -> list[Template]:
-    return await get_templates(db, skip=skip, limit=limit)
+async def apply_template_to_issue(
+    db: AsyncSession, issue_id: int, template_id: int, values: Optional[dict[str, Any]] = None
+) -> bool:
+    """
+    Render a template with the given field values and write the result to the
+    issue's title and body. Returns False if the issue or template does not
+    exist and raises TemplateRenderError if the template is malformed or the
+    values fail validation.
+    """
+    compiled = await get_compiled_template(db, template_id)
+    issue = await get_issue(db, issue_id)
+    if compiled is None or issue is None:
+        return False
+    title, body = compiled.render(_render_context(issue, values))
+    await update_issue(db, issue_id, IssueUpdate(title=title, body=body))
+    return True
 
-def list_available_templates(templates_dir: str = "templates") -> List[str]:
+async def apply_template_to_issues(
+    db: AsyncSession, template_id: int, items: list[tuple[int, Optional[dict[str, Any]]]]
+) -> Optional[list[Optional[str]]]:
     """
-    List all available template names in the templates directory.
+    Batch form of apply_template_to_issue: the template is compiled once, the
+    issues are loaded in one query and written back with a single executemany
+    UPDATE. Returns None if the template does not exist, otherwise one entry
+    per item: None on success or an error message.
     """
-    return [template_file.stem for template_file in Path(templates_dir).glob("*.toml")]
+    compiled = await get_compiled_template(db, template_id)
+    if compiled is None:
+        return None
+    issue_ids = {issue_id for issue_id, _ in items}
+    result = await db.execute(select(Issue).where(Issue.id.in_(issue_ids)))
+    issues = {issue.id: issue for issue in result.scalars()}
+
+    outcomes: list[Optional[str]] = []
+    updates = []
+    for issue_id, values in items:
+        issue = issues.get(issue_id)
+        if issue is None:
+            outcomes.append(f"Issue {issue_id} not found")
+            continue
+        try:
+            title, body = compiled.render(_render_context(issue, values))
+        except TemplateRenderError as exc:
+            outcomes.append(str(exc))
+            continue
+        updates.append({"id": issue_id, "title": title, "body": body})
+        outcomes.append(None)
+    await update_issues(db, updates)
+    return outcomes
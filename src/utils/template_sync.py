@@ -0,0 +1,145 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import toml
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import settings
+from ..crud.template import get_template_names, upsert_templates
+from .template_engine import template_cache
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    tomllib = None
+
+logger = logging.getLogger(__name__)
+
+TOML_ERRORS = (toml.TomlDecodeError, UnicodeDecodeError) + ((tomllib.TOMLDecodeError,) if tomllib else ())
+
+def _parse_toml(text: str) -> dict:
+    # The stdlib parser is several times faster than the toml package
+    return tomllib.loads(text) if tomllib else toml.loads(text)
+
+@dataclass
+class TemplateSyncResult:
+    scanned: int = 0
+    parsed: int = 0
+    upserted: int = 0
+    errors: int = 0
+    seconds: float = 0.0
+
+def _scan(templates_dir: str) -> dict[str, os.stat_result]:
+    files = {}
+    with os.scandir(templates_dir) as entries:
+        for entry in entries:
+            if entry.name.endswith(".toml") and entry.is_file():
+                files[entry.name[:-5]] = entry.stat()
+    return files
+
+def _read_and_parse(paths: list[str]) -> list[tuple[str, str, Optional[dict], Optional[str]]]:
+    # Runs in worker processes for large directories, so it only touches plain data
+    results = []
+    for path in paths:
+        raw = Path(path).read_bytes()
+        digest = hashlib.sha256(raw).hexdigest()
+        try:
+            # Round-trip through JSON: the content is stored as JSON anyway, and
+            # toml's inline-table dicts cannot be pickled back from a worker process
+            content = json.loads(json.dumps(_parse_toml(raw.decode()), default=str))
+            results.append((path, digest, content, None))
+        except TOML_ERRORS as exc:
+            results.append((path, digest, None, str(exc)))
+    return results
+
+def load_manifest(path: str) -> dict[str, dict]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def save_manifest(path: str, manifest: dict[str, dict]) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, sort_keys=True)
+    os.replace(tmp_path, path)
+
+async def _parse_all(paths: list[str]) -> list[tuple[str, str, Optional[dict], Optional[str]]]:
+    workers = os.cpu_count() or 1
+    if workers == 1 or len(paths) < settings.TEMPLATE_SYNC_PARALLEL_THRESHOLD:
+        return _read_and_parse(paths)
+    chunk_size = max(1, -(-len(paths) // (workers * 4)))
+    chunks = [paths[i:i + chunk_size] for i in range(0, len(paths), chunk_size)]
+    loop = asyncio.get_running_loop()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        parsed = await asyncio.gather(*(loop.run_in_executor(pool, _read_and_parse, chunk) for chunk in chunks))
+    return [item for chunk in parsed for item in chunk]
+
+async def sync_templates(
+    db: AsyncSession,
+    templates_dir: str = "templates",
+    manifest_path: Optional[str] = None,
+) -> TemplateSyncResult:
+    """
+    Bring the templates table in line with the .toml files in templates_dir.
+
+    A manifest of (mtime, size, sha256) per file decides what to parse: files
+    whose stat matches the manifest and that already exist in the database
+    are skipped without being opened. Changed files are parsed (in worker
+    processes for large directories) and written with one bulk upsert.
+    Removed files are dropped from the manifest but their rows are kept,
+    since templates can also be created through the API.
+    """
+    started = time.perf_counter()
+    manifest_path = manifest_path or settings.TEMPLATE_MANIFEST_PATH
+    manifest = load_manifest(manifest_path)
+    files = _scan(templates_dir)
+    known_names = await get_template_names(db)
+    result = TemplateSyncResult(scanned=len(files))
+
+    new_manifest: dict[str, dict] = {}
+    candidates = []
+    for name, stat in files.items():
+        entry = manifest.get(name)
+        if entry and name in known_names and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+            new_manifest[name] = entry
+        else:
+            candidates.append(name)
+
+    rows = []
+    for path, digest, content, error in await _parse_all([os.path.join(templates_dir, f"{name}.toml") for name in candidates]):
+        name = Path(path).stem
+        stat = files[name]
+        if error is not None:
+            logger.error("Skipping template %s: %s", path, error)
+            result.errors += 1
+            continue
+        result.parsed += 1
+        new_manifest[name] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha256": digest}
+        entry = manifest.get(name)
+        # A touched but unchanged file only needs its manifest entry refreshed
+        if entry is None or entry.get("sha256") != digest or name not in known_names:
+            rows.append({"name": name, "content": content})
+
+    if rows:
+        for template_id in await upsert_templates(db, rows):
+            template_cache.invalidate(template_id)
+        result.upserted = len(rows)
+    if new_manifest != manifest:
+        save_manifest(manifest_path, new_manifest)
+
+    result.seconds = time.perf_counter() - started
+    logger.info(
+        "Template sync: %d files, %d parsed, %d upserted, %d errors in %.3fs",
+        result.scanned, result.parsed, result.upserted, result.errors, result.seconds,
+    )
+    return result
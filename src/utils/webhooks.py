@@ -0,0 +1,169 @@
+import asyncio
+import hashlib
+import hmac
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from ..config import settings
+from ..database import AsyncSessionLocal
+from ..crud.github_sync import apply_github_changes
+
+logger = logging.getLogger(__name__)
+
+# Actions after which the issue no longer exists in this repository
+REMOVAL_ACTIONS = {"deleted", "transferred"}
+
+def verify_signature(secret: str, body: bytes, signature: Optional[str]) -> bool:
+    """Check an X-Hub-Signature-256 header against the raw request body."""
+    if not signature or not signature.startswith("sha256="):
+        return False
+    expected = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature[len("sha256="):])
+
+@dataclass
+class WebhookBatch:
+    issues: dict[str, dict] = field(default_factory=dict)
+    deleted_issues: set[str] = field(default_factory=set)
+    projects: dict[str, dict] = field(default_factory=dict)
+    deleted_projects: set[str] = field(default_factory=set)
+
+def _merge(pending: dict[str, dict], key: str, row: dict) -> None:
+    # Deliveries can arrive out of order; a payload older than what is already
+    # pending only contributes fields the newer one did not set
+    current = pending.get(key)
+    if current is None:
+        pending[key] = row
+    elif (row.get("updated_at") or "") >= (current.get("updated_at") or ""):
+        pending[key] = {**current, **row}
+    else:
+        pending[key] = {**row, **current}
+
+def coalesce_events(events: list[tuple[str, dict]]) -> WebhookBatch:
+    """
+    Fold (event name, payload) pairs into one net change per github_id, in
+    delivery order. Events for other repositories and unsupported event types
+    are dropped.
+    """
+    batch = WebhookBatch()
+    for event, payload in events:
+        action = payload.get("action")
+        if event == "issues" and "issue" in payload:
+            repository = (payload.get("repository") or {}).get("node_id")
+            if settings.GITHUB_REPOSITORY_ID and repository != settings.GITHUB_REPOSITORY_ID:
+                continue
+            issue = payload["issue"]
+            key = str(issue["number"])
+            if action in REMOVAL_ACTIONS:
+                batch.issues.pop(key, None)
+                batch.deleted_issues.add(key)
+                continue
+            batch.deleted_issues.discard(key)
+            _merge(batch.issues, key, {
+                "github_id": key,
+                "title": issue.get("title") or "",
+                "body": issue.get("body") or "",
+                "state": issue.get("state"),
+                "updated_at": issue.get("updated_at"),
+            })
+        elif event == "projects_v2" and "projects_v2" in payload:
+            project = payload["projects_v2"]
+            key = project["node_id"]
+            if action == "deleted":
+                batch.projects.pop(key, None)
+                batch.deleted_projects.add(key)
+                continue
+            batch.deleted_projects.discard(key)
+            _merge(batch.projects, key, {
+                "github_id": key,
+                "name": project.get("title") or "",
+                "description": project.get("short_description"),
+                "updated_at": project.get("updated_at"),
+            })
+    return batch
+
+def _rows(pending: dict[str, dict]) -> list[dict]:
+    return [{k: v for k, v in row.items() if k != "updated_at"} for row in pending.values()]
+
+class WebhookConsumer:
+    """
+    In-memory queue between the webhook endpoint and the database.
+
+    The endpoint only verifies and enqueues; this consumer waits a short
+    window after the first event, drains everything queued, coalesces it per
+    github_id and applies the result as bulk upserts in one transaction. The
+    queue is not durable: anything lost on a crash is picked up by the
+    reconciliation sync.
+    """
+
+    def __init__(self, session_factory=AsyncSessionLocal):
+        self.session_factory = session_factory
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=settings.WEBHOOK_QUEUE_SIZE)
+        self._task: Optional[asyncio.Task] = None
+        self._deliveries: OrderedDict[str, None] = OrderedDict()
+        self.applied = 0
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run_forever())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        # Apply whatever was acknowledged but not yet written
+        while not self._queue.empty():
+            await self.apply(self._take(settings.WEBHOOK_BATCH_SIZE))
+
+    def submit(self, event: str, payload: dict[str, Any], delivery_id: Optional[str] = None) -> bool:
+        """Queue an event. Returns False if the queue is full; redeliveries are accepted and ignored."""
+        if delivery_id is not None and delivery_id in self._deliveries:
+            return True
+        try:
+            self._queue.put_nowait((event, payload))
+        except asyncio.QueueFull:
+            return False
+        # Only remembered once queued, so GitHub's redelivery of a rejected event is taken
+        if delivery_id is not None:
+            self._deliveries[delivery_id] = None
+            if len(self._deliveries) > settings.WEBHOOK_QUEUE_SIZE:
+                self._deliveries.popitem(last=False)
+        return True
+
+    def _take(self, limit: int) -> list[tuple[str, dict]]:
+        events = []
+        while len(events) < limit and not self._queue.empty():
+            events.append(self._queue.get_nowait())
+        return events
+
+    async def run_forever(self) -> None:
+        while True:
+            first = await self._queue.get()
+            # Let a storm of edits to the same issues pile up into one batch
+            await asyncio.sleep(settings.WEBHOOK_COALESCE_WINDOW)
+            events = [first] + self._take(settings.WEBHOOK_BATCH_SIZE - 1)
+            try:
+                await self.apply(events)
+            except Exception:
+                logger.exception("Applying %d webhook events failed", len(events))
+
+    async def apply(self, events: list[tuple[str, dict]]) -> WebhookBatch:
+        batch = coalesce_events(events)
+        if batch.issues or batch.deleted_issues or batch.projects or batch.deleted_projects:
+            async with self.session_factory() as db:
+                await apply_github_changes(
+                    db,
+                    issues=_rows(batch.issues),
+                    deleted_issues=batch.deleted_issues,
+                    projects=_rows(batch.projects),
+                    deleted_projects=batch.deleted_projects,
+                )
+        self.applied += len(events)
+        return batch
+
+webhook_consumer = WebhookConsumer()
@@ -0,0 +1,93 @@
+import json
+import os
+import stat
+import sys
+import tempfile
+
+# Settings are read from the environment at import time, so point the app at
+# a throwaway database before anything from src is imported
+_tmpdir = tempfile.mkdtemp(prefix="pms-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{_tmpdir}/test.db")
+os.environ.setdefault("TEMPLATE_MANIFEST_PATH", os.path.join(_tmpdir, "manifest.json"))
+
+import httpx
+import pytest
+
+from src.config import settings
+from src.main import app  # importing the app registers every model's table
+from src.database import Base, dispose_engines, engine
+from src.utils.dependency_graph import dependency_graphs
+from src.utils.github_scheduler import github_scheduler
+from src.utils.response_cache import response_cache
+from src.utils.template_engine import template_cache
+
+FAKE_GH = os.path.join(os.path.dirname(__file__), "fakes", "gh")
+
+class FakeGH:
+    """A copy of tests/fakes/gh with its own state.json, calls.jsonl and runs.jsonl."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.path = os.path.join(directory, "gh")
+        # gh is run with a bare environment, so pin the interpreter
+        with open(FAKE_GH) as source, open(self.path, "w") as target:
+            target.write(f"#!{sys.executable}\n" + source.read().split("\n", 1)[1])
+        os.chmod(self.path, os.stat(self.path).st_mode | stat.S_IEXEC)
+        self.state = {"projects": [], "issues": []}
+        self.save()
+
+    def save(self):
+        with open(os.path.join(self.directory, "state.json"), "w") as f:
+            json.dump(self.state, f)
+
+    def _log(self, name):
+        path = os.path.join(self.directory, name)
+        if not os.path.exists(path):
+            return []
+        with open(path) as f:
+            return [json.loads(line) for line in f]
+
+    def calls(self):
+        return self._log("calls.jsonl")
+
+    def runs(self):
+        return self._log("runs.jsonl")
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+@pytest.fixture(autouse=True)
+def fresh_github_scheduler():
+    # Each test runs on its own event loop; drop any state tied to the last one
+    github_scheduler._waiters.clear()
+    github_scheduler._dispatcher = None
+    github_scheduler._active = 0
+    github_scheduler._paused_until = 0.0
+    github_scheduler._tokens = github_scheduler.burst
+    yield
+
+@pytest.fixture
+def fake_gh(tmp_path, monkeypatch):
+    fake = FakeGH(str(tmp_path))
+    monkeypatch.setattr(settings, "GITHUB_CLI_PATH", fake.path)
+    return fake
+
+@pytest.fixture
+async def database():
+    """An empty schema for the test; connections are closed with its event loop."""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    yield
+    await dispose_engines()
+
+@pytest.fixture
+async def client(database):
+    """The app over ASGI, starting from an empty schema and empty caches."""
+    await response_cache.clear()
+    template_cache.clear()
+    dependency_graphs.clear()
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+    await response_cache.clear()
@@ -0,0 +1,51 @@
+import json
+
+import pytest
+
+from src.utils.archive import archive_issues
+
+pytestmark = pytest.mark.anyio
+
+async def create_issues(client, statuses):
+    project = (await client.post("/projects/", json={"name": "Board"})).json()
+    ids = []
+    for n, status in enumerate(statuses):
+        response = await client.post("/issues/", json={
+            "title": f"t{n}", "body": f"body {n}", "status": status, "project_id": project["id"],
+        })
+        ids.append(response.json()["id"])
+    return project["id"], ids
+
+async def export_ids(client, **params):
+    response = await client.get("/issues/export", params=params)
+    return [json.loads(line)["id"] for line in response.text.splitlines()]
+
+async def test_archived_ids_are_never_handed_out_again(client):
+    project_id, ids = await create_issues(client, ["closed", "closed", "closed"])
+    # A cutoff in the future makes every closed issue old enough
+    assert (await archive_issues(older_than_days=-1)).moved == 3
+    assert (await client.delete(f"/issues/{ids[2]}")).status_code == 200
+
+    response = await client.post("/issues/", json={"title": "new", "body": "", "status": "open", "project_id": project_id})
+    assert response.json()["id"] > max(ids)
+    assert await export_ids(client) == [response.json()["id"], ids[0], ids[1]]
+    assert (await client.delete(f"/issues/{ids[0]}")).status_code == 200
+    assert (await client.get(f"/issues/{ids[0]}")).status_code == 404
+
+async def test_archive_round_trip(client):
+    _, ids = await create_issues(client, ["closed", "open"])
+    assert (await archive_issues(older_than_days=-1)).moved == 1
+
+    archived = await client.get(f"/issues/{ids[0]}")
+    assert (archived.status_code, archived.json()["body"], archived.json()["status"]) == (200, "body 0", "closed")
+    assert await export_ids(client) == [ids[1], ids[0]]
+    assert await export_ids(client, include_archived="false") == [ids[1]]
+    stats = (await client.get("/issues/archive/stats")).json()
+    assert (stats["hot_issues"], stats["archived_issues"]) == (1, 1)
+
+    # Editing an archived issue restores it into the hot table
+    response = await client.put(f"/issues/{ids[0]}", json={"status": "open"})
+    assert (response.status_code, response.json()["body"], response.json()["status"]) == (200, "body 0", "open")
+    assert await export_ids(client, include_archived="false") == ids
+    stats = (await client.get("/issues/archive/stats")).json()
+    assert (stats["hot_issues"], stats["archived_issues"]) == (2, 0)
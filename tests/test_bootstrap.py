@@ -0,0 +1,58 @@
+import pytest
+from sqlalchemy import inspect, text
+
+from src.database import Base, dispose_engines, engine
+from src.utils.bootstrap import ensure_schema, migrate_schema
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture
+async def old_schema():
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        # templates and github_outbox as an earlier release created them
+        await conn.execute(text("DROP TABLE templates"))
+        await conn.execute(text(
+            "CREATE TABLE templates (id INTEGER PRIMARY KEY, name VARCHAR UNIQUE, content JSON, "
+            "created_at DATETIME, updated_at DATETIME)"
+        ))
+        await conn.execute(text("INSERT INTO templates (name, content) VALUES ('bug', '{}')"))
+        await conn.execute(text("DROP INDEX ix_github_outbox_status_next_attempt"))
+    yield
+    await dispose_engines()
+
+async def test_missing_columns_and_indexes_are_added(old_schema):
+    async with engine.begin() as conn:
+        assert await conn.run_sync(migrate_schema) == ["templates.version"]
+        assert (await conn.execute(text("SELECT version FROM templates WHERE name = 'bug'"))).scalar() == 1
+        indexes = await conn.run_sync(lambda sync: {index["name"] for index in inspect(sync).get_indexes("github_outbox")})
+    assert "ix_github_outbox_status_next_attempt" in indexes
+
+async def test_migration_is_idempotent(old_schema):
+    async with engine.begin() as conn:
+        await conn.run_sync(migrate_schema)
+    async with engine.begin() as conn:
+        assert await conn.run_sync(migrate_schema) == []
+
+async def test_issues_table_is_rebuilt_with_autoincrement(old_schema):
+    async with engine.begin() as conn:
+        # issues as created before ids were AUTOINCREMENT, with ids 1-3 handed out
+        await conn.execute(text("DROP TABLE issues"))
+        await conn.execute(text(
+            "CREATE TABLE issues (id INTEGER PRIMARY KEY, title VARCHAR, body VARCHAR, status VARCHAR, "
+            "github_id VARCHAR UNIQUE, project_id INTEGER, created_at DATETIME, updated_at DATETIME)"
+        ))
+        await conn.execute(text("INSERT INTO issues (id, title, status) VALUES (1, 'hot', 'open')"))
+        await conn.execute(text("INSERT INTO issue_archive (id, title, codec, body_size) VALUES (3, 'cold', 'zlib', 0)"))
+        await conn.run_sync(migrate_schema)
+        await conn.execute(text("INSERT INTO issues (title) VALUES ('new')"))
+        rows = (await conn.execute(text("SELECT id, title FROM issues ORDER BY id"))).all()
+        indexes = await conn.run_sync(lambda sync: {index["name"] for index in inspect(sync).get_indexes("issues")})
+    assert [tuple(row) for row in rows] == [(1, "hot"), (4, "new")]
+    assert "ix_issues_updated_at_id" in indexes
+
+async def test_maintenance_commands_migrate_the_schema(old_schema):
+    await ensure_schema()
+    async with engine.begin() as conn:
+        assert (await conn.execute(text("SELECT version FROM templates WHERE name = 'bug'"))).scalar() == 1
@@ -0,0 +1,95 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select
+
+from src.crud.issue_events import bucket_start, burndown_series, record_status_events
+from src.database import AsyncSessionLocal
+from src.models.issue_event import BurndownBucket
+
+pytestmark = pytest.mark.anyio
+
+DAY = datetime(2030, 1, 10, tzinfo=timezone.utc)
+
+def day(n):
+    return DAY + timedelta(days=n)
+
+async def buckets(project_id, granularity):
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(BurndownBucket)
+            .where(BurndownBucket.project_id == project_id, BurndownBucket.granularity == granularity)
+            .order_by(BurndownBucket.bucket_start)
+        )
+        return [(row.opened, row.closed, row.deleted) for row in result.scalars()]
+
+async def test_history_records_every_transition(client):
+    project = (await client.post("/projects/", json={"name": "Board"})).json()
+    issue = (await client.post("/issues/", json={"title": "t", "body": "", "status": "open", "project_id": project["id"]})).json()
+    for status in ("closed", "closed", "open"):
+        await client.put(f"/issues/{issue['id']}", json={"status": status})
+    # A title edit is not a transition
+    await client.put(f"/issues/{issue['id']}", json={"title": "renamed"})
+
+    history = (await client.get(f"/issues/{issue['id']}/history")).json()
+    assert [(event["from_status"], event["to_status"]) for event in history] == [
+        (None, "open"), ("open", "closed"), ("closed", "open"),
+    ]
+    assert {event["project_id"] for event in history} == {project["id"]}
+    assert len((await client.get(f"/issues/{issue['id']}/history", params={"limit": 2})).json()) == 2
+
+    await client.delete(f"/issues/{issue['id']}")
+    history = (await client.get(f"/issues/{issue['id']}/history")).json()
+    assert (history[-1]["from_status"], history[-1]["to_status"]) == ("open", None)
+
+async def test_transitions_roll_up_into_buckets(database):
+    changes = [
+        (1, 7, None, "open"), (2, 7, None, "open"), (3, 7, None, "closed"),
+        (1, 7, "open", "closed"), (1, 7, "closed", "open"), (2, 7, "open", None),
+    ]
+    async with AsyncSessionLocal() as db:
+        await record_status_events(db, changes[:3], at=DAY + timedelta(hours=9, minutes=30))
+        await record_status_events(db, changes[3:], at=DAY + timedelta(hours=15))
+        # A closed issue deleted the next day no longer counts against anything
+        await record_status_events(db, [(3, 7, "closed", None)], at=DAY + timedelta(days=1))
+        await db.commit()
+    # Issue 3 was created closed, so it was never opened
+    assert await buckets(7, "hour") == [(2, 0, 0), (1, 1, 1)]
+    assert await buckets(7, "day") == [(3, 1, 1)]
+
+async def test_burndown_walks_back_from_the_open_count(client):
+    project = (await client.post("/projects/", json={"name": "Board"})).json()
+    ids = []
+    for n in range(3):
+        issue = {"title": f"t{n}", "body": "", "status": "open", "project_id": project["id"]}
+        ids.append((await client.post("/issues/", json=issue)).json()["id"])
+    await client.put(f"/issues/{ids[0]}", json={"status": "closed"})
+    await client.put(f"/issues/{ids[0]}", json={"status": "open"})
+    await client.put(f"/issues/{ids[1]}", json={"status": "closed"})
+    await client.delete(f"/issues/{ids[2]}")
+
+    now = datetime.now(timezone.utc)
+    response = await client.get(f"/projects/{project['id']}/burndown", params={
+        "granularity": "hour", "start": (now - timedelta(hours=2)).isoformat(), "end": now.isoformat(),
+    })
+    assert response.status_code == 200
+    points = response.json()["points"]
+    assert [point["remaining"] for point in points] == [0, 0, 1]
+    assert (points[-1]["opened"], points[-1]["closed"]) == (4, 2)
+
+    assert (await client.get("/projects/999/burndown")).status_code == 404
+    params = {"start": now.isoformat(), "end": (now - timedelta(days=1)).isoformat()}
+    assert (await client.get(f"/projects/{project['id']}/burndown", params=params)).status_code == 400
+
+def test_series_covers_empty_buckets_and_later_changes():
+    rows = [
+        BurndownBucket(bucket_start=day(0), opened=5, closed=0, deleted=0),
+        BurndownBucket(bucket_start=day(2), opened=1, closed=3, deleted=1),
+        # After the window: undone before reading the window's last point
+        BurndownBucket(bucket_start=day(4), opened=2, closed=0, deleted=0),
+    ]
+    points = burndown_series(rows, open_now=4, start=day(0), end=day(3) + timedelta(hours=5), granularity="day")
+    assert [point["timestamp"] for point in points] == [day(n) for n in range(4)]
+    assert [point["remaining"] for point in points] == [5, 5, 2, 2]
+    assert [point["closed"] for point in points] == [0, 0, 3, 0]
+    assert bucket_start(DAY + timedelta(hours=13, minutes=5), "hour") == DAY + timedelta(hours=13)
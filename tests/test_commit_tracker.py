@@ -0,0 +1,90 @@
+import subprocess
+
+import pytest
+from sqlalchemy import select
+
+from src.database import AsyncSessionLocal
+from src.models.issue import Issue
+from src.utils import github_cli
+from src.utils.commit_tracker import IssueTally, collapse_commits, parse_references, resolve_status, track_commits
+
+pytestmark = pytest.mark.anyio
+
+def references(message, repository="octo/app"):
+    return list(parse_references(message, repository))
+
+def test_keywords_and_bare_references():
+    assert references("Fixes #12, see #3") == [("12", "close"), ("3", None)]
+    assert references("closed: #4\nReopens #5 (#6)") == [("4", "close"), ("5", "reopen"), ("6", None)]
+    assert references("resolves octo/app#7 and other/repo#8") == [("7", "close")]
+    assert references("#9 at the start") == [("9", None)]
+
+def test_references_need_a_boundary_before_the_hash():
+    assert references("abc#12 and page#3") == []
+    assert references("see https://example.com/docs/page#3 and https://github.com/octo/app#4") == []
+    assert references("fixes abc#12") == []
+
+async def test_last_keyword_wins_across_commits():
+    async def commits():
+        for sha, message in [("a", "fix #1"), ("b", "reopen #1, touch #2"), ("c", "nothing")]:
+            yield sha, message
+
+    count, tallies = await collapse_commits(commits())
+    assert count == 3
+    assert tallies == {"1": IssueTally("reopen", True), "2": IssueTally(None, True)}
+
+def test_resolve_status():
+    assert resolve_status(IssueTally("close", True), "open") == "closed"
+    assert resolve_status(IssueTally("close", True), "Done") is None
+    assert resolve_status(IssueTally("reopen", True), "closed") == "open"
+    assert resolve_status(IssueTally("reopen", True), "in_progress") is None
+    assert resolve_status(IssueTally(None, True), "open") == "in_progress"
+    assert resolve_status(IssueTally(None, True), "review") is None
+
+@pytest.fixture
+def repo(tmp_path):
+    def git(*args):
+        subprocess.run(["git", "-C", str(tmp_path), *args], check=True, capture_output=True)
+
+    git("init", "-q")
+    git("config", "user.email", "dev@example.com")
+    git("config", "user.name", "dev")
+    for message in ("start", "Fixes #1, fixes #2", "reopens #3, see #4", "fixes #5"):
+        git("commit", "-q", "--allow-empty", "-m", message)
+    return str(tmp_path)
+
+@pytest.fixture
+def github(monkeypatch):
+    github = {"lookups": [], "changes": [], "states": {"2": "open", "3": "closed", "4": "open", "5": "closed"}}
+
+    async def get_states(numbers):
+        github["lookups"].append(numbers)
+        return {number: github["states"][number] for number in numbers if number in github["states"]}
+
+    async def set_states(states):
+        github["changes"].extend(states)
+        return [{"id": number} for number, _ in states]
+
+    monkeypatch.setattr(github_cli, "get_github_issue_states", get_states)
+    monkeypatch.setattr(github_cli, "set_github_issue_states_batch", set_states)
+    return github
+
+async def test_issues_missing_locally_are_looked_up_on_github(database, repo, github):
+    async with AsyncSessionLocal() as db:
+        db.add(Issue(title="Known", body="", status="open", github_id="1"))
+        await db.commit()
+        result = await track_commits(db, "HEAD~3..HEAD", repo)
+        statuses = (await db.execute(select(Issue.github_id, Issue.status))).all()
+
+    assert github["lookups"] == [["2", "3", "4", "5"]]
+    # #4 is only mentioned and #5 already closed: nothing to do on GitHub
+    assert sorted(github["changes"]) == [("1", "closed"), ("2", "closed"), ("3", "open")]
+    assert result.updated == {"1": "closed", "2": "closed", "3": "open"}
+    assert [tuple(row) for row in statuses] == [("1", "closed")]
+
+async def test_local_only_runs_never_ask_github(database, repo, github):
+    async with AsyncSessionLocal() as db:
+        result = await track_commits(db, "HEAD~3..HEAD", repo, update_github=False)
+    assert result.referenced == 5
+    assert result.updated == {}
+    assert github["lookups"] == github["changes"] == []
@@ -0,0 +1,66 @@
+import pytest
+
+from src.utils.dependency_graph import DependencyCycleError, DependencyGraph, _csr
+
+pytestmark = pytest.mark.anyio
+
+def test_topological_order_puts_blockers_first():
+    graph = DependencyGraph([(3, 1), (2, 1), (5, 3), (5, 2)])
+    assert graph.topological_order() == [5, 2, 3, 1]
+    # Nearest first: direct neighbours, then the issues behind them
+    assert graph.blocked_by(5) == [3, 2, 1]
+    assert graph.blockers_of(1) == [3, 2, 5]
+    assert graph.find_cycle() is None
+
+def test_csr_arrays_are_sized_in_items_not_bytes():
+    offsets, targets = _csr(3, [(0, 1), (0, 2), (2, 1)])
+    assert list(offsets) == [0, 2, 2, 3]
+    assert list(targets) == [1, 2, 1]
+    assert DependencyGraph([(3, 1), (2, 1), (5, 3)]).edge_count == 3
+
+def test_cycles_are_found():
+    graph = DependencyGraph([(1, 2), (2, 3), (3, 1), (3, 4)])
+    assert graph.find_cycle() == [1, 2, 3]
+    with pytest.raises(DependencyCycleError) as excinfo:
+        graph.topological_order()
+    assert excinfo.value.cycle == [1, 2, 3]
+    assert graph.reaches(1, 4)
+    assert not graph.reaches(4, 1)
+    assert DependencyGraph([(1, 2)]).reaches(2, 1, {2: [3], 3: [1]})
+
+def test_critical_path_skips_closed_issues():
+    #   1 -> 2 -> 4
+    #   3 -------> 4, with 1 closed
+    graph = DependencyGraph([(1, 2), (2, 4), (3, 4)], open_ids=[2, 3, 4])
+    assert graph.critical_path(4) == [2, 4]
+    graph = DependencyGraph([(1, 2), (2, 4), (3, 4)], open_ids=[1, 2, 3, 4])
+    assert graph.critical_path(4) == [1, 2, 4]
+    assert graph.critical_path(9) == [9]
+
+async def test_edges_closing_a_cycle_are_rejected(client):
+    project = (await client.post("/projects/", json={"name": "Board"})).json()
+    ids = []
+    for n in range(3):
+        issue = {"title": f"t{n}", "body": "", "status": "open", "project_id": project["id"]}
+        ids.append((await client.post("/issues/", json=issue)).json()["id"])
+
+    response = await client.post(f"/issues/{ids[1]}/dependencies", json={"blocker_id": ids[0]})
+    assert response.status_code == 200
+    assert response.json()["created_at"] is not None
+    # The graph is now cached; the next edge has to invalidate it
+    assert (await client.get(f"/issues/{ids[2]}/critical-path")).json()["path"] == [ids[2]]
+    response = await client.post(f"/issues/{ids[2]}/dependencies", json={"blocker_id": ids[1]})
+    assert response.status_code == 200
+
+    response = await client.post(f"/issues/{ids[0]}/dependencies", json={"blocker_id": ids[2]})
+    assert response.status_code == 409
+    # Within one batch, the second edge closes a cycle with the first
+    response = await client.post("/issues/dependencies/bulk", json=[
+        {"blocker_id": ids[0], "blocked_id": ids[2]},
+        {"blocker_id": ids[2], "blocked_id": ids[0]},
+    ])
+    assert [result["success"] for result in response.json()["results"]] == [True, False]
+
+    assert (await client.get(f"/projects/{project['id']}/dependencies/order")).json()["order"] == ids
+    response = await client.get(f"/issues/{ids[2]}/critical-path")
+    assert response.json() == {"issue_id": ids[2], "path": ids, "length": 3}
@@ -0,0 +1,95 @@
+import os
+
+import pytest
+
+from src.api.endpoints import events
+from src.config import settings
+from src.utils.change_feed import ChangeFeed, change, change_feed
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture
+def feed(monkeypatch):
+    feed = ChangeFeed(3)
+    monkeypatch.setattr(events, "change_feed", feed)
+    return feed
+
+async def take(stream, count):
+    return [await stream.__anext__() for _ in range(count)]
+
+def issue(issue_id, project_id=1):
+    return change("issue", "upsert", issue_id, project_id, {"title": "t", "body": "long"})
+
+def test_since_covers_only_buffered_events():
+    feed = ChangeFeed(3)
+    assert feed.since(0) == []
+    feed.publish([issue(n) for n in range(1, 6)])
+    assert [event.id for event in feed.since(2)] == [3, 4, 5]
+    assert feed.since(5) == []
+    # 1 and 2 have been evicted, and 6 has not been issued
+    assert feed.since(1) is None
+    assert feed.since(6) is None
+    assert feed.parse_event_id(feed.event_id(4)) == 4
+    assert feed.parse_event_id("other-4") is None
+    assert feed.parse_event_id(feed.instance + "-x") is None
+
+async def test_resume_replays_missed_matching_changes_once(feed):
+    feed.publish([issue(1), issue(2, project_id=2), issue(3)])
+    stream = events.stream_changes([1], None, feed.event_id(1))
+    assert await stream.__anext__() == b"retry: 3000\n\n"
+    replayed = await stream.__anext__()
+    assert replayed.startswith(b"id: %s\nevent: change\n" % feed.event_id(3).encode())
+    assert b'"changed":["body"]' in replayed and b"long" not in replayed
+    feed.publish([issue(4)])
+    assert (await stream.__anext__()).startswith(b"id: %s\n" % feed.event_id(4).encode())
+    await stream.aclose()
+    assert feed.stats()["subscribers"] == 0
+
+async def test_unresumable_ids_get_a_reset(feed):
+    feed.publish([issue(n) for n in range(1, 6)])
+    for resume_from in (feed.event_id(1), "elsewhere-4", "garbage"):
+        stream = events.stream_changes(None, None, resume_from)
+        assert (await take(stream, 2))[1] == b"id: %s\nevent: reset\ndata: {}\n\n" % feed.event_id(5).encode()
+        await stream.aclose()
+    stream = events.stream_changes(None, None, None)
+    assert (await take(stream, 2))[1] == b"id: %s\nevent: ready\ndata: {}\n\n" % feed.event_id(5).encode()
+    await stream.aclose()
+
+async def test_slow_subscribers_are_reset(feed, monkeypatch):
+    monkeypatch.setattr(settings, "CHANGE_FEED_SUBSCRIBER_QUEUE", 1)
+    stream = events.stream_changes(None, ["project"], None)
+    await take(stream, 2)
+    feed.publish([issue(1)])  # filtered out, so it takes no room in the queue
+    feed.publish([change("project", "upsert", n, n) for n in (1, 2)])
+    assert (await stream.__anext__()) == b"id: %s\nevent: reset\ndata: {}\n\n" % feed.event_id(3).encode()
+    feed.publish([change("project", "delete", 3, 3)])
+    assert (await stream.__anext__()).startswith(b"id: %s\n" % feed.event_id(4).encode())
+    await stream.aclose()
+
+async def test_header_takes_precedence_over_query(feed):
+    feed.publish([issue(1), issue(2)])
+    response = await events.stream_events(None, None, last_event_id="garbage", last_event_id_header=feed.event_id(1))
+    stream = response.body_iterator
+    assert (await take(stream, 2))[1].startswith(b"id: %s\nevent: change\n" % feed.event_id(2).encode())
+    await stream.aclose()
+
+async def test_ids_from_another_worker_get_a_reset(feed):
+    other = ChangeFeed(3)
+    other.publish([issue(1), issue(2)])
+    feed.publish([issue(3), issue(4)])
+    stream = events.stream_changes(None, None, other.event_id(1))
+    assert (await take(stream, 2))[1] == b"id: %s\nevent: reset\ndata: {}\n\n" % feed.event_id(2).encode()
+    await stream.aclose()
+
+def test_forked_workers_get_their_own_instance():
+    read_end, write_end = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.write(write_end, change_feed.instance.encode())
+        os._exit(0)
+    os.close(write_end)
+    child_instance = os.read(read_end, 64).decode()
+    os.close(read_end)
+    os.waitpid(pid, 0)
+    assert child_instance
+    assert child_instance != change_feed.instance
@@ -0,0 +1,56 @@
+import csv
+import io
+import json
+
+import pytest
+
+from src.utils import export
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture(autouse=True)
+def small_batches(monkeypatch):
+    # Several partitions even for a handful of rows
+    monkeypatch.setattr(export, "EXPORT_BATCH_SIZE", 2)
+
+async def create_issues(client, count):
+    project = (await client.post("/projects/", json={"name": "Board", "description": "a, \"quoted\"\nline"})).json()
+    ids = []
+    for n in range(count):
+        issue = {"title": f"t{n}", "body": f"line one\nline, two {n}", "status": "open" if n % 2 else "closed", "project_id": project["id"]}
+        ids.append((await client.post("/issues/", json=issue)).json()["id"])
+    return project, ids
+
+async def test_ndjson_export_streams_every_row(client):
+    project, ids = await create_issues(client, 5)
+    response = await client.get("/issues/export")
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert response.headers["content-disposition"] == 'attachment; filename="issues.ndjson"'
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["id"] for row in rows] == ids
+    assert rows[3]["body"] == "line one\nline, two 3"
+    # Rows carry the same fields and values as the issue endpoint
+    single = (await client.get(f"/issues/{ids[0]}")).json()
+    assert rows[0] == single
+
+    response = await client.get("/issues/export", params={"status": "open", "project_id": project["id"]})
+    assert [json.loads(line)["id"] for line in response.text.splitlines()] == ids[1::2]
+
+async def test_csv_export_has_one_header(client):
+    project, ids = await create_issues(client, 5)
+    response = await client.get("/issues/export", params={"format": "csv"})
+    assert response.headers["content-type"].startswith("text/csv")
+    header, *rows = list(csv.reader(io.StringIO(response.text)))
+    assert header == ["id", "title", "body", "status", "github_id", "project_id", "created_at", "updated_at"]
+    assert [int(row[0]) for row in rows] == ids
+    assert rows[1][2] == "line one\nline, two 1"
+
+    response = await client.get("/projects/export", params={"format": "csv"})
+    header, row = list(csv.reader(io.StringIO(response.text)))
+    assert (header[:3], row[1:3]) == (["id", "name", "description"], ["Board", 'a, "quoted"\nline'])
+
+async def test_empty_exports(client):
+    assert (await client.get("/issues/export")).text == ""
+    response = await client.get("/projects/export", params={"format": "csv"})
+    assert response.text.strip() == "id,name,description,github_id,created_at,updated_at"
+    assert (await client.get("/issues/export", params={"format": "xml"})).status_code == 422
@@ -0,0 +1,77 @@
+import asyncio
+import json
+import os
+import time
+
+import pytest
+
+from src.config import settings
+from src.utils.github_cli import GitHubCLIError, run_github_cli_command
+from src.utils.github_scheduler import github_scheduler
+
+pytestmark = pytest.mark.anyio
+
+QUERY = json.dumps({"query": "{ projectsV2(first: 1) { nodes { id } } }", "variables": {"pageSize": 1}}).encode()
+
+@pytest.fixture
+def slow_gh(fake_gh):
+    fake_gh.state["sleep"] = 1.0
+    fake_gh.save()
+    return fake_gh
+
+def call(timeout=None):
+    return run_github_cli_command(["api", "graphql", "--input", "-"], timeout=timeout, input=QUERY)
+
+async def gone(pid):
+    # The child is reaped by asyncio's watcher; allow it a moment
+    for _ in range(200):
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return True
+        await asyncio.sleep(0.01)
+    return False
+
+async def started(fake, count):
+    for _ in range(500):
+        runs = [run for run in fake.runs() if run["event"] == "start"]
+        if len(runs) >= count:
+            return runs
+        await asyncio.sleep(0.01)
+    raise AssertionError("gh was not started")
+
+async def test_calls_return_the_printed_json(fake_gh):
+    assert await call() == {"data": {"node": {"projectsV2": {"pageInfo": {"hasNextPage": False, "endCursor": None}, "nodes": []}}}}
+
+async def test_timed_out_calls_leave_no_child(slow_gh):
+    started_at = time.monotonic()
+    # Long enough for the interpreter to start and log its pid
+    with pytest.raises(GitHubCLIError, match="timed out"):
+        await call(timeout=0.5)
+    assert time.monotonic() - started_at < 1.0
+    run, = await started(slow_gh, 1)
+    assert await gone(run["pid"])
+    assert [entry["event"] for entry in slow_gh.runs()] == ["start"]
+
+async def test_cancelled_calls_leave_no_child(slow_gh):
+    task = asyncio.create_task(call())
+    run, = await started(slow_gh, 1)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert await gone(run["pid"])
+    assert [entry["event"] for entry in slow_gh.runs()] == ["start"]
+
+async def test_concurrency_stays_within_the_limit(slow_gh, monkeypatch):
+    monkeypatch.setattr(settings, "GITHUB_CLI_MAX_CONCURRENCY", 2)
+    monkeypatch.setattr(github_scheduler, "concurrency", settings.GITHUB_CLI_MAX_CONCURRENCY)
+    slow_gh.state["sleep"] = 0.2
+    slow_gh.save()
+    await asyncio.gather(*(call() for _ in range(5)))
+
+    running, peak = 0, 0
+    for run in sorted(slow_gh.runs(), key=lambda run: (run["at"], run["event"] == "start")):
+        running += 1 if run["event"] == "start" else -1
+        peak = max(peak, running)
+    assert peak == 2
+    assert len(slow_gh.runs()) == 10
@@ -0,0 +1,123 @@
+import json
+
+import httpx
+import pytest
+
+from src.config import settings
+from src.utils.github_cli import GitHubCLIError
+from src.utils.github_http import HTTPTransport
+
+pytestmark = pytest.mark.anyio
+
+class FakeGitHub:
+    """In-process stand-in for the GitHub REST and GraphQL APIs."""
+
+    def __init__(self):
+        self.requests: list[tuple[str, str, dict]] = []
+        self.issues = {"7": {"node_id": "I_7", "state": "open", "title": "Old"}}
+        self.graphql_errors: list[dict] = []
+        self.next_number = 100
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content) if request.content else {}
+        self.requests.append((request.method, request.url.path, body))
+        if request.url.path == "/graphql":
+            return self.graphql(body["query"], body["variables"])
+        prefix = "/repos/octo/repo/issues/"
+        if not request.url.path.startswith(prefix):
+            return httpx.Response(404, json={"message": "Not Found"})
+        issue = self.issues.get(request.url.path[len(prefix):])
+        if issue is None:
+            return httpx.Response(404, json={"message": "Not Found"})
+        if request.method == "PATCH":
+            issue.update(body)
+        return httpx.Response(200, json=issue)
+
+    def graphql(self, query: str, variables: dict) -> httpx.Response:
+        if self.graphql_errors:
+            return httpx.Response(200, json={"data": None, "errors": self.graphql_errors})
+        if "createIssue" in query:
+            self.next_number += 1
+            data = {"createIssue": {"issue": {"number": self.next_number}}}
+        elif "createProjectV2" in query:
+            data = {"createProjectV2": {"projectV2": {"id": "PVT_new"}}}
+        elif "updateProjectV2" in query:
+            data = {"updateProjectV2": {"projectV2": {"id": variables["projectId"]}}}
+        elif "deleteProjectV2" in query:
+            data = {"deleteProjectV2": {"projectV2": {"id": variables["projectId"]}}}
+        elif "deleteIssue" in query:
+            data = {"deleteIssue": {"clientMutationId": None}}
+        else:
+            return httpx.Response(400, json={"message": "unexpected query"})
+        return httpx.Response(200, json={"data": data})
+
+@pytest.fixture
+async def github(monkeypatch):
+    monkeypatch.setattr(settings, "GITHUB_REPOSITORY", "octo/repo")
+    monkeypatch.setattr(settings, "GITHUB_REPOSITORY_ID", "R_repo")
+    monkeypatch.setattr(settings, "GITHUB_OWNER_ID", "O_owner")
+    fake = FakeGitHub()
+    transport = HTTPTransport()
+    transport._client = httpx.AsyncClient(base_url="https://api.github.test", transport=httpx.MockTransport(fake.handle))
+    yield fake, transport
+    await transport.close()
+
+async def test_create_issue_returns_number(github):
+    fake, transport = github
+    assert await transport.create_issue("PVT_1", "Title", "Body") == {"id": "101"}
+    method, path, body = fake.requests[-1]
+    assert (method, path) == ("POST", "/graphql")
+    assert body["variables"] == {"repositoryId": "R_repo", "title": "Title", "body": "Body", "projectId": "PVT_1"}
+
+async def test_create_project_sets_description_separately(github):
+    fake, transport = github
+    assert await transport.create_project("Board", "About") == {"id": "PVT_new"}
+    create, update = fake.requests
+    assert create[2]["variables"] == {"ownerId": "O_owner", "title": "Board"}
+    assert update[2]["variables"] == {"projectId": "PVT_new", "shortDescription": "About"}
+
+async def test_update_project_only_sends_changed_fields(github):
+    fake, transport = github
+    await transport.update_project("PVT_1", "Renamed", None)
+    assert fake.requests[-1][2]["variables"] == {"projectId": "PVT_1", "title": "Renamed"}
+
+@pytest.mark.parametrize("status, state", [("done", "closed"), ("in_progress", "open"), ("Closed", "closed")])
+async def test_update_issue_maps_status_to_state(github, status, state):
+    fake, transport = github
+    await transport.update_issue("7", "New", None, status)
+    assert fake.requests[-1][:2] == ("PATCH", "/repos/octo/repo/issues/7")
+    assert fake.requests[-1][2] == {"title": "New", "state": state}
+
+async def test_delete_issue_looks_up_node_id(github):
+    fake, transport = github
+    assert await transport.delete_issue("7") == {"id": "7"}
+    lookup, mutation = fake.requests
+    assert lookup[:2] == ("GET", "/repos/octo/repo/issues/7")
+    assert mutation[2]["variables"] == {"issueId": "I_7"}
+
+async def test_rest_error_raises(github):
+    _, transport = github
+    with pytest.raises(GitHubCLIError, match="404"):
+        await transport.update_issue("999", "Title", None, None)
+
+async def test_graphql_errors_raise_on_mutations(github):
+    fake, transport = github
+    fake.graphql_errors = [{"message": "Could not resolve to a node"}]
+    with pytest.raises(GitHubCLIError, match="Could not resolve"):
+        await transport.delete_project("PVT_gone")
+
+async def test_graphql_returns_partial_errors_to_caller(github):
+    fake, transport = github
+    fake.graphql_errors = [{"message": "boom"}]
+    response = await transport.graphql("query { viewer { login } }", {})
+    assert response["errors"] == [{"message": "boom"}]
+
+async def test_missing_node_ids_fail_clearly(github, monkeypatch):
+    fake, transport = github
+    monkeypatch.setattr(settings, "GITHUB_REPOSITORY_ID", None)
+    monkeypatch.setattr(settings, "GITHUB_OWNER_ID", None)
+    with pytest.raises(GitHubCLIError, match="GITHUB_REPOSITORY_ID"):
+        await transport.create_issue("PVT_1", "Title", "Body")
+    with pytest.raises(GitHubCLIError, match="GITHUB_OWNER_ID"):
+        await transport.create_project("Board", None)
+    assert fake.requests == []
@@ -0,0 +1,79 @@
+import asyncio
+import time
+
+import pytest
+
+from src.config import settings
+from src.utils.github_scheduler import GitHubRateLimitError, GitHubScheduler, check_rate_limited, github_priority
+
+pytestmark = pytest.mark.anyio
+
+async def test_waiting_calls_are_granted_in_lane_order():
+    scheduler = GitHubScheduler(concurrency=1, rate=1000, burst=1000)
+    order = []
+    release = asyncio.Event()
+
+    async def hold():
+        async with scheduler.slot("bulk"):
+            await release.wait()
+
+    async def call(lane, name):
+        async with scheduler.slot(lane):
+            order.append(name)
+
+    holder = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+    waiting = [
+        asyncio.create_task(call("bulk", "bulk")),
+        asyncio.create_task(call("background", "sync 1")),
+        asyncio.create_task(call("interactive", "user")),
+        asyncio.create_task(call("background", "sync 2")),
+    ]
+    await asyncio.sleep(0.01)
+    assert scheduler.stats()["lanes"]["background"]["queued"] == 2
+    release.set()
+    await asyncio.gather(holder, *waiting)
+    assert order == ["user", "sync 1", "sync 2", "bulk"]
+    assert scheduler.stats()["lanes"]["background"]["granted"] == 2
+
+async def test_lane_comes_from_the_context():
+    scheduler = GitHubScheduler(concurrency=2, rate=1000, burst=1000)
+
+    async def call():
+        return None
+
+    with github_priority("bulk"):
+        await scheduler.run(call)
+    assert scheduler.stats()["lanes"]["bulk"]["granted"] == 1
+    assert scheduler.stats()["lanes"]["interactive"]["granted"] == 0
+
+async def test_rate_limited_calls_pause_and_retry(monkeypatch):
+    monkeypatch.setattr(settings, "GITHUB_RATE_LIMIT_RETRIES", 1)
+    monkeypatch.setattr(settings, "GITHUB_RATE_LIMIT_MAX_WAIT", 1.0)
+    scheduler = GitHubScheduler(concurrency=1, rate=1000, burst=1000)
+    attempts = []
+
+    async def call():
+        attempts.append(time.monotonic())
+        if len(attempts) == 1:
+            check_rate_limited({"errors": [{"type": "RATE_LIMITED", "message": "slow down"}]})
+        return "ok"
+
+    monkeypatch.setattr(settings, "GITHUB_RATE_LIMIT_BACKOFF", 0.05)
+    assert await scheduler.run(call) == "ok"
+    assert attempts[1] - attempts[0] >= 0.04
+
+    async def always_limited():
+        raise GitHubRateLimitError("slow down", retry_after=60)
+
+    # Too long to sit out: the caller gets the error to retry later
+    with pytest.raises(GitHubRateLimitError):
+        await scheduler.run(always_limited)
+    assert scheduler.stats()["paused_for_seconds"] > 50
+
+def test_rate_follows_github_budget():
+    scheduler = GitHubScheduler(concurrency=1, rate=10, burst=10)
+    scheduler.update_rate_limit(remaining=100, reset_at=time.time() + 50)
+    assert scheduler.rate == pytest.approx(2, rel=0.1)
+    scheduler.update_rate_limit(remaining=0, reset_at=time.time() + 30)
+    assert scheduler.stats()["paused_for_seconds"] == pytest.approx(30, abs=1)
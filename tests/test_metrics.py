@@ -0,0 +1,78 @@
+import os
+
+import pytest
+
+from src.utils.metrics import Counter, Histogram, Metric, MetricsRegistry, MetricsStore, metrics_store
+
+pytestmark = pytest.mark.anyio
+
+def sample_registry():
+    samples = MetricsRegistry()
+    requests = samples.register(Counter("requests_total", "Requests.", ("route",)))
+    latency = samples.register(Histogram("latency_seconds", "Latency.", (), (0.1, 1.0)))
+    return samples, requests, latency
+
+def test_exposition_format():
+    samples, requests, latency = sample_registry()
+    requests.inc('/a "b"')
+    requests.inc("/c", amount=2)
+    latency.observe(value=0.05)
+    latency.observe(value=0.5)
+    latency.observe(value=3)
+    assert samples.render() == "\n".join([
+        "# HELP requests_total Requests.",
+        "# TYPE requests_total counter",
+        'requests_total{route="/a \\"b\\""} 1',
+        'requests_total{route="/c"} 2',
+        "# HELP latency_seconds Latency.",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{le="0.1"} 1',
+        'latency_seconds_bucket{le="1.0"} 2',
+        'latency_seconds_bucket{le="+Inf"} 3',
+        "latency_seconds_sum 3.55",
+        "latency_seconds_count 3",
+    ]) + "\n"
+
+def test_metric_kinds_must_implement_the_whole_interface():
+    class Gauge(Metric):
+        type = "gauge"
+
+        def samples(self):
+            return []
+
+    with pytest.raises(TypeError, match="abstract"):
+        Gauge("g", "Gauge.")
+
+def test_snapshots_of_several_processes_are_summed():
+    first, requests, latency = sample_registry()
+    requests.inc("/a")
+    latency.observe(value=0.05)
+    second, requests, latency = sample_registry()
+    requests.inc("/a", amount=2)
+    requests.inc("/b")
+    latency.observe(value=0.5)
+
+    combined, requests, latency = sample_registry()
+    requests.inc("/a", amount=3)
+    requests.inc("/b")
+    latency.observe(value=0.05)
+    latency.observe(value=0.5)
+    assert first.render([first.snapshot(), second.snapshot()]) == combined.render()
+
+def test_store_collects_every_worker_file(tmp_path):
+    (tmp_path / "1.json").write_text('{"issues_archived_total": [[[], 5]]}')
+    (tmp_path / "2.json.tmp").write_text("{")
+    store = MetricsStore(str(tmp_path), 1)
+    snapshots = store.collect()
+    # The other worker's, and this process's own written on the way
+    assert len(snapshots) == 2
+    assert (tmp_path / f"{os.getpid()}.json").exists()
+    assert {"issues_archived_total": [[[], 5]]} in snapshots
+
+async def test_metrics_endpoint_sums_workers(client, tmp_path, monkeypatch):
+    monkeypatch.setattr(metrics_store, "directory", str(tmp_path))
+    (tmp_path / "1.json").write_text('{"issues_archived_total": [[[], 1000000]]}')
+    response = await client.get("/metrics")
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    total = next(line for line in response.text.splitlines() if line.startswith("issues_archived_total "))
+    assert float(total.split()[1]) >= 1000000
@@ -0,0 +1,56 @@
+import contextlib
+
+import pytest
+from sqlalchemy import event, func, select
+
+from src.database import AsyncSessionLocal, engine
+from src.models.outbox import OutboxEntry
+
+pytestmark = pytest.mark.anyio
+
+@contextlib.contextmanager
+def statements():
+    seen = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        seen.append(" ".join(statement.split()))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    try:
+        yield seen
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+async def outbox_count():
+    async with AsyncSessionLocal() as db:
+        return await db.scalar(select(func.count()).select_from(OutboxEntry))
+
+async def test_updates_and_deletes_take_one_statement(client):
+    project = (await client.post("/projects/", json={"name": "Board"})).json()
+    issue = (await client.post("/issues/", json={"title": "t", "body": "", "status": "open", "project_id": project["id"]})).json()
+
+    with statements() as seen:
+        response = await client.put(f"/projects/{project['id']}", json={"name": "Renamed", "description": "d"})
+    assert (response.status_code, response.json()["name"], response.json()["description"]) == (200, "Renamed", "d")
+    touching = [sql for sql in seen if " projects" in sql]
+    assert len(touching) == 1 and touching[0].startswith("UPDATE projects") and "RETURNING" in touching[0]
+
+    with statements() as seen:
+        response = await client.put(f"/issues/{issue['id']}", json={"title": "New"})
+    assert (response.status_code, response.json()["title"], response.json()["status"]) == (200, "New", "open")
+    assert [sql.split()[0] for sql in seen if " issues " in sql or sql.endswith(" issues")] == ["UPDATE"]
+
+    with statements() as seen:
+        assert (await client.delete(f"/issues/{issue['id']}")).status_code == 200
+    deletes = [sql for sql in seen if sql.startswith("DELETE FROM issues ")]
+    assert len(deletes) == 1 and "RETURNING" in deletes[0]
+
+async def test_missing_rows_are_404_without_side_effects(client):
+    before = await outbox_count()
+    assert (await client.put("/issues/999", json={"title": "x"})).status_code == 404
+    assert (await client.delete("/issues/999")).status_code == 404
+    assert (await client.put("/projects/999", json={"name": "x"})).status_code == 404
+    assert (await client.delete("/projects/999")).status_code == 404
+    assert (await client.put("/templates/999", json={"name": "x"})).status_code == 404
+    assert (await client.delete("/templates/999")).status_code == 404
+    assert await outbox_count() == before
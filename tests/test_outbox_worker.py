@@ -0,0 +1,108 @@
+import pytest
+from sqlalchemy import select
+
+from src.config import settings
+from src.crud.outbox import enqueue_outbox
+from src.database import AsyncSessionLocal
+from src.models.project import Project
+from src.utils import github_cli
+from src.utils.github_cli import CLITransport
+from src.utils.outbox_worker import OutboxWorker
+
+pytestmark = pytest.mark.anyio
+
+async def add_projects(*names):
+    async with AsyncSessionLocal() as db:
+        projects = [Project(name=name, description=f"About {name}") for name in names]
+        db.add_all(projects)
+        await db.flush()
+        for project in projects:
+            enqueue_outbox(db, "project", project.id, "create", {"name": project.name, "description": project.description})
+        await db.commit()
+        return [project.id for project in projects]
+
+async def github_ids():
+    async with AsyncSessionLocal() as db:
+        return (await db.execute(select(Project.github_id).order_by(Project.id))).scalars().all()
+
+async def test_creates_without_owner_id_skip_the_batch(database, monkeypatch):
+    monkeypatch.setattr(settings, "GITHUB_OWNER_ID", None)
+    created = []
+
+    async def create_github_projects_batch(projects):
+        raise AssertionError("batch path used without an owner id")
+
+    async def create_github_project(name, description):
+        created.append((name, description))
+        return {"id": f"PVT_{name}"}
+
+    monkeypatch.setattr(github_cli, "create_github_projects_batch", create_github_projects_batch)
+    monkeypatch.setattr(github_cli, "create_github_project", create_github_project)
+    await add_projects("a", "b")
+    assert await OutboxWorker().drain_once() == 2
+    assert sorted(created) == [("a", "About a"), ("b", "About b")]
+    assert await github_ids() == ["PVT_a", "PVT_b"]
+
+async def test_batched_projects_get_their_descriptions(database, monkeypatch):
+    monkeypatch.setattr(settings, "GITHUB_OWNER_ID", "O_owner")
+    calls = []
+
+    async def run_github_graphql(query, variables):
+        calls.append(variables)
+        if "createProjectV2" in query:
+            return {"data": {f"p{i}": {"projectV2": {"id": f"PVT_{i}"}} for i in range(2)}}
+        return {"data": {alias: {"projectV2": {"id": "x"}} for alias in ("d0", "d1")}}
+
+    monkeypatch.setattr(github_cli, "run_github_graphql", run_github_graphql)
+    await add_projects("a", "b")
+    assert await OutboxWorker().drain_once() == 2
+    assert calls[1] == {"project0": "PVT_0", "description0": "About a", "project1": "PVT_1", "description1": "About b"}
+    assert await github_ids() == ["PVT_0", "PVT_1"]
+
+@pytest.mark.parametrize("output, number", [
+    ({"id": "I_kwDO", "number": 12, "url": "https://github.com/octo/repo/issues/12"}, "12"),
+    ({"id": "I_kwDO", "url": "https://github.com/octo/repo/issues/13"}, "13"),
+])
+async def test_cli_issue_create_returns_the_number(monkeypatch, output, number):
+    async def run_github_cli_command(command, **kwargs):
+        return output
+
+    monkeypatch.setattr(github_cli, "run_github_cli_command", run_github_cli_command)
+    result = await CLITransport().create_issue("PVT_1", "Title", "Body")
+    assert result["id"] == number
+
+async def test_backing_off_entity_is_not_fetched(database):
+    from datetime import datetime, timedelta, timezone
+    from src.crud.outbox import get_pending_outbox
+    from src.models.outbox import OutboxEntry
+
+    now = datetime.now(timezone.utc)
+    async with AsyncSessionLocal() as db:
+        db.add_all([
+            OutboxEntry(entity_type="issue", entity_id=1, operation="update", payload={}, next_attempt_at=now + timedelta(minutes=5)),
+            OutboxEntry(entity_type="issue", entity_id=1, operation="update", payload={}),
+            OutboxEntry(entity_type="issue", entity_id=2, operation="update", payload={}, next_attempt_at=now - timedelta(minutes=5)),
+            OutboxEntry(entity_type="issue", entity_id=3, operation="update", payload={}),
+        ])
+        await db.commit()
+        entries = await get_pending_outbox(db, now)
+    assert [entry.entity_id for entry in entries] == [2, 3]
+
+async def test_prune_keeps_entries_an_entity_still_needs(database, monkeypatch):
+    from datetime import datetime, timedelta, timezone
+    from src.models.outbox import OutboxEntry
+
+    old = datetime.now(timezone.utc) - timedelta(days=30)
+    async with AsyncSessionLocal() as db:
+        db.add_all([
+            OutboxEntry(entity_type="issue", entity_id=1, operation="create", payload={}, status="done", processed_at=old),
+            OutboxEntry(entity_type="issue", entity_id=2, operation="create", payload={}, status="done", processed_at=old),
+            OutboxEntry(entity_type="issue", entity_id=2, operation="delete", payload={}),
+            OutboxEntry(entity_type="issue", entity_id=3, operation="create", payload={}, status="done", processed_at=datetime.now(timezone.utc)),
+            OutboxEntry(entity_type="issue", entity_id=4, operation="create", payload={}, status="dead", processed_at=old),
+        ])
+        await db.commit()
+    assert await OutboxWorker().prune() == 1
+    async with AsyncSessionLocal() as db:
+        remaining = (await db.execute(select(OutboxEntry.entity_id).order_by(OutboxEntry.id))).scalars().all()
+    assert remaining == [2, 2, 3, 4]
@@ -0,0 +1,61 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import select, text
+
+from src.config import settings
+from src.crud.issue import issue_filters
+from src.database import AsyncSessionLocal, engine
+from src.models.issue import Issue
+from src.utils.pagination import keyset_by_updated
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture(params=[False, True], ids=["orm", "fast"])
+def fast_lists(request, monkeypatch):
+    monkeypatch.setattr(settings, "FAST_LIST_RESPONSES", request.param)
+
+async def create_issues(client, count):
+    project = (await client.post("/projects/", json={"name": "Board"})).json()
+    ids = []
+    for n in range(count):
+        issue = {"title": f"t{n}", "body": "", "status": "open" if n % 2 else "closed", "project_id": project["id"]}
+        ids.append((await client.post("/issues/", json=issue)).json()["id"])
+    return project["id"], ids
+
+async def pages(client, path, **params):
+    items, cursor = [], None
+    while True:
+        page = (await client.get(path, params={**params, **({"cursor": cursor} if cursor else {})})).json()
+        items.extend(item["id"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return items
+
+async def test_pages_follow_ids_with_filters(client, fast_lists):
+    project_id, ids = await create_issues(client, 7)
+    assert await pages(client, "/issues/", limit=2) == ids
+    assert await pages(client, "/issues/", limit=2, project_id=project_id, status="open") == ids[1::2]
+    assert (await client.get("/issues/", params={"cursor": "not-a-cursor"})).status_code == 400
+
+async def test_updated_since_pages_by_last_update(client, fast_lists):
+    project_id, ids = await create_issues(client, 6)
+    # CURRENT_TIMESTAMP-style stamps, ties included, in an order unlike the ids
+    stamps = ["2030-01-01 10:00:02", "2030-01-01 10:00:00", "2030-01-01 10:00:01",
+              "2030-01-01 10:00:00", "2030-01-01 10:00:02", "2020-01-01 00:00:00"]
+    async with engine.begin() as conn:
+        for issue_id, stamp in zip(ids, stamps):
+            await conn.execute(text("UPDATE issues SET updated_at = :stamp WHERE id = :id"), {"stamp": stamp, "id": issue_id})
+    expected = [ids[1], ids[3], ids[2], ids[0], ids[4]]
+    assert await pages(client, "/issues/", limit=2, updated_since="2029-01-01T00:00:00") == expected
+    assert await pages(client, "/projects/", limit=1, updated_since="2000-01-01T00:00:00") == [project_id]
+
+async def test_updated_since_order_comes_from_the_index(database):
+    since, after = datetime(2030, 1, 1), (datetime(2030, 1, 1, 10), 3)
+    async with AsyncSessionLocal() as db:
+        query = keyset_by_updated(select(Issue.id).where(*issue_filters(updated_since=since)), db, Issue.updated_at, Issue.id, after)
+        sql = str(query.limit(10).compile(db.bind, compile_kwargs={"literal_binds": True}))
+        plan = (await db.execute(text("EXPLAIN QUERY PLAN " + sql))).all()
+    details = " ".join(row[-1] for row in plan)
+    assert "ix_issues_updated_at_id" in details
+    assert "TEMP B-TREE" not in details
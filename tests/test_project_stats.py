@@ -0,0 +1,80 @@
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import insert
+
+from src.crud import issue as issue_crud
+from src.crud import upsert
+from src.crud.project import create_project
+from src.crud.project_stats import get_project_stats, rebuild_project_stats
+from src.crud.template import get_template_by_name, upsert_templates
+from src.database import AsyncSessionLocal
+from src.models.issue import Issue
+from src.schemas.issue import IssueCreate, IssueUpdate
+from src.schemas.project import ProjectCreate
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture(params=["on_conflict", "fallback"])
+def upsert_path(request, monkeypatch):
+    if request.param == "fallback":
+        monkeypatch.setattr(upsert, "supports_upsert", lambda db: False)
+    return request.param
+
+async def counters(db, project_id):
+    stats, counts = await get_project_stats(db, project_id)
+    return stats.issues_created, stats.issues_closed, counts
+
+async def test_counters_follow_issue_writes(database, upsert_path):
+    async with AsyncSessionLocal() as db:
+        project = await create_project(db, ProjectCreate(name="Board"))
+        ids = await issue_crud.create_issues(db, [
+            IssueCreate(title=f"Issue {n}", body="", status="open", project_id=project.id) for n in range(3)
+        ])
+        await issue_crud.update_issue(db, ids[0], IssueUpdate(status="closed"))
+        await issue_crud.update_issues(db, [{"id": ids[1], "status": "in_progress"}])
+        await issue_crud.delete_issue(db, ids[2])
+        assert await counters(db, project.id) == (3, 1, {"closed": 1, "in_progress": 1})
+        # Totals are cumulative both ways: a rebuild still counts the deleted issue
+        await rebuild_project_stats(db, project.id)
+        assert await counters(db, project.id) == (3, 1, {"closed": 1, "in_progress": 1})
+        await issue_crud.update_issue(db, ids[0], IssueUpdate(status="open"))
+        await issue_crud.update_issue(db, ids[0], IssueUpdate(status="closed"))
+        await issue_crud.delete_issue(db, ids[0])
+        assert await counters(db, project.id) == (3, 2, {"in_progress": 1})
+        await rebuild_project_stats(db)
+        assert await counters(db, project.id) == (3, 2, {"in_progress": 1})
+
+async def test_rebuild_counts_issues_from_before_the_event_log(database):
+    async with AsyncSessionLocal() as db:
+        project = await create_project(db, ProjectCreate(name="Board"))
+        await issue_crud.create_issues(db, [IssueCreate(title="Logged", body="", status="open", project_id=project.id)])
+        # Written before status events were recorded
+        await db.execute(insert(Issue), [
+            {"title": f"Old {n}", "body": "", "status": "closed", "project_id": project.id} for n in range(3)
+        ])
+        await db.commit()
+        await rebuild_project_stats(db, project.id)
+        assert await counters(db, project.id) == (4, 3, {"open": 1, "closed": 3})
+
+        emptied = await create_project(db, ProjectCreate(name="Emptied"))
+        issue_id, = await issue_crud.create_issues(db, [IssueCreate(title="Gone", body="", status="open", project_id=emptied.id)])
+        await issue_crud.delete_issue(db, issue_id)
+        await rebuild_project_stats(db)
+        assert await counters(db, emptied.id) == (1, 0, {})
+
+async def test_template_upsert_bumps_version(database, upsert_path):
+    async with AsyncSessionLocal() as db:
+        await upsert_templates(db, [{"name": "bug", "content": {"a": 1}}])
+        await upsert_templates(db, [{"name": "bug", "content": {"a": 2}}, {"name": "task", "content": {}}])
+        template = await get_template_by_name(db, "bug")
+        assert (template.version, template.content) == (2, {"a": 2})
+        assert (await get_template_by_name(db, "task")).version == 1
+
+def test_unsupported_dialects_are_a_value_error():
+    class Session:
+        bind = SimpleNamespace(dialect=SimpleNamespace(name="mssql"))
+
+    assert not upsert.supports_upsert(Session())
+    with pytest.raises(ValueError, match="'mssql'.*postgresql, sqlite"):
+        upsert.dialect_insert(Session())
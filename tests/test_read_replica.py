@@ -0,0 +1,79 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+import src.database as db_module
+from src.crud.issue import create_issue, update_issue
+from src.crud.issue_dependency import add_dependencies
+from src.database import AsyncSessionLocal, Base, create_engine_for
+from src.schemas.issue import IssueCreate, IssueUpdate
+from src.schemas.project import ProjectCreate
+from src.crud.project import create_project
+from src.crud.template import update_template, upsert_templates
+from src.schemas.template import TemplateUpdate
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture
+async def lagging_replica(database, tmp_path, monkeypatch):
+    replica = create_engine_for(f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}")
+    async with replica.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    monkeypatch.setattr(db_module, "ReadSessionLocal", sessionmaker(replica, class_=AsyncSession, expire_on_commit=False))
+    yield replica
+    await replica.dispose()
+
+async def test_cached_reads_come_from_the_primary(lagging_replica, client):
+    async with AsyncSessionLocal() as db:
+        project = await create_project(db, ProjectCreate(name="Board"))
+        issue = await create_issue(db, IssueCreate(title="Before", body="", status="open", project_id=project.id))
+        await update_issue(db, issue.id, IssueUpdate(title="After"))
+    # The replica has yet to see the edit
+    async with lagging_replica.begin() as conn:
+        await conn.execute(text("INSERT INTO projects (id, name) VALUES (:id, 'Board')"), {"id": project.id})
+        await conn.execute(
+            text("INSERT INTO issues (id, title, body, status, project_id) VALUES (:id, 'Before', '', 'open', :project)"),
+            {"id": issue.id, "project": project.id},
+        )
+
+    for _ in range(2):
+        response = await client.get(f"/issues/{issue.id}")
+        assert response.status_code == 200
+        assert response.json()["title"] == "After"
+
+async def test_cached_template_reads_come_from_the_primary(lagging_replica, client):
+    async with AsyncSessionLocal() as db:
+        template_id, = await upsert_templates(db, [{"name": "bug", "content": {"title": "Before"}}])
+        await update_template(db, template_id, TemplateUpdate(content={"title": "After"}))
+    async with lagging_replica.begin() as conn:
+        await conn.execute(
+            text("INSERT INTO templates (id, name, content, version) VALUES (:id, 'bug', '{\"title\": \"Before\"}', 1)"),
+            {"id": template_id},
+        )
+
+    for _ in range(2):
+        response = await client.get(f"/templates/{template_id}")
+        assert response.status_code == 200
+        assert response.json()["content"] == {"title": "After"}
+
+async def test_dependency_graphs_are_loaded_from_the_primary(lagging_replica, client):
+    async with AsyncSessionLocal() as db:
+        project = await create_project(db, ProjectCreate(name="Board"))
+        first = await create_issue(db, IssueCreate(title="a", body="", status="open", project_id=project.id))
+        second = await create_issue(db, IssueCreate(title="b", body="", status="open", project_id=project.id))
+        await add_dependencies(db, [(first.id, second.id)])
+    # The replica has the issues but not yet the edge
+    async with lagging_replica.begin() as conn:
+        await conn.execute(text("INSERT INTO projects (id, name) VALUES (:id, 'Board')"), {"id": project.id})
+        for issue in (first, second):
+            await conn.execute(
+                text("INSERT INTO issues (id, title, body, status, project_id) VALUES (:id, 'x', '', 'open', :project)"),
+                {"id": issue.id, "project": project.id},
+            )
+
+    assert (await client.get(f"/issues/{first.id}/blocked")).json() == [second.id]
+    assert (await client.get(f"/projects/{project.id}/dependencies/order")).json()["order"] == [first.id, second.id]
+    # The graph that is now cached is the one the cycle check trusts
+    response = await client.post(f"/issues/{first.id}/dependencies", json={"blocker_id": second.id})
+    assert response.status_code == 409
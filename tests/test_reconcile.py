@@ -0,0 +1,82 @@
+
+import pytest
+from sqlalchemy import select
+
+from src.config import settings
+from src.database import AsyncSessionLocal
+from src.models.issue import Issue
+from src.models.project import Project
+from src.utils.reconcile import reconcile
+
+pytestmark = pytest.mark.anyio
+
+def issue(number, title, updated_at, state="OPEN", project="PVT_1"):
+    return {
+        "number": number, "title": title, "body": f"Body of {title}", "state": state,
+        "updatedAt": updated_at, "projectsV2": {"nodes": [{"id": project}]},
+    }
+
+@pytest.fixture
+def gh(fake_gh, monkeypatch, database):
+    fake = fake_gh
+    fake.state = {
+        "projects": [{"id": "PVT_1", "title": "Board", "shortDescription": "Main", "updatedAt": "2024-01-01T00:00:00Z"}],
+        "issues": [issue(n, f"Issue {n}", f"2024-01-0{n}T00:00:00Z") for n in range(1, 6)],
+    }
+    fake.save()
+    monkeypatch.setattr(settings, "GITHUB_TRANSPORT", "cli")
+    monkeypatch.setattr(settings, "GITHUB_OWNER_ID", "O_owner")
+    monkeypatch.setattr(settings, "GITHUB_REPOSITORY_ID", "R_repo")
+    monkeypatch.setattr(settings, "GITHUB_SYNC_PAGE_SIZE", 2)
+    return fake
+
+async def local_issues():
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(select(Issue.github_id, Issue.title, Issue.status, Issue.project_id).order_by(Issue.github_id))
+        return result.all()
+
+async def test_first_sync_pages_through_everything(gh):
+    results = await reconcile()
+    assert (results["projects"].fetched, results["projects"].changed) == (1, 1)
+    assert (results["issues"].fetched, results["issues"].changed) == (5, 5)
+    rows = await local_issues()
+    assert [row.title for row in rows] == [f"Issue {n}" for n in range(1, 6)]
+    async with AsyncSessionLocal() as db:
+        project_id = await db.scalar(select(Project.id).where(Project.github_id == "PVT_1"))
+    assert {row.project_id for row in rows} == {project_id}
+    # 5 issues at 2 per page
+    assert sum("issues(" in call["query"] for call in gh.calls()) == 3
+
+async def test_incremental_sync_resumes_from_watermark_and_skips_unchanged(gh):
+    await reconcile()
+    calls_before = len(gh.calls())
+    results = await reconcile()
+    issue_calls = [call for call in gh.calls()[calls_before:] if "issues(" in call["query"]]
+    assert issue_calls[0]["variables"]["since"] == "2024-01-05T00:00:00Z"
+    # Only the issue at the watermark comes back, and its hash is unchanged
+    assert (results["issues"].fetched, results["issues"].changed) == (1, 0)
+    assert (results["projects"].fetched, results["projects"].changed) == (1, 0)
+
+async def test_changed_issue_is_updated(gh):
+    await reconcile()
+    gh.state["issues"][1] = issue(2, "Renamed", "2024-02-01T00:00:00Z", state="CLOSED")
+    gh.save()
+    results = await reconcile()
+    assert results["issues"].changed == 1
+    rows = {row.github_id: row for row in await local_issues()}
+    assert (rows["2"].title, rows["2"].status) == ("Renamed", "closed")
+    assert rows["1"].title == "Issue 1"
+
+async def test_full_sync_with_prune_deletes_missing_rows(gh):
+    await reconcile()
+    del gh.state["issues"][2]
+    gh.state["projects"].append({"id": "PVT_2", "title": "Second", "shortDescription": None, "updatedAt": "2024-03-01T00:00:00Z"})
+    gh.save()
+    # Without prune nothing is removed
+    await reconcile(full=True)
+    assert len(await local_issues()) == 5
+    results = await reconcile(full=True, prune=True)
+    assert results["issues"].pruned == 1
+    assert [row.github_id for row in await local_issues()] == ["1", "2", "4", "5"]
+    async with AsyncSessionLocal() as db:
+        assert set((await db.execute(select(Project.github_id))).scalars()) == {"PVT_1", "PVT_2"}
@@ -0,0 +1,61 @@
+import pytest
+
+from src.utils.response_cache import MemoryCacheBackend, ResponseCache, etag_matches
+
+pytestmark = pytest.mark.anyio
+
+def test_if_none_match_comparison():
+    assert etag_matches('"a", W/"b"', '"b"')
+    assert etag_matches("*", '"b"')
+    assert not etag_matches('"a"', '"b"')
+    assert not etag_matches(None, '"b"')
+
+async def test_etag_revalidation_and_write_invalidation(client):
+    project = (await client.post("/projects/", json={"name": "Board"})).json()
+    issue = (await client.post("/issues/", json={"title": "Before", "body": "", "status": "open", "project_id": project["id"]})).json()
+
+    first = await client.get(f"/issues/{issue['id']}")
+    etag = first.headers["etag"]
+    assert first.headers["cache-control"] == "no-cache"
+    revalidated = await client.get(f"/issues/{issue['id']}", headers={"If-None-Match": etag})
+    assert (revalidated.status_code, revalidated.content, revalidated.headers["etag"]) == (304, b"", etag)
+
+    await client.put(f"/issues/{issue['id']}", json={"title": "After"})
+    changed = await client.get(f"/issues/{issue['id']}", headers={"If-None-Match": etag})
+    assert (changed.status_code, changed.json()["title"]) == (200, "After")
+    assert changed.headers["etag"] != etag
+
+    etag = (await client.get(f"/projects/{project['id']}")).headers["etag"]
+    await client.put(f"/projects/{project['id']}", json={"name": "Renamed"})
+    changed = await client.get(f"/projects/{project['id']}", headers={"If-None-Match": etag})
+    assert (changed.status_code, changed.json()["name"]) == (200, "Renamed")
+
+    await client.delete(f"/issues/{issue['id']}")
+    assert (await client.get(f"/issues/{issue['id']}")).status_code == 404
+
+async def test_invalidation_drops_lists_of_the_kind():
+    cache = ResponseCache(MemoryCacheBackend(10), ttl=60)
+    loads = []
+
+    async def load():
+        loads.append(1)
+        return {"n": len(loads)}
+
+    for key in ("issue:1", "issue:2", "issues:list", "project:1"):
+        await cache.get_or_load(key, load)
+    await cache.invalidate("issue", 1)
+    assert [await cache.backend.get(key) is None for key in ("issue:1", "issue:2", "issues:list", "project:1")] == [
+        True, False, True, False,
+    ]
+
+async def test_load_overlapping_an_invalidation_is_not_stored():
+    cache = ResponseCache(MemoryCacheBackend(10), ttl=60)
+
+    async def load():
+        # A write lands while this read is still in flight
+        await cache.invalidate("issue", 1)
+        return {"title": "stale"}
+
+    entry = await cache.get_or_load("issue:1", load)
+    assert entry.body == b'{"title":"stale"}'
+    assert await cache.backend.get("issue:1") is None
@@ -0,0 +1,55 @@
+import pytest
+
+from src.crud.search import rebuild_search_index
+from src.database import AsyncSessionLocal
+
+pytestmark = pytest.mark.anyio
+
+async def create_issues(client, issues):
+    project = (await client.post("/projects/", json={"name": "Board"})).json()
+    ids = []
+    for title, body in issues:
+        issue = {"title": title, "body": body, "status": "open", "project_id": project["id"]}
+        ids.append((await client.post("/issues/", json=issue)).json()["id"])
+    return ids
+
+async def search(client, q, **params):
+    response = await client.get("/issues/search", params={"q": q, **params})
+    assert response.status_code == 200
+    return response.json()
+
+async def test_title_matches_rank_first(client):
+    body_only, title, unrelated = await create_issues(client, [
+        ("Crash on start", "the login page shows a blank screen"),
+        ("Login page is blank", "after the upgrade"),
+        ("Slow export", "takes minutes"),
+    ])
+    assert [item["id"] for item in (await search(client, "login blank"))["items"]] == [title, body_only]
+    assert (await search(client, "blank minutes"))["items"] == []
+    # FTS5 syntax in the query is searched for, not interpreted
+    assert (await search(client, 'login" OR "export'))["items"] == []
+    assert (await search(client, "NEAR(login"))["items"] == []
+
+async def test_cursor_pages_through_every_match(client):
+    ids = await create_issues(client, [(f"Widget {n}", "widget " * (n % 3)) for n in range(7)])
+    seen, cursor = [], None
+    while True:
+        page = await search(client, "widget", limit=2, **({"cursor": cursor} if cursor else {}))
+        seen.extend(item["id"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert sorted(seen) == ids
+    assert seen == [item["id"] for item in (await search(client, "widget", limit=50))["items"]]
+    assert (await client.get("/issues/search", params={"q": "widget", "cursor": "bogus"})).status_code == 400
+
+async def test_index_follows_writes(client):
+    first, second = await create_issues(client, [("Alpha", "one"), ("Beta", "two")])
+    await client.put(f"/issues/{first}", json={"title": "Gamma"})
+    await client.delete(f"/issues/{second}")
+    assert (await search(client, "alpha"))["items"] == []
+    assert (await search(client, "beta"))["items"] == []
+    assert [item["id"] for item in (await search(client, "gamma"))["items"]] == [first]
+    async with AsyncSessionLocal() as db:
+        assert await rebuild_search_index(db) == 1
+    assert [item["id"] for item in (await search(client, "one"))["items"]] == [first]
@@ -0,0 +1,49 @@
+from datetime import datetime, timezone
+
+import httpx
+import pytest
+from sqlalchemy import text
+
+from src.config import settings
+from src.database import engine
+from src.schemas.issue import Issue
+from src.utils.serialization import dumps
+
+pytestmark = pytest.mark.anyio
+
+async def both_paths(client, monkeypatch, path, **params):
+    bodies = []
+    for fast in (False, True):
+        monkeypatch.setattr(settings, "FAST_LIST_RESPONSES", fast)
+        response = await client.get(path, params=params)
+        assert response.status_code == 200
+        bodies.append(response.content)
+    return bodies
+
+def test_dumps_matches_pydantic_json():
+    issue = Issue(
+        id=1, title="Ünïcode \"quoted\" ✓", body="line\nbreak", status="open", project_id=2,
+        created_at=datetime(2030, 1, 1, 10, 0, 0, 123456, tzinfo=timezone.utc),
+        updated_at=datetime(2030, 1, 1, 10, 0, 0),
+    )
+    assert dumps(issue.model_dump()) == issue.model_dump_json().encode()
+
+async def test_fast_lists_are_byte_for_byte_the_default_output(client, monkeypatch):
+    project = (await client.post("/projects/", json={"name": "Bøard ✓", "description": None})).json()
+    for n, title in enumerate(["plain", "Ünïcode ✓", 'quote " and \\ slash', "tab\tand\nnewline"]):
+        issue = {"title": title, "body": "" if n % 2 else "body", "status": "open", "project_id": project["id"]}
+        assert (await client.post("/issues/", json=issue)).status_code == 200
+    async with engine.begin() as conn:
+        await conn.execute(text("UPDATE issues SET updated_at = '2030-01-01 10:00:00' WHERE id % 2 = 0"))
+
+    default, fast = await both_paths(client, monkeypatch, "/issues/", limit=3)
+    assert fast == default
+    cursor = httpx.Response(200, content=default).json()["next_cursor"]
+    default, fast = await both_paths(client, monkeypatch, "/issues/", limit=3, cursor=cursor)
+    assert fast == default
+    default, fast = await both_paths(client, monkeypatch, "/issues/", limit=2, updated_since="2029-01-01T00:00:00")
+    assert fast == default
+    default, fast = await both_paths(client, monkeypatch, "/issues/", project_id=project["id"], status="closed")
+    assert fast == default == b'{"items":[],"next_cursor":null}'
+    default, fast = await both_paths(client, monkeypatch, "/projects/")
+    assert fast == default
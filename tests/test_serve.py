@@ -0,0 +1,118 @@
+import asyncio
+import json
+import os
+import shutil
+import socket
+import tempfile
+
+import pytest
+
+from src.config import settings
+from src.crud.template import upsert_templates
+from src.database import AsyncSessionLocal
+from src.utils.bootstrap import BOOTSTRAPPED_ENV, bootstrap, is_bootstrapped, warm_caches
+from src.utils.invalidation_bus import MAX_IDS_PER_MESSAGE, InvalidationBus
+from src.utils.process_lock import FileLock
+from src.utils.response_cache import response_cache
+from src.utils.template_engine import compile_template, template_cache
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture
+def bus_dir():
+    # Unix socket paths are short; keep clear of pytest's long tmp_path
+    directory = tempfile.mkdtemp(prefix="pms-bus-")
+    yield directory
+    shutil.rmtree(directory, ignore_errors=True)
+
+@pytest.fixture
+async def bus(bus_dir):
+    await response_cache.clear()
+    template_cache.clear()
+    bus = InvalidationBus(bus_dir)
+    bus.start()
+    yield bus
+    bus.stop()
+    await response_cache.clear()
+
+@pytest.fixture
+def other_worker(bus_dir):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    sock.bind(os.path.join(bus_dir, "other.sock"))
+    sock.settimeout(1)
+    yield sock
+    sock.close()
+
+def test_file_lock_is_exclusive_across_open_files(tmp_path):
+    path = str(tmp_path / "lock")
+    first, second = FileLock(path), FileLock(path)
+    with first:
+        assert first.held
+        assert not second.acquire(blocking=False)
+        assert not second.held
+    assert second.acquire(blocking=False)
+    second.release()
+    assert not second.held
+
+def test_bootstrapped_flag_comes_from_the_environment(monkeypatch):
+    monkeypatch.delenv(BOOTSTRAPPED_ENV, raising=False)
+    assert not is_bootstrapped()
+    monkeypatch.setenv(BOOTSTRAPPED_ENV, "1")
+    assert is_bootstrapped()
+
+async def test_bootstrap_waits_for_the_lock(database, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "BOOTSTRAP_LOCK_PATH", str(tmp_path / "bootstrap.lock"))
+    holder = FileLock(settings.BOOTSTRAP_LOCK_PATH)
+    holder.acquire()
+    task = asyncio.create_task(bootstrap())
+    await asyncio.sleep(0.2)
+    assert not task.done()
+    holder.release()
+    await asyncio.wait_for(task, 5)
+
+async def test_warm_caches_skips_malformed_templates(database):
+    template_cache.clear()
+    async with AsyncSessionLocal() as db:
+        good, bad = await upsert_templates(db, [
+            {"name": "good", "content": {"title": "{a}"}},
+            {"name": "bad", "content": {"title": "{a"}},
+        ])
+    assert await warm_caches() == 1
+    assert template_cache.get(good) is not None
+    assert template_cache.get(bad) is None
+
+async def test_invalidations_are_sent_to_other_workers(bus, other_worker):
+    await response_cache.invalidate("issue", 1, 2)
+    assert json.loads(other_worker.recv(65536)) == {"kind": "issue", "ids": [1, 2]}
+    await response_cache.invalidate("issue", *range(MAX_IDS_PER_MESSAGE + 1))
+    assert json.loads(other_worker.recv(65536)) == {"kind": "issue", "ids": None}
+    # What arrived over the bus is not sent back out
+    await response_cache.invalidate("issue", 3, broadcast=False)
+    other_worker.setblocking(False)
+    with pytest.raises(BlockingIOError):
+        other_worker.recv(65536)
+    assert bus.sent == 2
+
+async def test_received_invalidations_drop_cached_entries(bus, other_worker):
+    async def load():
+        return {"id": 1}
+
+    await response_cache.get_or_load("template:1", load)
+    template_cache.put(compile_template(1, 1, {"title": "{a}"}))
+    other_worker.sendto(json.dumps({"kind": "template", "ids": [1]}).encode(), bus.path)
+    for _ in range(100):
+        if bus.received and template_cache.get(1) is None and await response_cache.backend.get("template:1") is None:
+            break
+        await asyncio.sleep(0.01)
+    assert bus.received == 1
+    assert template_cache.get(1) is None
+    assert await response_cache.backend.get("template:1") is None
+
+async def test_sockets_of_dead_workers_are_removed(bus, bus_dir):
+    stale = os.path.join(bus_dir, "12345.sock")
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    sock.bind(stale)
+    sock.close()
+    await response_cache.invalidate("project", 1)
+    assert not os.path.exists(stale)
+    assert os.path.exists(bus.path)
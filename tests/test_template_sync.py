@@ -0,0 +1,85 @@
+import os
+
+import pytest
+from sqlalchemy import select
+
+from src.config import settings
+from src.database import AsyncSessionLocal
+from src.models.template import Template
+from src.utils.template_sync import sync_templates
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture
+def templates_dir(tmp_path):
+    directory = tmp_path / "templates"
+    directory.mkdir()
+    write(directory / "bug.toml", 'title = "Bug: {what}"\n', 1)
+    write(directory / "task.toml", 'title = "Task"\n', 1)
+    (directory / "README.md").write_text("not a template")
+    return directory
+
+def write(path, text, stamp):
+    path.write_text(text)
+    # Distinct mtimes however coarse the filesystem's clock
+    os.utime(path, ns=(stamp * 10**9, stamp * 10**9))
+
+async def sync(templates_dir, manifest):
+    async with AsyncSessionLocal() as db:
+        return await sync_templates(db, str(templates_dir), str(manifest))
+
+async def templates():
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(select(Template.name, Template.version, Template.content).order_by(Template.name))
+        return [tuple(row) for row in result]
+
+async def test_only_changed_files_are_parsed(database, templates_dir, tmp_path):
+    manifest = tmp_path / "manifest.json"
+    result = await sync(templates_dir, manifest)
+    assert (result.scanned, result.parsed, result.upserted) == (2, 2, 2)
+
+    # A restart with nothing changed opens no file
+    result = await sync(templates_dir, manifest)
+    assert (result.parsed, result.upserted) == (0, 0)
+
+    write(templates_dir / "bug.toml", 'title = "Defect: {what}"\n', 2)
+    result = await sync(templates_dir, manifest)
+    assert (result.parsed, result.upserted) == (1, 1)
+    assert await templates() == [("bug", 2, {"title": "Defect: {what}"}), ("task", 1, {"title": "Task"})]
+
+    # Touched but unchanged: parsed to compare digests, not written
+    write(templates_dir / "task.toml", 'title = "Task"\n', 3)
+    result = await sync(templates_dir, manifest)
+    assert (result.parsed, result.upserted) == (1, 0)
+    assert (await sync(templates_dir, manifest)).parsed == 0
+
+@pytest.mark.parametrize("damage", ["deleted", "corrupt"])
+async def test_a_lost_manifest_falls_back_to_a_full_sync(database, templates_dir, tmp_path, damage):
+    manifest = tmp_path / "manifest.json"
+    await sync(templates_dir, manifest)
+    if damage == "deleted":
+        manifest.unlink()
+    else:
+        manifest.write_text('{"bug": {"mtime_ns"')
+    result = await sync(templates_dir, manifest)
+    assert (result.parsed, result.upserted) == (2, 2)
+    # Rewritten with the same content, so no version moves
+    assert [version for _, version, _ in await templates()] == [1, 1]
+    assert (await sync(templates_dir, manifest)).parsed == 0
+
+async def test_malformed_files_are_skipped_and_retried(database, templates_dir, tmp_path):
+    manifest = tmp_path / "manifest.json"
+    write(templates_dir / "broken.toml", "title = \n", 1)
+    result = await sync(templates_dir, manifest)
+    assert (result.parsed, result.errors) == (2, 1)
+    write(templates_dir / "broken.toml", 'title = "Fixed"\n', 2)
+    result = await sync(templates_dir, manifest)
+    assert (result.parsed, result.upserted, result.errors) == (1, 1, 0)
+
+async def test_large_directories_are_parsed_in_worker_processes(database, templates_dir, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "TEMPLATE_SYNC_PARALLEL_THRESHOLD", 1)
+    for n in range(8):
+        write(templates_dir / f"t{n}.toml", f'title = "T{n}"\n[fields.n]\ntype = "integer"\n', 1)
+    result = await sync(templates_dir, tmp_path / "manifest.json")
+    assert (result.parsed, result.upserted) == (10, 10)
+    assert ("t3", 1, {"title": "T3", "fields": {"n": {"type": "integer"}}}) in await templates()
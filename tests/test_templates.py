@@ -0,0 +1,109 @@
+import pytest
+
+from src.crud.template import upsert_templates
+from src.database import AsyncSessionLocal
+from src.utils.template_engine import TemplateRenderError, TemplateSyntaxError, compile_template
+
+pytestmark = pytest.mark.anyio
+
+def test_malformed_templates_fail_to_compile():
+    with pytest.raises(TemplateSyntaxError, match="title"):
+        compile_template(1, 1, {"title": "{a"})
+    with pytest.raises(TemplateSyntaxError, match="unknown type 'colour'"):
+        compile_template(1, 1, {"fields": {"a": {"type": "colour"}}})
+
+def test_values_are_checked_against_their_type_and_spec():
+    compiled = compile_template(1, 1, {"title": "{n:>3} {done}", "fields": {"done": {"type": "boolean"}}})
+    assert compiled.render({"n": 7, "done": True}) == ("  7 True", "")
+    with pytest.raises(TemplateRenderError, match="Field 'done' must be of type boolean"):
+        compiled.render({"done": "yes"})
+    compiled = compile_template(1, 1, {"title": "{n:d}"})
+    with pytest.raises(TemplateRenderError, match="Field 'n' cannot be formatted as 'd'"):
+        compiled.render({"n": "x"})
+
+async def test_bad_templates_are_rejected_with_400(client):
+    async with AsyncSessionLocal() as db:
+        # Stored before templates were validated
+        template_id, = await upsert_templates(db, [{"name": "broken", "content": {"title": "{a"}}])
+    project = (await client.post("/projects/", json={"name": "Board"})).json()
+    issue = (await client.post("/issues/", json={"title": "t", "body": "", "status": "open", "project_id": project["id"]})).json()
+
+    response = await client.post(f"/templates/issues/{issue['id']}/apply-template", params={"template_id": template_id})
+    assert response.status_code == 400
+    response = await client.post(f"/templates/{template_id}/apply", json=[{"issue_id": issue["id"]}])
+    assert response.status_code == 400
+    response = await client.put(f"/templates/{template_id}", json={"content": {"title": "{b"}})
+    assert response.status_code == 400
+
+    response = await client.put(f"/templates/{template_id}", json={"content": {"title": "{n:d}"}})
+    assert response.status_code == 200
+    response = await client.post(
+        f"/templates/issues/{issue['id']}/apply-template", params={"template_id": template_id}, json={"n": "x"}
+    )
+    assert response.status_code == 400
+
+async def test_created_templates_are_committed_and_names_unique(client):
+    assert (await client.get("/templates/available")).json() == []
+    response = await client.post("/templates/", json={"name": "bug", "content": {"title": "Bug: {what}"}})
+    assert response.status_code == 200
+    template = response.json()
+    assert (await client.get(f"/templates/{template['id']}")).json()["content"] == {"title": "Bug: {what}"}
+    assert "bug" in (await client.get("/templates/available")).json()
+
+    response = await client.post("/templates/", json={"name": "bug", "content": {}})
+    assert response.status_code == 409
+    response = await client.post("/templates/", json={"name": "task", "content": {"body": "{a"}})
+    assert response.status_code == 400
+
+async def test_search_filters_names_and_projects_titles(client):
+    names = ["Bug report", "bug_triage", "Feature", "Debugging 100%_done", "BUGFIX"]
+    for name in names:
+        content = {"title": f"{name}: {{what}}", "body": "x" * 1000, "fields": {"what": {"type": "string"}}}
+        assert (await client.post("/templates/", json={"name": name, "content": content})).status_code == 200
+
+    async def search(**params):
+        items, cursor = [], None
+        while True:
+            page = (await client.get("/templates/", params={**params, **({"cursor": cursor} if cursor else {})})).json()
+            items.extend(page["items"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                return items
+
+    items = await search(prefix="bug", limit=1)
+    assert [item["name"] for item in items] == ["Bug report", "bug_triage", "BUGFIX"]
+    assert items[0]["title"] == "Bug report: {what}"
+    assert items[0]["fields"] == {"what": {"type": "string"}}
+    assert "content" not in items[0]
+    assert [item["name"] for item in await search(name="BUG")] == ["Bug report", "bug_triage", "Debugging 100%_done", "BUGFIX"]
+    # LIKE wildcards in the query are matched literally
+    assert [item["name"] for item in await search(name="%_")] == ["Debugging 100%_done"]
+    assert [item["name"] for item in await search(name="g_t")] == ["bug_triage"]
+    assert await search(prefix="bug", name="report") == [items[0]]
+    assert await search(prefix="zzz") == []
+
+    # A new template shows up in the cached listing
+    await client.post("/templates/", json={"name": "bugzilla", "content": {}})
+    added = (await search(prefix="bugz"))[0]
+    assert added["name"] == "bugzilla"
+    assert added["title"] == ""
+    assert added["fields"] == {}
+    assert (await client.get("/templates/", params={"cursor": "nope"})).status_code == 400
+
+async def test_updates_keep_names_unique_and_content_set(client):
+    bug = (await client.post("/templates/", json={"name": "bug", "content": {"title": "Bug"}})).json()
+    await client.post("/templates/", json={"name": "task", "content": {}})
+
+    response = await client.put(f"/templates/{bug['id']}", json={"name": "task"})
+    assert response.status_code == 409
+    response = await client.put(f"/templates/{bug['id']}", json={"content": None})
+    assert response.status_code == 422
+    response = await client.put(f"/templates/{bug['id']}", json={"name": None})
+    assert response.status_code == 422
+    template = (await client.get(f"/templates/{bug['id']}")).json()
+    assert (template["name"], template["content"], template["version"]) == ("bug", {"title": "Bug"}, 1)
+
+    response = await client.put(f"/templates/{bug['id']}", json={"name": "defect"})
+    assert response.status_code == 200
+    assert response.json()["content"] == {"title": "Bug"}
+    assert response.json()["version"] == 2
@@ -0,0 +1,121 @@
+import hashlib
+import hmac
+import json
+import os
+
+import pytest
+from sqlalchemy import select
+
+from src.api.endpoints import webhooks as webhook_endpoint
+from src.config import settings
+from src.database import AsyncSessionLocal
+from src.models.issue import Issue
+from src.utils.webhooks import WebhookConsumer
+
+pytestmark = pytest.mark.anyio
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "webhooks")
+SECRET = "It's a Secret to Everybody"
+
+def fixture(name: str) -> bytes:
+    with open(os.path.join(FIXTURES, name), "rb") as f:
+        return f.read()
+
+def signed(body: bytes) -> str:
+    return "sha256=" + hmac.new(SECRET.encode(), body, hashlib.sha256).hexdigest()
+
+@pytest.fixture
+def consumer(monkeypatch):
+    monkeypatch.setattr(settings, "GITHUB_WEBHOOK_SECRET", SECRET)
+    monkeypatch.setattr(settings, "GITHUB_REPOSITORY_ID", "R_repo")
+    monkeypatch.setattr(settings, "WEBHOOK_QUEUE_SIZE", 2)
+    consumer = WebhookConsumer()
+    monkeypatch.setattr(webhook_endpoint, "webhook_consumer", consumer)
+    return consumer
+
+async def deliver(client, name, delivery, event="issues", signature=None):
+    body = fixture(name)
+    return await client.post("/webhooks/github", content=body, headers={
+        "X-GitHub-Event": event,
+        "X-GitHub-Delivery": delivery,
+        "X-Hub-Signature-256": signature if signature is not None else signed(body),
+    })
+
+@pytest.mark.parametrize("signature", ["", "sha256=" + "0" * 64, "sha1=abc"])
+async def test_bad_signature_is_rejected(consumer, client, signature):
+    response = await deliver(client, "issues_opened.json", "d-1", signature=signature)
+    assert response.status_code == 401
+    assert consumer._queue.empty()
+
+async def test_signature_over_a_different_body_is_rejected(consumer, client):
+    response = await deliver(client, "issues_opened.json", "d-1", signature=signed(fixture("issues_edited.json")))
+    assert response.status_code == 401
+
+async def test_redelivery_is_acknowledged_once(consumer, client):
+    assert (await deliver(client, "issues_opened.json", "d-1")).status_code == 202
+    assert (await deliver(client, "issues_opened.json", "d-1")).status_code == 202
+    assert consumer._queue.qsize() == 1
+
+async def test_delivery_rejected_when_full_is_taken_on_redelivery(consumer, client):
+    assert (await deliver(client, "issues_opened.json", "d-1")).status_code == 202
+    assert (await deliver(client, "issues_edited.json", "d-2")).status_code == 202
+    assert (await deliver(client, "issues_closed.json", "d-3")).status_code == 503
+    consumer._take(10)
+    assert (await deliver(client, "issues_closed.json", "d-3")).status_code == 202
+    assert consumer._queue.qsize() == 1
+
+async def issues():
+    async with AsyncSessionLocal() as db:
+        return (await db.execute(select(Issue.github_id, Issue.title, Issue.status))).all()
+
+def events(*names):
+    return [("issues", json.loads(fixture(name))) for name in names]
+
+async def test_storm_is_coalesced_into_one_upsert(consumer, database):
+    # Out of delivery order: the older edit must not win over the close
+    batch = await consumer.apply(events("issues_opened.json", "issues_closed.json", "issues_edited.json"))
+    assert list(batch.issues) == ["42"]
+    assert await issues() == [("42", "Flaky login test on Safari", "closed")]
+
+async def test_later_batch_updates_existing_row(consumer, database):
+    await consumer.apply(events("issues_opened.json"))
+    await consumer.apply(events("issues_edited.json"))
+    assert await issues() == [("42", "Flaky login test on Safari", "open")]
+
+async def test_deleted_issue_is_removed(consumer, database):
+    await consumer.apply(events("issues_opened.json"))
+    await consumer.apply(events("issues_edited.json", "issues_deleted.json"))
+    assert await issues() == []
+
+async def test_other_repositories_and_project_items_are_ignored(consumer, database, monkeypatch):
+    monkeypatch.setattr(settings, "GITHUB_REPOSITORY_ID", "R_other")
+    item = ("projects_v2_item", json.loads(fixture("projects_v2_item_created.json")))
+    await consumer.apply(events("issues_opened.json") + [item])
+    assert await issues() == []
+
+async def test_opened_webhook_before_outbox_write_back_is_merged(consumer, database, monkeypatch):
+    from src.crud.issue import create_issue
+    from src.models.outbox import OutboxEntry
+    from src.models.project import Project
+    from src.schemas.issue import IssueCreate
+    from src.utils import github_cli
+    from src.utils.outbox_worker import OutboxWorker
+
+    async with AsyncSessionLocal() as db:
+        project = Project(name="Board", github_id="PVT_board")
+        db.add(project)
+        await db.commit()
+        local = await create_issue(db, IssueCreate(title="Flaky login test", body="", status="open", project_id=project.id))
+        local_id = local.id
+
+    async def create_github_issue(project_id, title, body):
+        # GitHub's "opened" webhook overtakes the create's response
+        await consumer.apply(events("issues_opened.json"))
+        return {"id": "42"}
+
+    monkeypatch.setattr(github_cli, "create_github_issue", create_github_issue)
+    assert await OutboxWorker().drain_once() == 1
+    async with AsyncSessionLocal() as db:
+        rows = (await db.execute(select(Issue.id, Issue.github_id, Issue.project_id))).all()
+        assert rows == [(local_id, "42", project.id)]
+        assert await db.scalar(select(OutboxEntry.status)) == "done"